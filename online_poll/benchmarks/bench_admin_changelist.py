@@ -0,0 +1,131 @@
+"""
+Time the Voter and Vote admin changelists on large tables: first page, a
+deep keyset page, exact-email search and the per-poll filter, compared with
+an OFFSET page and an exact COUNT(*) on the same table.
+
+Run `python manage.py migrate` against a scratch DATABASE_URL first. Rows
+from a previous run are reused when the tables already hold enough of them.
+
+Usage:
+    python benchmarks/bench_admin_changelist.py [--voters 1000000] [--polls 100]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from poll.models import CustomUser, Poll, PollOption, Vote, Voter  # noqa: E402
+
+BATCH_SIZE = 10_000
+EMAIL_DOMAIN = 'bench.invalid'
+
+
+def populate(n_voters, n_polls):
+    polls = list(Poll.objects.filter(title='Admin benchmark poll'))
+    if len(polls) < n_polls:
+        Poll.objects.bulk_create([Poll(title='Admin benchmark poll') for _ in range(n_polls - len(polls))])
+        polls = list(Poll.objects.filter(title='Admin benchmark poll'))
+        PollOption.objects.bulk_create([PollOption(poll=poll, text='Yes') for poll in polls])
+    options = list(PollOption.objects.filter(poll__in=polls))
+
+    existing = Voter.objects.filter(poll__in=polls).count()
+    for offset in range(existing, n_voters, BATCH_SIZE):
+        voters, votes = [], []
+        for i in range(offset, min(offset + BATCH_SIZE, n_voters)):
+            anon_id = uuid4().hex * 2
+            voters.append(Voter(
+                poll=polls[i % len(polls)], email=f'voter{i}@{EMAIL_DOMAIN}',
+                temp_password='!', anon_id=anon_id, has_voted=True,
+            ))
+            votes.append(Vote(poll_option=options[i % len(options)], anon_id=anon_id))
+        with transaction.atomic():
+            Voter.objects.bulk_create(voters)
+            Vote.objects.bulk_create(votes)
+        print(f"  inserted {offset + len(voters):,} voters and votes", end='\r', flush=True)
+    print()
+
+    with connection.cursor() as cursor:
+        for model in (Voter, Vote):
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+    return polls
+
+
+def timed(client, url, params=None, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url, params or {})
+            timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings), len(queries), response
+
+
+def timed_sql(run, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--voters', type=int, default=1_000_000)
+    parser.add_argument('--polls', type=int, default=100)
+    parser.add_argument('--deep-pages', type=int, default=200)
+    args = parser.parse_args()
+
+    polls = populate(args.voters, args.polls)
+    # Lets the test client expose the changelist context
+    setup_test_environment()
+    admin, _ = CustomUser.objects.get_or_create(
+        email=f'admin@{EMAIL_DOMAIN}', defaults={'is_staff': True, 'is_superuser': True}
+    )
+    client = Client()
+    client.force_login(admin)
+
+    for model in ('voter', 'vote'):
+        url = reverse(f'admin:poll_{model}_changelist')
+        elapsed, queries, response = timed(client, url)
+        print(f"{model:<6} first page          {elapsed * 1000:8.1f} ms  {queries} queries")
+
+        # Walk forward to a deep page, then time it
+        cursor_url = url
+        for _ in range(args.deep_pages):
+            next_url = client.get(cursor_url).context['cl'].next_page_url
+            if not next_url:
+                break
+            cursor_url = url + next_url
+        elapsed, queries, _ = timed(client, cursor_url)
+        print(f"{model:<6} keyset page {args.deep_pages:<8} {elapsed * 1000:8.1f} ms  {queries} queries")
+
+        elapsed, queries, _ = timed(client, url, {'poll': str(polls[0].poll_id)})
+        print(f"{model:<6} filtered by poll    {elapsed * 1000:8.1f} ms  {queries} queries")
+
+    elapsed, queries, _ = timed(client, reverse('admin:poll_voter_changelist'), {'q': f'voter7@{EMAIL_DOMAIN}'})
+    print(f"voter  email search        {elapsed * 1000:8.1f} ms  {queries} queries")
+
+    offset = args.deep_pages * 50
+    print(f"\nfor comparison: OFFSET {offset:,} page "
+          f"{timed_sql(lambda: list(Voter.objects.order_by('-created_at', 'pk')[offset:offset + 50])) * 1000:8.1f} ms, "
+          f"exact COUNT(*) {timed_sql(lambda: Voter.objects.count()) * 1000:8.1f} ms "
+          f"(exact count limit {settings.ADMIN_EXACT_COUNT_LIMIT:,})")
+
+
+if __name__ == '__main__':
+    main()
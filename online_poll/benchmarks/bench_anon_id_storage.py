@@ -0,0 +1,122 @@
+"""
+Compare hex-text and binary anon_id storage: unique index size plus insert and
+lookup throughput, using the database configured in settings.
+
+Creates and drops its own scratch tables; point DATABASE_URL at a scratch
+database rather than production.
+
+Usage:
+    python benchmarks/bench_anon_id_storage.py [--rows 200000] [--lookups 20000]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+from uuid import uuid4
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.db import connection, models, transaction  # noqa: E402
+from poll.fields import HexDigestField  # noqa: E402
+
+BATCH_SIZE = 5000
+
+
+def index_size(index_name):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT pg_relation_size(%s)", [index_name])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [index_name])
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+
+def run_layout(label, anon_field, rows, lookups):
+    option_field = models.UUIDField()
+    table = connection.ops.quote_name(f'bench_anon_id_{label}')
+    index_name = f'bench_anon_id_{label}_uniq'
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(
+            f"CREATE TABLE {table} ("
+            f"poll_option_id {option_field.db_type(connection)} NOT NULL, "
+            f"anon_id {anon_field.db_type(connection)} NOT NULL)"
+        )
+        cursor.execute(f"CREATE UNIQUE INDEX {index_name} ON {table} (poll_option_id, anon_id)")
+
+    options = [uuid4() for _ in range(16)]
+    params = [
+        (
+            option_field.get_db_prep_value(random.choice(options), connection),
+            anon_field.get_db_prep_value(
+                hashlib.sha256(f"voter-{i}".encode()).hexdigest(), connection
+            ),
+        )
+        for i in range(rows)
+    ]
+
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (poll_option_id, anon_id) VALUES (%s, %s)",
+                params[offset:offset + BATCH_SIZE],
+            )
+    insert_seconds = time.perf_counter() - start
+
+    probes = random.sample(params, min(lookups, rows))
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for probe in probes:
+            cursor.execute(
+                f"SELECT 1 FROM {table} WHERE poll_option_id = %s AND anon_id = %s", probe
+            )
+            cursor.fetchone()
+    lookup_seconds = time.perf_counter() - start
+
+    size = index_size(index_name)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {table}")
+
+    return {
+        'layout': label,
+        'index_bytes': size,
+        'inserts_per_sec': rows / insert_seconds,
+        'lookups_per_sec': len(probes) / lookup_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = [
+        run_layout('hex_text', models.CharField(max_length=255), args.rows, args.lookups),
+        run_layout('binary', HexDigestField(), args.rows, args.lookups),
+    ]
+
+    print(f"database={connection.vendor} rows={args.rows} lookups={args.lookups}")
+    print(f"{'layout':<10} {'index size':>14} {'inserts/s':>12} {'lookups/s':>12}")
+    for result in results:
+        size = f"{result['index_bytes'] / 1024 / 1024:.1f} MiB" if result['index_bytes'] else 'n/a'
+        print(
+            f"{result['layout']:<10} {size:>14} "
+            f"{result['inserts_per_sec']:>12,.0f} {result['lookups_per_sec']:>12,.0f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Measure worker cold start: import time of online_poll.wsgi / online_poll.asgi
+and time to the first response on the vote hot path.
+
+Each sample runs in a fresh interpreter using the settings from your
+environment, once with LAZY_ADMIN_AND_DOCS off and once with it on. Point
+DATABASE_URL at a migrated scratch database.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--warm-up] [--top-imports 15]
+"""
+import argparse
+import asyncio
+import importlib
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported once the docs or admin are used
+DEFERRED_MODULES = ['drf_yasg.generators', 'drf_yasg.views', 'django.contrib.auth.admin']
+
+
+def _host():
+    from django.conf import settings
+
+    host = next((host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+    return host.lstrip('.')
+
+
+def _first_wsgi_response(application, path):
+    status = []
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': _host(),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+    }
+    body = b''.join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+    return int(status[0].split()[0]), body
+
+
+def _first_asgi_response(application, path):
+    messages = []
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'headers': [(b'host', _host().encode())],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+    async def run():
+        request_sent = False
+        finished = asyncio.Event()
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Django listens for a disconnect until the response is complete
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                finished.set()
+
+        await application(scope, receive, send)
+
+    asyncio.run(run())
+    start = next(message for message in messages if message['type'] == 'http.response.start')
+    return start['status'], b''.join(message.get('body', b'') for message in messages)
+
+
+def run_child(interface, path):
+    """Runs inside the fresh interpreter and prints one JSON sample."""
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+
+    started = time.perf_counter()
+    module = importlib.import_module(f'online_poll.{interface}')
+    imported = time.perf_counter()
+
+    respond = _first_wsgi_response if interface == 'wsgi' else _first_asgi_response
+    status, _ = respond(module.application, path)
+    responded = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'first_response_ms': (responded - imported) * 1000,
+        'status': status,
+        'modules': len(sys.modules),
+        'deferred_loaded': [name for name in DEFERRED_MODULES if name in sys.modules],
+    }))
+
+
+def sample(interface, path, lazy, warm_up, importtime=False):
+    env = dict(os.environ, LAZY_ADMIN_AND_DOCS=str(lazy), WARM_UP_ON_START=str(warm_up))
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += [os.path.abspath(__file__), '--child', interface, '--path', path]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def top_imports(stderr, count):
+    """Parse `-X importtime` output into the `count` slowest top-level imports."""
+    totals = []
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if match and len(match.group(2)) == 1:
+            totals.append((int(match.group(1)), match.group(3)))
+    return sorted(totals, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--interfaces', nargs='+', default=['wsgi', 'asgi'], choices=['wsgi', 'asgi'])
+    parser.add_argument('--path', default=f'/api/polls/{uuid4()}/results/',
+                        help='Hot-path URL requested as the first response.')
+    parser.add_argument('--warm-up', action='store_true',
+                        help='Set WARM_UP_ON_START so warm-up runs during import.')
+    parser.add_argument('--top-imports', type=int, default=0,
+                        help='Also list the N slowest top-level imports of wsgi.py.')
+    parser.add_argument('--child', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    for interface in args.interfaces:
+        for lazy in (False, True):
+            samples = [sample(interface, args.path, lazy, args.warm_up)[0] for _ in range(args.runs)]
+            import_ms = statistics.median(s['import_ms'] for s in samples)
+            first_ms = statistics.median(s['first_response_ms'] for s in samples)
+            print(
+                f"{interface} lazy={str(lazy):<5} import {import_ms:7.1f} ms  "
+                f"first response {first_ms:7.1f} ms  total {import_ms + first_ms:7.1f} ms  "
+                f"status {samples[-1]['status']}  modules {samples[-1]['modules']}  "
+                f"deferred loaded: {', '.join(samples[-1]['deferred_loaded']) or 'none'}"
+            )
+
+    if args.top_imports:
+        for lazy in (False, True):
+            _, stderr = sample('wsgi', args.path, lazy, args.warm_up, importtime=True)
+            print(f"\nSlowest imports, lazy={lazy}:")
+            for micros, module in top_imports(stderr, args.top_imports):
+                print(f"  {micros / 1000:7.1f} ms  {module}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure creator logins per second through /api/auth/login/ at one or more
+PASSWORD_HASH_ITERATIONS settings, counting password hashes per login.
+
+Creates its own users in the configured database; point DATABASE_URL at a
+migrated scratch database.
+
+Usage:
+    python benchmarks/bench_login.py [--logins 50] [--threads 4] [--iterations 1000000,600000]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from poll.hashers import ConfigurablePBKDF2PasswordHasher  # noqa: E402
+from poll.models import CustomUser  # noqa: E402
+
+PASSWORD = 'bench-password-123'
+
+
+def run(iterations, logins, threads):
+    settings.PASSWORD_HASH_ITERATIONS = iterations
+    emails = [f'login-{uuid4().hex}@bench.invalid' for _ in range(threads)]
+    for email in emails:
+        CustomUser.objects.create_user(email=email, password=PASSWORD)
+
+    hashes = 0
+    verify = ConfigurablePBKDF2PasswordHasher.verify
+
+    def counting_verify(self, password, encoded):
+        nonlocal hashes
+        hashes += 1
+        return verify(self, password, encoded)
+
+    def login(i):
+        response = Client().post(
+            '/api/auth/login/', {'email': emails[i % threads], 'password': PASSWORD},
+            content_type='application/json',
+        )
+        assert response.status_code == 200, response.content
+
+    ConfigurablePBKDF2PasswordHasher.verify = counting_verify
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+    finally:
+        ConfigurablePBKDF2PasswordHasher.verify = verify
+
+    print(
+        f"{iterations:>10,} iterations  {logins / elapsed:8.1f} logins/s  "
+        f"{elapsed / logins * 1000:8.1f} ms/login  {hashes / logins:.1f} hashes/login"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--iterations', default=str(settings.PASSWORD_HASH_ITERATIONS),
+                        help='Comma-separated PASSWORD_HASH_ITERATIONS values to compare.')
+    args = parser.parse_args()
+
+    for iterations in args.iterations.split(','):
+        run(int(iterations), args.logins, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Populate a scratch database with synthetic polls and report the query plan
+and latency of one page of the poll listing for each filter, fetched the way
+the endpoint does it (poll_page: page of keys, then those rows and options).
+
+Run `python manage.py migrate` against a scratch DATABASE_URL first. Existing
+benchmark polls are reused when the table already holds enough of them.
+
+Usage:
+    python benchmarks/bench_poll_listing.py [--polls 1000000] [--creators 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from poll.models import CustomUser, Poll  # noqa: E402
+from poll.services.poll_service import LISTING_ORDERING, poll_page  # noqa: E402
+
+BATCH_SIZE = 10_000
+PAGE_SIZE = 50
+EMAIL_DOMAIN = 'bench.invalid'
+
+
+def populate(n_polls, n_creators, seed):
+    rng = random.Random(seed)
+    creators = list(CustomUser.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}'))
+    if len(creators) < n_creators:
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'creator-{uuid4().hex}@{EMAIL_DOMAIN}', password='!')
+            for _ in range(n_creators - len(creators))
+        ])
+        creators = list(CustomUser.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}'))
+
+    existing = Poll.objects.filter(creator__email__endswith=f'@{EMAIL_DOMAIN}').count()
+    now = timezone.now()
+    for offset in range(existing, n_polls, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, n_polls - offset)):
+            created = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 730))
+            batch.append(Poll(
+                creator=rng.choice(creators),
+                title='Benchmark poll',
+                is_active=rng.random() < 0.8,
+                expires_at=created + timedelta(days=rng.randrange(1, 60)) if rng.random() < 0.7 else None,
+            ))
+        with transaction.atomic():
+            created_polls = Poll.objects.bulk_create(batch)
+            # auto_now_add ignores explicit values, so spread created_at afterwards
+            for poll in created_polls:
+                poll.created_at = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 730))
+            Poll.objects.bulk_update(created_polls, ['created_at'])
+        print(f"  inserted {offset + len(batch):,} polls", end='\r', flush=True)
+    print()
+
+    # Refresh planner statistics so plans reflect the populated table
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(Poll._meta.db_table)}")
+    return creators
+
+
+def listing_queries(creator, now):
+    active = Q(is_active=True) & (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+    month_ago = now - timedelta(days=30)
+    polls = Poll.objects.prefetch_related('options')
+    return {
+        'all polls, newest first': polls,
+        'my polls': polls.filter(creator=creator),
+        'my active polls': polls.filter(active, creator=creator),
+        'my expired polls': polls.filter(creator=creator, expires_at__lte=now),
+        'my polls, last 30 days': polls.filter(creator=creator, created_at__gte=month_ago),
+        'all active polls': polls.filter(active),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--polls', type=int, default=1_000_000)
+    parser.add_argument('--creators', type=int, default=1_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    creators = populate(args.polls, args.creators, args.seed)
+    creator = creators[0]
+    now = timezone.now()
+
+    for label, queryset in listing_queries(creator, now).items():
+        _, cursor = poll_page(queryset, PAGE_SIZE)
+        for page_label, page_cursor in (('first page', None), ('second page', cursor)):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                poll_page(queryset.all(), PAGE_SIZE, page_cursor)
+                timings.append(time.perf_counter() - start)
+            median = sorted(timings)[len(timings) // 2] * 1000
+            print(f"\n== {label}, {page_label}: median {median:.2f} ms per page of {PAGE_SIZE}")
+
+        # First step of a page: the keys, which the listing indexes cover
+        keys = queryset.order_by(*LISTING_ORDERING).values_list('created_at', 'poll_id')[:PAGE_SIZE]
+        print(keys.explain())
+
+
+if __name__ == '__main__':
+    main()
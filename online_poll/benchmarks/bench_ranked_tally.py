@@ -0,0 +1,115 @@
+"""
+Benchmark the instant-runoff tally engine on synthetic ranked ballots.
+
+By default only the in-memory tally is timed. With --database the ballots
+are also stored as Vote rows of a new poll in the configured database, and
+the runoff is timed end to end the way the endpoint computes it
+(load_ballots + instant_runoff) against the 1 s target for 1M ballots;
+point DATABASE_URL at a migrated scratch database.
+
+Usage:
+    python benchmarks/bench_ranked_tally.py [--ballots 1000000] [--options 12] [--max-rank 5] [--database]
+"""
+import argparse
+import os
+import sys
+import time
+
+import django
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from poll.models import Poll, PollOption, Vote  # noqa: E402
+from poll.services.tally_service import NO_PREFERENCE, instant_runoff, load_ballots  # noqa: E402
+
+BATCH_SIZE = 10_000
+TARGET_SECONDS = 1.0
+TARGET_BALLOTS = 1_000_000
+
+
+def make_ballots(n_ballots, n_options, max_rank, seed):
+    rng = np.random.default_rng(seed)
+    # Skewed popularity so the race runs through several elimination rounds
+    weights = rng.random((n_ballots, n_options)) ** np.linspace(0.5, 2.0, n_options)
+    ballots = np.argsort(-weights, axis=1)[:, :max_rank].astype(np.int32)
+    lengths = rng.integers(1, max_rank + 1, size=n_ballots)
+    ballots[np.arange(max_rank) >= lengths[:, None]] = NO_PREFERENCE
+    return ballots
+
+
+def store_ballots(ballots, n_options):
+    """Create a ranked poll holding `ballots` as Vote rows; return the poll."""
+    poll = Poll.objects.create(title="Ranked tally benchmark", poll_type=Poll.RANKED_CHOICE)
+    options = PollOption.objects.bulk_create([PollOption(poll=poll, text=f"Option {i}") for i in range(n_options)])
+    for start in range(0, len(ballots), BATCH_SIZE):
+        votes = [
+            Vote(poll_option=options[option], anon_id=f"{start + row:064x}", rank=rank)
+            for row, preferences in enumerate(ballots[start:start + BATCH_SIZE])
+            for rank, option in enumerate(preferences.tolist(), start=1)
+            if option != NO_PREFERENCE
+        ]
+        with transaction.atomic():
+            Vote.objects.bulk_create(votes, batch_size=BATCH_SIZE)
+        print(f"  stored {min(start + BATCH_SIZE, len(ballots)):,} ballots", end='\r', flush=True)
+    print()
+    return poll
+
+
+def time_end_to_end(poll, repeat):
+    loads, tallies = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        option_ids, ballots = load_ballots(poll)
+        loaded = time.perf_counter()
+        winner, rounds = instant_runoff(ballots, len(option_ids))
+        loads.append(loaded - start)
+        tallies.append(time.perf_counter() - loaded)
+    totals = sorted(load + tally for load, tally in zip(loads, tallies))
+    return winner, len(rounds), sorted(loads), sorted(tallies), totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ballots', type=int, default=1_000_000)
+    parser.add_argument('--options', type=int, default=12)
+    parser.add_argument('--max-rank', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', action='store_true', help='Also time load + tally from the database.')
+    args = parser.parse_args()
+
+    ballots = make_ballots(args.ballots, args.options, args.max_rank, args.seed)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        winner, rounds = instant_runoff(ballots, args.options)
+        timings.append(time.perf_counter() - start)
+
+    print(f"ballots={args.ballots} options={args.options} max_rank={args.max_rank}")
+    print(f"winner=option[{winner}] rounds={len(rounds)} exhausted={rounds[-1]['exhausted']}")
+    print(f"best={min(timings):.3f}s median={sorted(timings)[len(timings) // 2]:.3f}s")
+
+    if not args.database:
+        return
+
+    poll = store_ballots(ballots, args.options)
+    db_winner, n_rounds, loads, tallies, totals = time_end_to_end(poll, args.repeat)
+    if (db_winner, n_rounds) != (winner, len(rounds)):
+        sys.exit(f"database tally differs: winner={db_winner} rounds={n_rounds}")
+
+    middle = args.repeat // 2
+    budget = TARGET_SECONDS * args.ballots / TARGET_BALLOTS
+    print(f"\nend to end from the database ({poll.poll_id}):")
+    print(f"load  best={loads[0]:.3f}s median={loads[middle]:.3f}s")
+    print(f"tally best={tallies[0]:.3f}s median={tallies[middle]:.3f}s")
+    print(f"total best={totals[0]:.3f}s median={totals[middle]:.3f}s "
+          f"({'within' if totals[middle] <= budget else 'over'} the {budget:.2f}s budget "
+          f"for {args.ballots:,} ballots)")
+
+
+if __name__ == '__main__':
+    main()
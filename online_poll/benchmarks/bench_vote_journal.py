@@ -0,0 +1,78 @@
+"""
+Measure vote journal throughput: fsync-acknowledged appends per second from
+concurrent request threads, then applier throughput into the database.
+
+Writes its journal to a temporary directory and creates its own poll in the
+configured database; point DATABASE_URL at a migrated scratch database.
+Appends claim their device in the cache and never touch the database, so
+the first figure is bounded by fsync alone.
+
+Usage:
+    python benchmarks/bench_vote_journal.py [--ballots 20000] [--threads 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from poll.models import Poll, PollOption  # noqa: E402
+from poll.services import journal_service  # noqa: E402
+from poll.utils import generate_device_anon_id  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ballots', type=int, default=20_000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=settings.VOTE_JOURNAL_APPLY_BATCH)
+    args = parser.parse_args()
+
+    poll = Poll.objects.create(title="Vote journal benchmark", allow_anonymous=True)
+    options = [PollOption.objects.create(poll=poll, text=f"Option {i}") for i in range(4)]
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        settings.VOTE_JOURNAL_DIR = journal_dir
+        journal_service.reset_journal()
+
+        fsyncs = 0
+        real_fsync = os.fsync
+
+        def counting_fsync(fd):
+            nonlocal fsyncs
+            fsyncs += 1
+            real_fsync(fd)
+
+        def accept(i):
+            anon_id = generate_device_anon_id(f"device-{i}", str(poll.poll_id))
+            journal_service.journal_ballot(poll, [options[i % len(options)]], anon_id=anon_id)
+
+        os.fsync = counting_fsync
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            list(executor.map(accept, range(args.ballots)))
+        elapsed = time.perf_counter() - start
+        os.fsync = real_fsync
+
+        print(
+            f"journal: {args.ballots / elapsed:,.0f} acknowledged ballots/s with {args.threads} threads, "
+            f"{args.ballots / max(fsyncs, 1):.1f} ballots per fsync"
+        )
+
+        start = time.perf_counter()
+        applied, rejected = journal_service.apply_journal(batch_size=args.batch_size, directory=journal_dir)
+        elapsed = time.perf_counter() - start
+        print(f"applier: {applied / elapsed:,.0f} ballots/s ({applied} applied, {rejected} rejected)")
+        journal_service.reset_journal()
+
+
+if __name__ == '__main__':
+    main()
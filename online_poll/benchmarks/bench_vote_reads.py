@@ -0,0 +1,100 @@
+"""
+Count database reads per controlled vote with the voter session served from
+the cache (as after voter_login) versus a cold cache that falls back to the
+Voter row.
+
+Creates its own polls and voters in the configured database; point
+DATABASE_URL at a migrated scratch database.
+
+Usage:
+    python benchmarks/bench_vote_reads.py [--voters 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+from poll.models import Poll, PollOption, Voter  # noqa: E402
+from poll.services.voter_session_service import cache_voter_session  # noqa: E402
+from poll.utils import generate_anon_id  # noqa: E402
+
+
+def create_poll(label, voters):
+    poll = Poll.objects.create(title=f"Vote reads benchmark ({label})")
+    option = PollOption.objects.create(poll=poll, text="Yes")
+    password = make_password('bench')
+    created = Voter.objects.bulk_create([
+        Voter(
+            poll=poll, email=f"voter{i}@bench.test", temp_password=password,
+            anon_id=generate_anon_id(f"voter{i}@bench.test", str(poll.poll_id)),
+        )
+        for i in range(voters)
+    ])
+    return poll, option, created
+
+
+def run(label, voters, cached):
+    poll, option, created = create_poll(label, voters)
+    client = Client()
+    url = f"/api/polls/{poll.poll_id}/vote/"
+
+    tokens = []
+    for voter in created:
+        if cached:
+            # What voter_login stores after checking the temporary password
+            cache_voter_session(voter)
+        token = AccessToken()
+        token['voter_id'] = str(voter.voter_id)
+        tokens.append(str(token))
+
+    selects, voter_selects, total, timings = [], [], [], []
+    for token in tokens:
+        if not cached:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.post(
+                url, {'poll_option': str(option.option_id), 'voter_token': token},
+                content_type='application/json',
+            )
+            timings.append(time.perf_counter() - start)
+        assert response.status_code == 201, response.content
+
+        statements = [query['sql'] for query in queries]
+        reads = [sql for sql in statements if sql.startswith('SELECT')]
+        selects.append(len(reads))
+        voter_selects.append(sum('"poll_voter"' in sql for sql in reads))
+        total.append(len(statements))
+
+    print(
+        f"{label:<12} SELECTs/vote {statistics.mean(selects):5.2f}  "
+        f"Voter SELECTs/vote {statistics.mean(voter_selects):5.2f}  "
+        f"queries/vote {statistics.mean(total):5.2f}  "
+        f"median {statistics.median(timings) * 1000:6.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--voters', type=int, default=500)
+    args = parser.parse_args()
+
+    run('cold cache', args.voters, cached=False)
+    run('after login', args.voters, cached=True)
+
+
+if __name__ == '__main__':
+    main()
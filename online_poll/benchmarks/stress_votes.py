@@ -0,0 +1,213 @@
+"""
+Stress the vote endpoint from many processes at once, then check that no
+voter or device ended up with two ballots and that every tally matches the
+Vote rows.
+
+Each invited voter and each anonymous device is sent to --overlap different
+processes, each picking a random option, so only the database-side guards
+(the conditional has_voted claim and the AnonymousBallot constraint) can
+keep the ballots unique: every process has its own cache and Bloom filter.
+Reports sustained accepted votes/s, attempt latency and the error rate per
+error type, and exits with status 1 if any request failed or any check
+fails.
+
+Creates its own polls in the configured database; point DATABASE_URL at a
+migrated scratch database. A file-backed SQLite database works, e.g.
+DATABASE_URL=sqlite:////tmp/stress.db?timeout=30, but serialises writers;
+use PostgreSQL to measure lock contention the way production sees it.
+
+Usage:
+    python benchmarks/stress_votes.py [--processes 8] [--polls 4] [--voters 200] [--devices 200] [--overlap 3]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client  # noqa: E402
+from poll.models import AnonymousBallot, Poll, PollOption, Vote, Voter  # noqa: E402
+from poll.services.turnout_service import turnout  # noqa: E402
+from poll.sharding import poll_shard  # noqa: E402
+from poll.utils import generate_anon_id  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+N_OPTIONS = 4
+
+
+def populate(n_polls, n_voters):
+    """Create single-choice polls with invited voters; return [(poll_id, option_ids, voter_tokens)]."""
+    polls = []
+    for i in range(n_polls):
+        poll = Poll.objects.create(title=f"Stress poll {i}", allow_anonymous=True)
+        with poll_shard(poll.poll_id):
+            options = PollOption.objects.bulk_create([
+                PollOption(poll=poll, text=f"Option {j}") for j in range(N_OPTIONS)
+            ])
+            voters = Voter.objects.bulk_create([
+                Voter(
+                    poll=poll, email=f"voter{j}@stress.invalid", temp_password='!',
+                    anon_id=generate_anon_id(f"voter{j}@stress.invalid", str(poll.poll_id)),
+                )
+                for j in range(n_voters)
+            ])
+            Poll.objects.filter(poll_id=poll.poll_id).update(voters_count=len(voters))
+
+        tokens = []
+        for voter in voters:
+            # Same claims as voter_login, without paying for a password hash
+            token = AccessToken()
+            token['voter_id'] = str(voter.voter_id)
+            token['poll_id'] = str(poll.poll_id)
+            tokens.append(str(token))
+        polls.append((str(poll.poll_id), [str(option.option_id) for option in options], tokens))
+    return polls
+
+
+def plan(polls, n_devices, n_processes, overlap, seed):
+    """
+    Deal every ballot to `overlap` different processes, each copy with its
+    own random option. Ballots are shuffled once and dealt in that order, so
+    the copies of a ballot sit at about the same position in each process's
+    queue and are sent at about the same time.
+    """
+    rng = random.Random(seed)
+    ballots = []
+    for poll_id, option_ids, tokens in polls:
+        ballots += [(poll_id, option_ids, {'voter_token': token}) for token in tokens]
+        ballots += [(poll_id, option_ids, {'device_token': f"stress-device-{i}"}) for i in range(n_devices)]
+
+    rng.shuffle(ballots)
+
+    work = [[] for _ in range(n_processes)]
+    for index, (poll_id, option_ids, credentials) in enumerate(ballots):
+        for copy in range(overlap):
+            work[(index + copy) % n_processes].append(
+                (poll_id, {'poll_option': rng.choice(option_ids), **credentials})
+            )
+    return work
+
+
+def worker(attempts, barrier, results):
+    # Server errors are counted below; the request logger would print each one
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    client = Client(raise_request_exception=False)
+    outcomes = Counter()
+    latencies = []
+
+    barrier.wait()
+    started = time.time()
+    for poll_id, payload in attempts:
+        start = time.perf_counter()
+        try:
+            response = client.post(f'/api/polls/{poll_id}/vote/', payload, content_type='application/json')
+            outcome = {201: 'accepted', 400: 'rejected'}.get(response.status_code, f'http_{response.status_code}')
+        except Exception as e:
+            outcome = type(e).__name__
+        latencies.append(time.perf_counter() - start)
+        outcomes[outcome] += 1
+    results.put((started, time.time(), outcomes, latencies))
+    connections.close_all()
+
+
+def check(polls, accepted, errors, planned):
+    """
+    Return a list of (check, ok, detail) for the polls created by this run:
+    `accepted` and `errors` count the responses, `planned` the distinct
+    ballots sent, each of which must have been accepted exactly once.
+    """
+    checks = [
+        ('no request failed', errors == 0, f"{errors} errors"),
+        ('every planned ballot accepted once', accepted == planned, f"{accepted} accepted, {planned} planned"),
+    ]
+    double = unclaimed = wrong_tally = wrong_turnout = rows = 0
+    for poll_id, _, _ in polls:
+        with poll_shard(poll_id):
+            votes = Vote.objects.filter(poll_option__poll_id=poll_id)
+            rows += votes.count()
+            double += votes.values('anon_id').annotate(n=Count('vote_id')).filter(n__gt=1).count()
+
+            actual = dict(votes.values_list('poll_option_id').annotate(n=Count('vote_id')))
+            for option_id, stored in PollOption.objects.filter(poll_id=poll_id).values_list('option_id', 'votes_count'):
+                wrong_tally += stored != actual.get(option_id, 0)
+
+            poll = Poll.objects.get(poll_id=poll_id)
+            voted = Voter.objects.filter(poll_id=poll_id, has_voted=True).count()
+            devices = AnonymousBallot.objects.filter(poll_id=poll_id).count()
+            counted = turnout(poll, settings.TURNOUT_MAX_MINUTES)
+            unclaimed += votes.count() != voted + devices
+            wrong_turnout += counted['voted'] != voted or counted['recent_votes'] != voted + devices
+
+    checks.append(('one ballot per voter and device', double == 0, f"{double} voters or devices with two"))
+    checks.append(('every ballot claimed a voter or device', unclaimed == 0, f"{unclaimed} polls off"))
+    checks.append(('option tallies match vote rows', wrong_tally == 0, f"{wrong_tally} options off"))
+    checks.append(('turnout counters match', wrong_turnout == 0, f"{wrong_turnout} polls off"))
+    checks.append(('accepted responses match vote rows', accepted == rows, f"{accepted} accepted, {rows} rows"))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--polls', type=int, default=4)
+    parser.add_argument('--voters', type=int, default=200, help='Invited voters per poll.')
+    parser.add_argument('--devices', type=int, default=200, help='Anonymous devices per poll.')
+    parser.add_argument('--overlap', type=int, default=3, help='Processes that try each ballot.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    polls = populate(args.polls, args.voters)
+    work = plan(polls, args.devices, args.processes, min(args.overlap, args.processes), args.seed)
+    connections.close_all()
+
+    # Fresh interpreters: no connection or cache state inherited from this one
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(args.processes)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(attempts, barrier, results)) for attempts in work]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    window = max(end for _, end, _, _ in reports) - min(start for start, _, _, _ in reports)
+    outcomes = sum((outcome for _, _, outcome, _ in reports), Counter())
+    latencies = [latency for _, _, _, worker_latencies in reports for latency in worker_latencies]
+    attempts = sum(outcomes.values())
+    errors = attempts - outcomes['accepted'] - outcomes['rejected']
+    percentiles = statistics.quantiles(latencies, n=100)
+    p50, p99 = percentiles[49], percentiles[98]
+
+    print(f"{args.processes} processes, {attempts:,} attempts in {window:.1f}s")
+    print(f"  accepted   {outcomes['accepted'] / window:10,.1f} votes/s  ({outcomes['accepted']:,})")
+    print(f"  attempts   {attempts / window:10,.1f} /s  p50 {p50 * 1000:.1f} ms  p99 {p99 * 1000:.1f} ms")
+    print(f"  rejected   {outcomes['rejected'] / attempts:10.2%}  (duplicates, expected)")
+    print(f"  errors     {errors / attempts:10.2%}")
+    for outcome, count in outcomes.most_common():
+        if outcome not in ('accepted', 'rejected'):
+            print(f"    {outcome:<20} {count:,}")
+
+    failed = False
+    planned = args.polls * (args.voters + args.devices)
+    for name, ok, detail in check(polls, outcomes['accepted'], errors, planned):
+        failed |= not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name} ({detail})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""
+Admin site routes. With LAZY_ADMIN_AND_DOCS the admin app is installed via
+SimpleAdminConfig, so ModelAdmin registration is deferred to this import.
+"""
+from django.contrib import admin
+from django.urls import path
+
+admin.autodiscover()
+
+urlpatterns = [
+    path('', admin.site.urls),
+]
@@ -0,0 +1,44 @@
+"""
+Swagger / ReDoc routes, mounted under /api/ by the root URLconf. Kept in a
+separate module so production workers can defer importing drf_yasg's
+generator and UI machinery until the docs are first requested.
+"""
+from django.conf import settings
+from django.urls import path, reverse_lazy
+from django.views.decorators.cache import cache_control
+from django.views.generic import TemplateView
+from online_poll.schema import API_INFO, API_URL, precomputed_schema
+
+if settings.OPENAPI_RUNTIME_SCHEMA:
+    # Development: rebuild the schema on every docs request
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    schema_view = get_schema_view(
+        API_INFO,
+        public=True,
+        authentication_classes=[JWTAuthentication],
+        permission_classes=(permissions.AllowAny,),
+        url=API_URL,
+    )
+    urlpatterns = [
+        path('docs', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+        path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    ]
+else:
+    # The UI pages are static shells that load the prebuilt schema file in
+    # the browser; the schema generator never runs in the server
+    def docs_ui(template_name):
+        view = TemplateView.as_view(
+            template_name=template_name,
+            extra_context={'title': API_INFO.title, 'spec_url': reverse_lazy('schema-json')},
+        )
+        return cache_control(public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)(view)
+
+    urlpatterns = [
+        path('schema.json', precomputed_schema, {'file_format': 'json'}, name='schema-json'),
+        path('schema.yaml', precomputed_schema, {'file_format': 'yaml'}, name='schema-yaml'),
+        path('docs', docs_ui('docs/swagger-ui.html'), name='schema-swagger-ui'),
+        path('redoc/', docs_ui('docs/redoc.html'), name='schema-redoc'),
+    ]
@@ -0,0 +1,92 @@
+"""
+OpenAPI schema for the API docs.
+
+In development the schema is generated by drf_yasg on every request. In
+production it is generated once at deploy time by
+`manage.py build_openapi_schema` and served from disk with long-lived
+caching headers.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag, require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from online_poll.settings import env
+
+API_INFO = openapi.Info(
+    title="Online Poll API",
+    default_version='v1',
+    description="API documentation for the Online Poll application",
+)
+
+API_URL = env('BASE_URL_PROD') if env.str('ENV', 'development') == 'production' else env('BASE_URL_DEV')
+
+SCHEMA_FORMATS = {
+    'json': ('openapi.json', 'application/json'),
+    'yaml': ('openapi.yaml', 'application/yaml'),
+}
+
+
+def schema_path(file_format, schema_dir=None):
+    filename, _ = SCHEMA_FORMATS[file_format]
+    return os.path.join(schema_dir or settings.OPENAPI_SCHEMA_DIR, filename)
+
+
+def build_schema():
+    """Generate the full public schema by walking every registered endpoint."""
+    generator = OpenAPISchemaGenerator(API_INFO, url=API_URL)
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema_files(schema_dir):
+    """
+    Write the schema to `schema_dir` in every format of SCHEMA_FORMATS.
+    Each file is replaced atomically so a running server never reads a
+    partial document. Returns the written paths.
+    """
+    os.makedirs(schema_dir, exist_ok=True)
+    schema = build_schema()
+    codecs = {
+        'json': OpenAPICodecJson(validators=[]),
+        'yaml': OpenAPICodecYaml(validators=[]),
+    }
+
+    paths = []
+    for file_format, codec in codecs.items():
+        path = schema_path(file_format, schema_dir)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            handle.write(codec.encode(schema))
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+@lru_cache(maxsize=None)
+def load_schema_file(file_format):
+    """Return (content, etag) of a prebuilt schema file, read once per process."""
+    try:
+        with open(schema_path(file_format), 'rb') as handle:
+            content = handle.read()
+    except FileNotFoundError:
+        raise Http404("OpenAPI schema has not been built; run `manage.py build_openapi_schema`.")
+    return content, hashlib.sha256(content).hexdigest()[:32]
+
+
+def _schema_etag(request, file_format):
+    return load_schema_file(file_format)[1]
+
+
+@require_safe
+@etag(_schema_etag)
+def precomputed_schema(request, file_format):
+    content, _ = load_schema_file(file_format)
+    response = HttpResponse(content, content_type=SCHEMA_FORMATS[file_format][1])
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
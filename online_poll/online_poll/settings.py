@@ -52,9 +52,23 @@ INSTALLED_APPS = [
     'corsheaders',
     'rest_framework',
     'rest_framework_simplejwt',
+    'django_filters',
     'drf_yasg',
 ]
 
+# Defer importing the admin and the API docs until they are first requested,
+# so new workers answer votes sooner. ModelAdmin autodiscovery then happens
+# on the first /admin/ request instead of at startup.
+LAZY_ADMIN_AND_DOCS = env.bool('LAZY_ADMIN_AND_DOCS', default=not DEBUG)
+if LAZY_ADMIN_AND_DOCS:
+    INSTALLED_APPS[0] = 'django.contrib.admin.apps.SimpleAdminConfig'
+
+# Run online_poll.warmup.warm_up() in each worker as wsgi.py / asgi.py load,
+# before the first request is accepted. Leave it off with gunicorn --preload,
+# where the application loads before the fork, and call warm_up() from a
+# post_fork hook instead
+WARM_UP_ON_START = env.bool('WARM_UP_ON_START', default=False)
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,7 +100,7 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'poll.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -104,11 +118,91 @@ SWAGGER_SETTINGS = {
     "USE_SESSION_AUTH": False,
 }
 
+# OpenAPI schema: generated per request only when OPENAPI_RUNTIME_SCHEMA is
+# on (development). Otherwise the docs load the files written at deploy time
+# by `manage.py build_openapi_schema`.
+OPENAPI_RUNTIME_SCHEMA = env.bool('OPENAPI_RUNTIME_SCHEMA', default=DEBUG)
+OPENAPI_SCHEMA_DIR = env.str('OPENAPI_SCHEMA_DIR', default=str(BASE_DIR / 'openapi'))
+OPENAPI_SCHEMA_MAX_AGE = env.int('OPENAPI_SCHEMA_MAX_AGE', default=86400)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=12),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_CHUNK_SIZE = env.int('EXPORT_CHUNK_SIZE', default=2000)
+
+# Bulk poll import limits
+POLL_BULK_MAX_ITEMS = env.int('POLL_BULK_MAX_ITEMS', default=1000)
+POLL_BULK_BATCH_SIZE = env.int('POLL_BULK_BATCH_SIZE', default=1000)
+
+# Per-poll Bloom filter used to pre-check anonymous (device-keyed) votes.
+# Each process keeps its own filter; the counters behind /anonymous-stats/
+# are kept in the cache, so they cover every worker only if CACHE_URL is a
+# shared cache (with the default locmem cache they show one worker's view)
+ANON_BLOOM_CAPACITY = env.int('ANON_BLOOM_CAPACITY', default=1_000_000)
+ANON_BLOOM_ERROR_RATE = env.float('ANON_BLOOM_ERROR_RATE', default=0.01)
+ANON_BLOOM_MAX_POLLS = env.int('ANON_BLOOM_MAX_POLLS', default=64)
+
+# Archival of closed polls (see `manage.py archive_closed_polls`)
+POLL_ARCHIVE_DIR = env.str('POLL_ARCHIVE_DIR', default=str(BASE_DIR / 'archives'))
+POLL_ARCHIVE_RETENTION_DAYS = env.int('POLL_ARCHIVE_RETENTION_DAYS', default=90)
+POLL_ARCHIVE_CHUNK_SIZE = env.int('POLL_ARCHIVE_CHUNK_SIZE', default=1000)
+
+# Cursor-paginated poll listing
+POLL_LIST_PAGE_SIZE = env.int('POLL_LIST_PAGE_SIZE', default=50)
+POLL_LIST_MAX_PAGE_SIZE = env.int('POLL_LIST_MAX_PAGE_SIZE', default=200)
+
+# Paginated / top-k poll results
+RESULTS_PAGE_SIZE = env.int('RESULTS_PAGE_SIZE', default=50)
+RESULTS_MAX_PAGE_SIZE = env.int('RESULTS_MAX_PAGE_SIZE', default=1000)
+# Most polls one batch results request may ask for
+RESULTS_BATCH_MAX_POLLS = env.int('RESULTS_BATCH_MAX_POLLS', default=200)
+# Seconds an open ranked poll's instant-runoff breakdown is reused before
+# its ballots are reloaded (closed polls are cached until evicted)
+RANKED_TALLY_CACHE_TTL = env.int('RANKED_TALLY_CACHE_TTL', default=10)
+
+# Seconds an authenticated user is served from the cache on read-only
+# requests. Saving or deleting the user drops the entry, but only in the
+# cache of the process that did it, and QuerySet.update() skips that
+# entirely. The TTL bounds how long a deactivated user can keep reading
+# in those cases, so keep it short unless CACHE_URL is a shared cache.
+AUTH_USER_CACHE_TTL = env.int('AUTH_USER_CACHE_TTL', default=10)
+
+# Seconds a voter's session (poll, anon_id, has_voted) stays cached after
+# voter_login; a miss falls back to the Voter row
+VOTER_SESSION_TTL = env.int('VOTER_SESSION_TTL', default=3600)
+
+# Vote ingestion: 'database' writes each vote in its request; 'journal'
+# appends it to a local fsync'd journal, acknowledges with 202, and leaves
+# the inserts to `manage.py apply_vote_journal`
+VOTE_INGESTION = env.str('VOTE_INGESTION', default='database')
+VOTE_JOURNAL_DIR = env.str('VOTE_JOURNAL_DIR', default=str(BASE_DIR / 'journal'))
+VOTE_JOURNAL_SEGMENT_BYTES = env.int('VOTE_JOURNAL_SEGMENT_BYTES', default=64 * 1024 * 1024)
+VOTE_JOURNAL_APPLY_BATCH = env.int('VOTE_JOURNAL_APPLY_BATCH', default=1000)
+# Seconds a journaled voter or device stays claimed in the cache. Claims
+# stop repeat ballots only across workers that share CACHE_URL; repeats
+# that get past them are acknowledged and then rejected by the applier, so
+# keep this longer than the applier's lag
+VOTE_JOURNAL_CLAIM_TTL = env.int('VOTE_JOURNAL_CLAIM_TTL', default=24 * 60 * 60)
+
+# Voter upload attributes a poll may keep for segmented results
+POLL_MAX_SEGMENT_ATTRIBUTES = env.int('POLL_MAX_SEGMENT_ATTRIBUTES', default=5)
+
+# Admin changelists count exactly up to this many rows; beyond it they show
+# the planner's estimate (PostgreSQL, unfiltered) or "~limit"
+ADMIN_EXACT_COUNT_LIMIT = env.int('ADMIN_EXACT_COUNT_LIMIT', default=10000)
+
+# Turnout "votes in the last N minutes": default N, and the largest N, which
+# is also how long per-minute buckets are kept (see `manage.py reconcile_turnout`)
+TURNOUT_DEFAULT_MINUTES = env.int('TURNOUT_DEFAULT_MINUTES', default=15)
+TURNOUT_MAX_MINUTES = env.int('TURNOUT_MAX_MINUTES', default=1440)
+TURNOUT_RECONCILE_CHUNK_SIZE = env.int('TURNOUT_RECONCILE_CHUNK_SIZE', default=500)
+# Rows each minute's turnout counters are spread over; votes pick one at
+# random so they seldom update the same row
+TURNOUT_BUCKET_SLOTS = env.int('TURNOUT_BUCKET_SLOTS', default=8)
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 SIMPLE_JWT = {
@@ -127,6 +221,25 @@ DATABASES = {
     'default': env.db()
 }
 
+# Database aliases polls are spread over by consistent hashing of poll_id
+# (see poll/sharding.py). Each alias other than 'default' is configured from
+# <ALIAS>_DATABASE_URL; users and other global tables stay on 'default'.
+POLL_SHARDS = env.list('POLL_SHARDS', default=['default'])
+for _alias in POLL_SHARDS:
+    if _alias not in DATABASES:
+        DATABASES[_alias] = env.db(f'{_alias.upper()}_DATABASE_URL')
+
+DATABASE_ROUTERS = ['poll.sharding.PollShardRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# Defaults to a per-process memory cache. Point CACHE_URL at a shared cache
+# (e.g. redis://host:6379/1) so entries dropped by one worker, such as a
+# deactivated user, are dropped for every worker.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,6 +259,19 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 iterations for user and voter passwords. Lower it where logins must
+# be cheap (tests, load environments); hashes at another cost are upgraded
+# (or downgraded) to this one the next time the user logs in.
+PASSWORD_HASH_ITERATIONS = env.int('PASSWORD_HASH_ITERATIONS', default=1_000_000)
+
+PASSWORD_HASHERS = [
+    'poll.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -14,29 +14,29 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
-from rest_framework import permissions
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from online_poll.settings import env
+from django.conf import settings
+from django.urls import path, include, URLResolver
+from django.urls.resolvers import RoutePattern
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Online Poll API",
-        default_version='v1',
-        description="API documentation for the Online Poll application",
-    ),
-    public=True,
-    authentication_classes=[JWTAuthentication],
-    permission_classes=(permissions.AllowAny,),
-    url=env('BASE_URL_PROD') if env.str('ENV', 'development') == 'production' else env('BASE_URL_DEV'),
-)
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/', include('poll.urls')),
-    path('api/docs', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-]
+def lazy_include(route, urlconf_name):
+    """
+    Like path(route, include(urlconf_name)), except the module is imported
+    the first time a URL under `route` is resolved (or any URL is reversed)
+    rather than when this URLconf is loaded.
+    """
+    return URLResolver(RoutePattern(route, is_endpoint=False), urlconf_name)
+
+
+if settings.LAZY_ADMIN_AND_DOCS:
+    urlpatterns = [
+        path('api/', include('poll.urls')),
+        lazy_include('admin/', 'online_poll.admin_urls'),
+        lazy_include('api/', 'online_poll.docs_urls'),
+    ]
+else:
+    urlpatterns = [
+        path('admin/', include('online_poll.admin_urls')),
+        path('api/', include('poll.urls')),
+        path('api/', include('online_poll.docs_urls')),
+    ]
@@ -0,0 +1,76 @@
+"""
+Worker warm-up: pay the one-off costs of the vote hot path before a new
+worker starts taking traffic.
+"""
+import time
+from uuid import uuid4
+
+from django.db import connections
+from django.urls import Resolver404, get_resolver
+from rest_framework.settings import api_settings
+
+WARM_UP_PATHS = [
+    '/api/polls/',
+    '/api/polls/{poll_id}/',
+    '/api/polls/{poll_id}/vote/',
+    '/api/polls/{poll_id}/results/',
+    '/api/voters/login/',
+]
+
+DRF_CLASS_SETTINGS = [
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+]
+
+
+def prime_database():
+    """
+    Open each configured connection and run a trivial query, which loads the
+    driver and warms DNS/TLS session caches, then close them all: a process
+    that forks workers afterwards must not hand them its open sockets.
+    """
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    connections.close_all()
+
+
+def prime_url_resolution():
+    """
+    Load the root URLconf, which imports the poll views and serializers, and
+    resolve each hot path once so its patterns are compiled. Lazily included
+    URLconfs (admin, docs) are not touched.
+    """
+    resolver = get_resolver()
+    poll_id = uuid4()
+    for path in WARM_UP_PATHS:
+        try:
+            resolver.resolve(path.format(poll_id=poll_id))
+        except Resolver404:
+            pass
+
+
+def prime_rest_framework():
+    """Import the authentication, permission, renderer and parser classes."""
+    for name in DRF_CLASS_SETTINGS:
+        getattr(api_settings, name)
+
+
+WARM_UP_STEPS = [
+    ('database', prime_database),
+    ('urls', prime_url_resolution),
+    ('rest_framework', prime_rest_framework),
+]
+
+
+def warm_up():
+    """Run every warm-up step and return {step: milliseconds}."""
+    timings = {}
+    for name, step in WARM_UP_STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
@@ -1,3 +1,249 @@
+from uuid import UUID
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .models import Poll, PollOption, Voter, Vote
+from .services.poll_service import decode_listing_cursor, encode_listing_cursor
+from .services.results_service import InvalidCursor
+
+CURSOR_VAR = 'after'
+
+
+def estimated_count(queryset):
+    """
+    Row count of an unfiltered table from the planner statistics, or None
+    when the backend keeps none (anything but PostgreSQL) or the queryset is
+    filtered.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an exact COUNT(*) over a large table. Counts
+    past ADMIN_EXACT_COUNT_LIMIT come from the planner statistics when the
+    changelist is unfiltered, and are otherwise capped at the limit.
+    """
+
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate > limit:
+            self.is_estimate = True
+            return estimate
+
+        # COUNT over a LIMIT subquery stops reading after limit + 1 rows
+        count = self.object_list.order_by()[:limit + 1].count()
+        if count > limit:
+            self.is_estimate = True
+            return limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paged by key instead of OFFSET, newest rows first: each page
+    is the next `list_per_page` rows after the (created_at, pk) of the last
+    row of the previous one, so a deep page costs the same index range scan
+    as the first. The model needs an index on (-created_at, pk), and one
+    led by the foreign key of each list filter.
+    """
+
+    cursor = None
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # The cursor is not a field lookup; keep it out of filters and links
+        if CURSOR_VAR in self.params:
+            self.cursor = self.params.pop(CURSOR_VAR)
+            self.filter_params.pop(CURSOR_VAR, None)
+        return super().get_queryset(request, exclude_parameters)
+
+    def get_ordering(self, request, queryset):
+        return ['-created_at', 'pk']
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                after_created, after_pk = decode_listing_cursor(self.cursor)
+            except InvalidCursor:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(Q(created_at__lt=after_created) | Q(created_at=after_created, pk__gt=after_pk))
+        result_list = queryset[:self.list_per_page]
+        try:
+            rows = list(result_list)
+        except (ValidationError, ValueError):
+            raise IncorrectLookupParameters
+
+        next_cursor = None
+        if len(rows) == self.list_per_page:
+            next_cursor = encode_listing_cursor(rows[-1].created_at, rows[-1].pk)
+        self.next_page_url = self.get_query_string({CURSOR_VAR: next_cursor}) if next_cursor else None
+        self.first_page_url = self.get_query_string() if self.cursor else None
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.next_page_url or self.first_page_url)
+        self.paginator = paginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelists that stay fast on tables with millions of rows: counts are
+    estimated, related rows come from one join, columns are not sortable
+    and search only hits indexed UUID columns.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    sortable_by = ()
+    # Looked up with "=" on a UUID; other terms match nothing
+    uuid_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        try:
+            value = UUID(search_term)
+        except ValueError:
+            return self.search_other(queryset, search_term), False
+
+        condition = Q()
+        for field in self.uuid_search_fields:
+            condition |= Q(**{field: value})
+        return queryset.filter(condition), False
+
+    def search_other(self, queryset, search_term):
+        return queryset.none()
+
+
+class KeysetAdmin(LargeTableAdmin):
+    """
+    Admin for the per-ballot tables (voters, votes). Their rows feed the
+    option, segment and turnout counters, so the bulk delete action, which
+    would skip those, is not offered.
+    """
+
+    change_list_template = 'admin/poll/keyset_change_list.html'
+    ordering = ('-created_at', 'pk')
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+
+class RecentPollFilter(admin.SimpleListFilter):
+    """Narrow to one of the latest polls, listed off the created_at index."""
+
+    title = 'poll'
+    parameter_name = 'poll'
+    poll_lookup = 'poll_id'
+    choices_limit = 20
+
+    def lookups(self, request, model_admin):
+        polls = Poll.objects.order_by('-created_at', 'poll_id').values_list('poll_id', 'title')
+        return [(str(poll_id), title) for poll_id, title in polls[:self.choices_limit]]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                return queryset.filter(**{self.poll_lookup: UUID(self.value())})
+            except ValueError:
+                raise IncorrectLookupParameters
+        return queryset
+
+
+class VotePollFilter(RecentPollFilter):
+    poll_lookup = 'poll_option__poll_id'
+
+
+@admin.register(Poll)
+class PollAdmin(LargeTableAdmin):
+    list_display = ('title', 'poll_id', 'creator', 'poll_type', 'is_active', 'expires_at', 'created_at')
+    list_select_related = ('creator',)
+    raw_id_fields = ('creator',)
+    ordering = ('-created_at', 'poll_id')
+    uuid_search_fields = ('poll_id',)
+
+
+@admin.register(PollOption)
+class PollOptionAdmin(LargeTableAdmin):
+    list_display = ('text', 'option_id', 'poll', 'votes_count', 'archived_votes_count')
+    list_select_related = ('poll',)
+    list_filter = (RecentPollFilter,)
+    raw_id_fields = ('poll',)
+    ordering = ('-pk',)
+    uuid_search_fields = ('option_id', 'poll_id')
+
+
+@admin.register(Voter)
+class VoterAdmin(KeysetAdmin):
+    list_display = ('email', 'voter_id', 'poll', 'has_voted', 'created_at')
+    list_select_related = ('poll',)
+    list_filter = (RecentPollFilter,)
+    raw_id_fields = ('poll',)
+    # Clearing has_voted would let the voter vote again
+    readonly_fields = ('poll', 'has_voted', 'temp_password', 'anon_id')
+    uuid_search_fields = ('voter_id', 'poll_id')
+
+    def search_other(self, queryset, search_term):
+        # Exact email, served by voter_email_idx
+        return queryset.filter(email=search_term)
+
+
+@admin.register(Vote)
+class VoteAdmin(KeysetAdmin):
+    list_display = ('vote_id', 'poll_option', 'poll', 'rank', 'created_at')
+    list_select_related = ('poll_option__poll',)
+    list_filter = (VotePollFilter,)
+    raw_id_fields = ('poll_option',)
+    readonly_fields = ('anon_id',)
+    uuid_search_fields = ('vote_id', 'poll_option_id')
+
+    # Votes are only ever written by the vote endpoint, which keeps the
+    # counters in step with them; the admin shows them read-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
-# Register your models here.
+    @admin.display(description='poll')
+    def poll(self, vote):
+        return vote.poll_option.poll
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the per-request user lookup on read-only
+    requests.
+
+    For GET/HEAD/OPTIONS the signed `user_id` claim is trusted and the user
+    is resolved from the cache, falling back to the database (with the usual
+    active/revocation checks) on a miss. Entries live for AUTH_USER_CACHE_TTL
+    seconds and are dropped whenever the user is saved or deleted. Writes
+    always load the user from the database.
+
+    The claims alone are not enough to serve a request: the token outlives a
+    deactivation by up to ACCESS_TOKEN_LIFETIME, so the cached user is still
+    what rejects a deactivated account. Invalidation reaches other workers
+    only through a shared cache (CACHE_URL), and bulk QuerySet.update()
+    calls send no signal; there the TTL bounds how long a stale user is
+    served.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_cached_user(validated_token), validated_token
+
+    def get_cached_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = self.get_user(validated_token)
+            cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TTL)
+        return user
@@ -0,0 +1,61 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class HexDigestField(models.BinaryField):
+    """
+    Stores a fixed-size hex digest (such as a SHA-256 anon_id) as raw bytes.
+
+    The database column holds `digest_size` bytes instead of the 2x longer
+    hex text, which keeps indexes over the column small. On the Python side
+    the value is always the lowercase hex string, so callers and API
+    payloads are unaffected.
+    """
+    description = "Hex digest stored as fixed-size binary"
+
+    def __init__(self, *args, digest_size=32, **kwargs):
+        self.digest_size = digest_size
+        kwargs['max_length'] = digest_size
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['max_length']
+        if self.digest_size != 32:
+            kwargs['digest_size'] = self.digest_size
+        if kwargs.get('editable') is True:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def _to_bytes(self, value):
+        if isinstance(value, memoryview):
+            value = bytes(value)
+        if isinstance(value, str):
+            try:
+                value = bytes.fromhex(value)
+            except ValueError:
+                raise ValidationError(f"'{value}' is not a valid hex digest.", code='invalid')
+        if len(value) != self.digest_size:
+            raise ValidationError(
+                f"Digest must be {self.digest_size} bytes, got {len(value)}.", code='invalid'
+            )
+        return value
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return bytes(value).hex()
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return bytes(value).hex()
+
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return self._to_bytes(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
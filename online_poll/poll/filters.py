@@ -0,0 +1,39 @@
+from django.db.models import Q
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from .models import Poll
+
+
+class PollFilter(filters.FilterSet):
+    ACTIVE = 'active'
+    EXPIRED = 'expired'
+    INACTIVE = 'inactive'
+
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active and not expired'),
+        (EXPIRED, 'Past expiry'),
+        (INACTIVE, 'Deactivated'),
+    ]
+
+    mine = filters.BooleanFilter(method='filter_mine', label='Only polls created by the current user')
+    creator = filters.UUIDFilter(field_name='creator')
+    status = filters.ChoiceFilter(choices=STATUS_CHOICES, method='filter_status')
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Poll
+        fields = ['mine', 'creator', 'status', 'created_after', 'created_before']
+
+    def filter_mine(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(creator=self.request.user)
+
+    def filter_status(self, queryset, name, value):
+        now = timezone.now()
+        if value == self.ACTIVE:
+            return queryset.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now), is_active=True)
+        if value == self.EXPIRED:
+            return queryset.filter(expires_at__lte=now)
+        return queryset.filter(is_active=False)
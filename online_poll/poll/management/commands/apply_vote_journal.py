@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from poll.services.journal_service import apply_journal, journal_lag
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay vote journal segments into the database with bulk inserts. "
+        "Safe to re-run after a crash: each batch commits together with its "
+        "segment checkpoint, and already-applied ballots are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.VOTE_JOURNAL_APPLY_BATCH,
+            help='Ballots inserted per transaction.'
+        )
+        parser.add_argument(
+            '--follow', action='store_true',
+            help='Keep applying new records until interrupted.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep between passes with --follow.'
+        )
+        parser.add_argument(
+            '--lag', action='store_true',
+            help='Only report how far the database is behind the journal.'
+        )
+
+    def report_lag(self):
+        lag = journal_lag()
+        self.stdout.write(
+            f"lag: {lag['pending_bytes']} bytes in {lag['pending_segments']}/{lag['segments']} "
+            f"segment(s), oldest pending ballot {lag['lag_seconds']:.1f}s old"
+        )
+
+    def handle(self, *args, **options):
+        if options['lag']:
+            self.report_lag()
+            return
+
+        while True:
+            applied, rejected = apply_journal(batch_size=options['batch_size'])
+            if applied or rejected or not options['follow']:
+                self.stdout.write(f"Applied {applied} ballot(s), rejected {rejected} duplicate(s).")
+                self.report_lag()
+            if not options['follow']:
+                break
+            time.sleep(options['interval'])
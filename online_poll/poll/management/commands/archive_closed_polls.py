@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from poll.services.archive_service import archivable_polls, archive_poll
+from poll.sharding import poll_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Move votes and voters of polls closed longer than the retention window "
+        "into compressed per-poll archive files, keeping per-option tallies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=settings.POLL_ARCHIVE_RETENTION_DAYS,
+            help='Archive polls closed for more than this many days.'
+        )
+        parser.add_argument(
+            '--archive-dir', default=settings.POLL_ARCHIVE_DIR,
+            help='Directory that receives the <poll_id>-votes/voters.ndjson.gz files.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.POLL_ARCHIVE_CHUNK_SIZE,
+            help='Rows deleted per transaction.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='List the polls that would be archived without changing anything.'
+        )
+
+    def handle(self, *args, **options):
+        shards = [archivable_polls(options['retention_days']).using(alias) for alias in poll_shards()]
+
+        if options['dry_run']:
+            for polls in shards:
+                for poll in polls:
+                    self.stdout.write(f"{poll.poll_id} {poll.title}")
+            return
+
+        archived = 0
+        for poll in (poll for polls in shards for poll in polls.iterator()):
+            archive, deleted_votes, deleted_voters = archive_poll(
+                poll, str(options['archive_dir']), chunk_size=options['chunk_size']
+            )
+            if deleted_votes or deleted_voters:
+                archived += 1
+                self.stdout.write(
+                    f"Archived poll {poll.poll_id}: {deleted_votes} votes, "
+                    f"{deleted_voters} voters -> {archive.votes_path}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} poll(s)."))
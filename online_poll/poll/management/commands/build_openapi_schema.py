@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from online_poll.schema import write_schema_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once and write it as openapi.json and "
+        "openapi.yaml for the docs to serve without per-request generation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', default=settings.OPENAPI_SCHEMA_DIR,
+            help='Directory that receives openapi.json and openapi.yaml.'
+        )
+
+    def handle(self, *args, **options):
+        for path in write_schema_files(str(options['output_dir'])):
+            self.stdout.write(f"Wrote {path}")
+        self.stdout.write(self.style.SUCCESS("OpenAPI schema built."))
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from poll.services.rebalance_service import misplaced_polls, move_poll
+
+
+class Command(BaseCommand):
+    help = (
+        "Move every poll that is not on the shard the consistent-hash ring "
+        "assigns it to, together with its options, voters, votes, anonymous "
+        "ballots and archive marker. Run after adding an alias to POLL_SHARDS; "
+        "pause voting while it runs. Safe to re-run after an interruption."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shards', default=','.join(settings.POLL_SHARDS),
+            help='Comma-separated target aliases (default: POLL_SHARDS).'
+        )
+        parser.add_argument(
+            '--source-shards', default=None,
+            help='Comma-separated aliases to scan for misplaced polls (default: the target aliases).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows copied per insert and deleted per transaction.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='List the polls that would move without changing anything.'
+        )
+
+    def handle(self, *args, **options):
+        targets = [alias.strip() for alias in options['shards'].split(',') if alias.strip()]
+        sources = targets
+        if options['source_shards']:
+            sources = [alias.strip() for alias in options['source_shards'].split(',') if alias.strip()]
+
+        unknown = sorted(set(targets + sources) - set(settings.DATABASES))
+        if unknown:
+            raise CommandError(f"Unknown database alias(es): {', '.join(unknown)}")
+
+        moved = rows = 0
+        for poll_id, source, target in list(misplaced_polls(sources, targets)):
+            self.stdout.write(f"{poll_id} {source} -> {target}")
+            if options['dry_run']:
+                continue
+            rows += move_poll(poll_id, source, target, batch_size=options['batch_size'])
+            moved += 1
+
+        if options['dry_run']:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} poll(s), {rows} row(s) copied."))
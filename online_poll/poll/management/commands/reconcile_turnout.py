@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from poll.services.turnout_service import prune_turnout_buckets, reconcile_turnout
+from poll.sharding import poll_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every poll's invited and voted turnout counters from the voter "
+        "rows in small chunks, fix the ones that drifted and drop expired "
+        "per-minute turnout buckets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.TURNOUT_RECONCILE_CHUNK_SIZE,
+            help='Polls recounted (and buckets deleted) per transaction.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report how many polls drifted without changing anything.'
+        )
+
+    def handle(self, *args, **options):
+        checked = fixed = pruned = 0
+        for alias in poll_shards():
+            shard_checked, shard_fixed = reconcile_turnout(alias, options['chunk_size'], options['dry_run'])
+            checked += shard_checked
+            fixed += shard_fixed
+            if not options['dry_run']:
+                pruned += prune_turnout_buckets(alias, options['chunk_size'])
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} poll(s): {fixed} {verb}, {pruned} expired bucket(s) removed."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from online_poll.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Prime the database connection, URL resolution and REST framework "
+        "settings used by the vote path, reporting how long each step takes. "
+        "Workers run the same steps on start when WARM_UP_ON_START is set."
+    )
+    # System checks import every URLconf, which would hide the cost measured here
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        timings = warm_up()
+        for step, elapsed in timings.items():
+            self.stdout.write(f"{step:<16}{elapsed:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {sum(timings.values()):.1f} ms."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='poll_type',
+            field=models.CharField(choices=[('single', 'Single Choice'), ('multiple', 'Multiple Choice'), ('ranked', 'Ranked Choice')], default='single', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='rank',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0002_ranked_choice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnonymousBallot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anon_id', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anonymous_ballots', to='poll.poll')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll', 'anon_id'), name='unique_anonymous_ballot_per_poll')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Stores anon_id as a 32-byte binary digest instead of 64-char hex text.
+#
+# The hex values are decoded into a new binary column, so existing anon_ids
+# keep their identity and the API keeps returning the same hex strings. This
+# migration adds the nullable binary columns next to the renamed hex ones,
+# 0005 fills them in batches and 0006 drops the hex columns.
+
+import poll.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0003_anonymous_ballot'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='voter',
+            name='unique_anonid_per_poll',
+        ),
+        migrations.RemoveConstraint(
+            model_name='vote',
+            name='unique_vote_per_option_per_anon',
+        ),
+        migrations.RemoveConstraint(
+            model_name='anonymousballot',
+            name='unique_anonymous_ballot_per_poll',
+        ),
+        migrations.RenameField(
+            model_name='voter',
+            old_name='anon_id',
+            new_name='anon_id_hex',
+        ),
+        migrations.RenameField(
+            model_name='vote',
+            old_name='anon_id',
+            new_name='anon_id_hex',
+        ),
+        migrations.RenameField(
+            model_name='anonymousballot',
+            old_name='anon_id',
+            new_name='anon_id_hex',
+        ),
+        migrations.AlterField(
+            model_name='voter',
+            name='anon_id_hex',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='anon_id_hex',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='anonymousballot',
+            name='anon_id_hex',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='anon_id',
+            field=poll.fields.HexDigestField(null=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='anon_id',
+            field=poll.fields.HexDigestField(null=True),
+        ),
+        migrations.AddField(
+            model_name='anonymousballot',
+            name='anon_id',
+            field=poll.fields.HexDigestField(null=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Decodes the hex anon_ids renamed by 0004 into the binary column.
+#
+# The migration is not atomic: each batch of CHUNK_SIZE rows, taken in
+# primary key order, commits on its own, so no lock is held on more than one
+# batch at a time and an interrupted run resumes with the rows still unset.
+
+from django.db import migrations, transaction
+
+ANON_ID_MODELS = ('Voter', 'Vote', 'AnonymousBallot')
+CHUNK_SIZE = 5000
+
+
+def _convert(apps, schema_editor, source, target, sql_expression, convert):
+    connection = schema_editor.connection
+    for model_name in ANON_ID_MODELS:
+        model = apps.get_model('poll', model_name)
+        pk_name = model._meta.pk.name
+        pending = model.objects.using(connection.alias).filter(**{f'{target}__isnull': True}).order_by(pk_name)
+        while True:
+            if connection.vendor == 'postgresql':
+                # Convert in SQL, up to the last primary key of the batch
+                last = pending.values_list(pk_name, flat=True)[CHUNK_SIZE - 1:CHUNK_SIZE].first()
+                quote = schema_editor.quote_name
+                sql = (
+                    f"UPDATE {quote(model._meta.db_table)} "
+                    f"SET {quote(target)} = {sql_expression.format(quote(source))} "
+                    f"WHERE {quote(target)} IS NULL"
+                )
+                params = []
+                if last is not None:
+                    sql += f" AND {quote(model._meta.pk.column)} <= %s"
+                    params.append(last)
+                with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                if last is None:
+                    break
+                continue
+
+            batch = list(pending.values_list(pk_name, source)[:CHUNK_SIZE])
+            if not batch:
+                break
+            with transaction.atomic(using=connection.alias):
+                model.objects.using(connection.alias).bulk_update(
+                    [model(**{pk_name: pk, target: convert(value)}) for pk, value in batch],
+                    [target],
+                )
+
+
+def hex_to_binary(apps, schema_editor):
+    _convert(apps, schema_editor, 'anon_id_hex', 'anon_id', "decode({}, 'hex')", str.lower)
+
+
+def binary_to_hex(apps, schema_editor):
+    _convert(apps, schema_editor, 'anon_id', 'anon_id_hex', "encode({}, 'hex')", lambda value: value)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('poll', '0004_binary_anon_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(hex_to_binary, binary_to_hex),
+    ]
@@ -0,0 +1,54 @@
+# Makes the binary anon_id filled in by 0005 required and unique again, and
+# drops the hex column it was decoded from.
+
+import poll.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0005_binary_anon_id_backfill'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='voter',
+            name='anon_id_hex',
+        ),
+        migrations.RemoveField(
+            model_name='vote',
+            name='anon_id_hex',
+        ),
+        migrations.RemoveField(
+            model_name='anonymousballot',
+            name='anon_id_hex',
+        ),
+        migrations.AlterField(
+            model_name='voter',
+            name='anon_id',
+            field=poll.fields.HexDigestField(),
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='anon_id',
+            field=poll.fields.HexDigestField(),
+        ),
+        migrations.AlterField(
+            model_name='anonymousballot',
+            name='anon_id',
+            field=poll.fields.HexDigestField(),
+        ),
+        migrations.AddConstraint(
+            model_name='voter',
+            constraint=models.UniqueConstraint(fields=('poll', 'anon_id'), name='unique_anonid_per_poll'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('poll_option', 'anon_id'), name='unique_vote_per_option_per_anon'),
+        ),
+        migrations.AddConstraint(
+            model_name='anonymousballot',
+            constraint=models.UniqueConstraint(fields=('poll', 'anon_id'), name='unique_anonymous_ballot_per_poll'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0006_binary_anon_id_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='polloption',
+            name='archived_votes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='PollArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes_path', models.CharField(max_length=500)),
+                ('voters_path', models.CharField(max_length=500)),
+                ('votes_count', models.PositiveIntegerField(default=0)),
+                ('voters_count', models.PositiveIntegerField(default=0)),
+                ('voted_count', models.PositiveIntegerField(default=0)),
+                ('runoff', models.JSONField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('poll', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='poll.poll')),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_votes_count(apps, schema_editor):
+    PollOption = apps.get_model('poll', 'PollOption')
+    Vote = apps.get_model('poll', 'Vote')
+    db_alias = schema_editor.connection.alias
+
+    counted = (
+        Vote.objects.filter(Q(rank__isnull=True) | Q(rank=1), poll_option=OuterRef('pk'))
+        .order_by()
+        .values('poll_option')
+        .annotate(total=Count('vote_id'))
+        .values('total')
+    )
+    PollOption.objects.using(db_alias).update(votes_count=Coalesce(Subquery(counted), 0))
+    # Archived polls no longer have their Vote rows
+    PollOption.objects.using(db_alias).filter(poll__archive__isnull=False).update(votes_count=F('archived_votes_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0007_poll_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='polloption',
+            name='votes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_votes_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='polloption',
+            index=models.Index(fields=['poll', '-votes_count', 'option_id'], name='option_poll_votes_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0008_option_votes_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['-created_at', 'poll_id', 'expires_at', 'is_active'], name='poll_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['creator', '-created_at', 'poll_id', 'expires_at', 'is_active'], name='poll_creator_created_idx'),
+        ),
+    ]
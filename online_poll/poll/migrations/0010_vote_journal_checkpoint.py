@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0009_poll_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteJournalCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segment', models.CharField(max_length=255, unique=True)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('records_applied', models.PositiveIntegerField(default=0)),
+                ('records_rejected', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
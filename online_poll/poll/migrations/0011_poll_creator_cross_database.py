@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0010_vote_journal_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='creator',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='polls', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
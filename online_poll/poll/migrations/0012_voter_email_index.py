@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0011_poll_creator_cross_database'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['email'], name='voter_email_idx'),
+        ),
+    ]
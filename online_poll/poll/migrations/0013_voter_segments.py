@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0012_voter_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='segment_attributes',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='segments',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='PollSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attribute', models.CharField(max_length=64)),
+                ('value', models.CharField(max_length=255)),
+                ('code', models.PositiveIntegerField()),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='poll.poll')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll', 'attribute', 'value'), name='unique_segment_value_per_poll'), models.UniqueConstraint(fields=('poll', 'code'), name='unique_segment_code_per_poll')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SegmentTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.PositiveIntegerField()),
+                ('votes_count', models.PositiveIntegerField(default=0)),
+                ('poll_option', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_tallies', to='poll.polloption')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll_option', 'code'), name='unique_tally_per_option_segment')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0013_voter_segments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='voted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='poll',
+            name='voters_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TurnoutBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minute', models.DateTimeField()),
+                ('votes_count', models.PositiveIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turnout_buckets', to='poll.poll')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll', 'minute'), name='unique_turnout_minute_per_poll')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0014_turnout_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['-created_at', 'vote_id'], name='vote_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll_option', '-created_at', 'vote_id'], name='vote_option_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['-created_at', 'voter_id'], name='voter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['poll', '-created_at', 'voter_id'], name='voter_poll_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0015_admin_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='turnoutbucket',
+            name='unique_turnout_minute_per_poll',
+        ),
+        migrations.AddField(
+            model_name='turnoutbucket',
+            name='slot',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='turnoutbucket',
+            name='voted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='turnoutbucket',
+            constraint=models.UniqueConstraint(fields=('poll', 'minute', 'slot'), name='unique_turnout_slot_per_poll'),
+        ),
+    ]
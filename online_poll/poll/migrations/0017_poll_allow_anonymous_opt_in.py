@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:14
+
+from django.db import migrations, models
+
+
+def close_anonymous_voting(apps, schema_editor):
+    # Anonymous voting used to be on for every poll; existing polls,
+    # invite-only ones included, have to opt in again
+    Poll = apps.get_model('poll', 'Poll')
+    Poll.objects.using(schema_editor.connection.alias).filter(allow_anonymous=True).update(allow_anonymous=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poll', '0016_turnout_bucket_slots'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='allow_anonymous',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(close_anonymous_voting, migrations.RunPython.noop),
+    ]
@@ -3,9 +3,12 @@ import random
 from uuid import uuid4
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
+from .fields import HexDigestField
+from .sharding import ShardedQuerySet
 
 # -------------------------
 # Custom User Manager
@@ -54,10 +57,12 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 class Poll(models.Model):
     SINGLE_CHOICE = 'single'
     MULTIPLE_CHOICE = 'multiple'
+    RANKED_CHOICE = 'ranked'
 
     POLL_TYPES = [
         (SINGLE_CHOICE, 'Single Choice'),
         (MULTIPLE_CHOICE, 'Multiple Choice'),
+        (RANKED_CHOICE, 'Ranked Choice'),
     ]
 
     poll_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
@@ -66,21 +71,53 @@ class Poll(models.Model):
         on_delete=models.CASCADE,
         related_name='polls',
         null=True,
+        # Users live on the default database while polls may sit on a shard
+        db_constraint=False,
     )
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     poll_type = models.CharField(max_length=20, choices=POLL_TYPES, default=SINGLE_CHOICE)
-    allow_anonymous = models.BooleanField(default=True)
+    # Opt-in: open polls also accept device-token ballots from anyone
+    allow_anonymous = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    # Voter upload attributes (e.g. "region") kept for segmented results
+    segment_attributes = models.JSONField(default=list, blank=True)
+    # Turnout counters: invited voters, kept in step with roster uploads, and
+    # invited voters who voted, not counting those still in TurnoutBuckets
+    voters_count = models.PositiveIntegerField(default=0)
+    voted_count = models.PositiveIntegerField(default=0)
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        # Listing filters (creator, status, creation date) and the sort can be
+        # answered from these indexes alone when fetching a page of poll IDs
+        indexes = [
+            models.Index(
+                fields=['-created_at', 'poll_id', 'expires_at', 'is_active'],
+                name='poll_created_idx'
+            ),
+            models.Index(
+                fields=['creator', '-created_at', 'poll_id', 'expires_at', 'is_active'],
+                name='poll_creator_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def is_closed(self):
+        """A poll is closed once deactivated or past its expiry."""
+        if not self.is_active:
+            return True
+        return bool(self.expires_at and self.expires_at < timezone.now())
+
 
 # -------------------------
 # Poll Options
@@ -90,6 +127,21 @@ class PollOption(models.Model):
     poll = models.ForeignKey(Poll, related_name='options', on_delete=models.CASCADE)
     text = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Running tally kept in step with vote inserts (first preferences for
+    # ranked polls), so results can be read in order straight off an index
+    votes_count = models.PositiveIntegerField(default=0)
+    # Tally left behind when the poll's votes are moved to an archive file
+    archived_votes_count = models.PositiveIntegerField(default=0)
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['poll', '-votes_count', 'option_id'], name='option_poll_votes_idx'),
+        ]
+
+    def __str__(self):
+        return self.text
 
 
 # -------------------------
@@ -100,17 +152,28 @@ class Voter(models.Model):
     poll = models.ForeignKey(Poll, related_name='voters', on_delete=models.CASCADE)
     email = models.EmailField()
     temp_password = models.CharField(max_length=128)
-    anon_id = models.CharField(max_length=255)
+    anon_id = HexDigestField()
     has_voted = models.BooleanField(default=False)
+    # Codes of the voter's PollSegments, one per segment attribute present
+    segments = models.JSONField(default=list, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['poll', 'email'], name='unique_voter_per_poll'),
             models.UniqueConstraint(fields=['poll', 'anon_id'], name='unique_anonid_per_poll')
         ]
+        indexes = [
+            # Exact-email lookups across polls (admin search)
+            models.Index(fields=['email'], name='voter_email_idx'),
+            # Admin changelist keyset, newest first, overall and per poll
+            models.Index(fields=['-created_at', 'voter_id'], name='voter_created_idx'),
+            models.Index(fields=['poll', '-created_at', 'voter_id'], name='voter_poll_created_idx'),
+        ]
 
 
 # -------------------------
@@ -119,9 +182,13 @@ class Voter(models.Model):
 class Vote(models.Model):
     vote_id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     poll_option = models.ForeignKey(PollOption, related_name='votes', on_delete=models.CASCADE)
-    anon_id = models.CharField(max_length=255)
+    anon_id = HexDigestField()
+    # Preference position (1 = first choice) for ranked-choice ballots; null otherwise
+    rank = models.PositiveSmallIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -129,3 +196,139 @@ class Vote(models.Model):
                 name='unique_vote_per_option_per_anon'
             )
         ]
+        indexes = [
+            # Admin changelist keyset, newest first, overall and per option
+            models.Index(fields=['-created_at', 'vote_id'], name='vote_created_idx'),
+            models.Index(fields=['poll_option', '-created_at', 'vote_id'], name='vote_option_created_idx'),
+        ]
+
+
+# -------------------------
+# Anonymous ballots
+# -------------------------
+class AnonymousBallot(models.Model):
+    """
+    One row per device that voted in an open (anonymous) poll. The unique
+    constraint is the authoritative guard against repeat anonymous votes.
+    """
+    poll = models.ForeignKey(Poll, related_name='anonymous_ballots', on_delete=models.CASCADE)
+    anon_id = HexDigestField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'anon_id'], name='unique_anonymous_ballot_per_poll')
+        ]
+
+
+# -------------------------
+# Poll archives
+# -------------------------
+class PollArchive(models.Model):
+    """
+    Marks a closed poll whose votes and voters were moved out of the hot
+    tables into compressed archive files. Once this row exists, results are
+    served from the tallies recorded at archive time.
+    """
+    poll = models.OneToOneField(Poll, related_name='archive', on_delete=models.CASCADE)
+    votes_path = models.CharField(max_length=500)
+    voters_path = models.CharField(max_length=500)
+    votes_count = models.PositiveIntegerField(default=0)
+    voters_count = models.PositiveIntegerField(default=0)
+    voted_count = models.PositiveIntegerField(default=0)
+    # Instant-runoff breakdown for ranked polls, computed before archiving
+    runoff = models.JSONField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ShardedQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Archive of {self.poll_id}"
+
+
+# -------------------------
+# Voter segments
+# -------------------------
+class PollSegment(models.Model):
+    """
+    One value of a segment attribute in a poll, e.g. region=North. Voters
+    store the small per-poll `code` instead of the attribute and value.
+    """
+    poll = models.ForeignKey(Poll, related_name='segments', on_delete=models.CASCADE)
+    attribute = models.CharField(max_length=64)
+    value = models.CharField(max_length=255)
+    code = models.PositiveIntegerField()
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'attribute', 'value'], name='unique_segment_value_per_poll'),
+            models.UniqueConstraint(fields=['poll', 'code'], name='unique_segment_code_per_poll'),
+        ]
+
+    def __str__(self):
+        return f"{self.attribute}={self.value}"
+
+
+class SegmentTally(models.Model):
+    """
+    Votes for an option from voters in one segment (first preferences for
+    ranked polls), kept in step with vote inserts like PollOption.votes_count.
+    """
+    poll_option = models.ForeignKey(PollOption, related_name='segment_tallies', on_delete=models.CASCADE)
+    code = models.PositiveIntegerField()
+    votes_count = models.PositiveIntegerField(default=0)
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll_option', 'code'], name='unique_tally_per_option_segment'),
+        ]
+
+
+# -------------------------
+# Vote journal
+# -------------------------
+class VoteJournalCheckpoint(models.Model):
+    """
+    How far the journal applier has replayed one vote journal segment. The
+    offset is advanced in the same transaction as the Vote rows it covers,
+    so a crashed applier resumes exactly where its last batch committed.
+    """
+    segment = models.CharField(max_length=255, unique=True)
+    offset = models.BigIntegerField(default=0)
+    records_applied = models.PositiveIntegerField(default=0)
+    records_rejected = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.segment}@{self.offset}"
+
+
+# -------------------------
+# Turnout
+# -------------------------
+class TurnoutBucket(models.Model):
+    """
+    Ballots cast in a poll during one minute, of which `voted_count` by
+    invited voters, so recent turnout is a sum over a few rows instead of a
+    scan of the votes. Each minute is split over TURNOUT_BUCKET_SLOTS rows
+    picked at random per ballot, so concurrent votes rarely wait on the same
+    row; reads sum the slots.
+    """
+    poll = models.ForeignKey(Poll, related_name='turnout_buckets', on_delete=models.CASCADE)
+    minute = models.DateTimeField()
+    slot = models.PositiveSmallIntegerField(default=0)
+    votes_count = models.PositiveIntegerField(default=0)
+    voted_count = models.PositiveIntegerField(default=0)
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'minute', 'slot'], name='unique_turnout_slot_per_poll'),
+        ]
@@ -1,9 +1,21 @@
+from uuid import UUID
+
 from rest_framework import serializers
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import authenticate
-from poll.services.voter_service import create_voter_for_poll
-from .models import CustomUser, Poll, PollOption, Voter, Vote
+from django.contrib.auth.models import update_last_login
+from poll.services.voter_service import create_voter_for_poll, sync_voter_roster
+from poll.services.poll_service import bulk_create_polls
+from poll.services.results_service import increment_vote_count
+from poll.services.segment_service import encode_segments, record_segment_vote
+from poll.services.turnout_service import record_ballots
+from poll.services.voter_session_service import claim_vote, voter_session_data
+from poll.sharding import poll_db, poll_shard
+from .models import CustomUser, Poll, PollOption, Voter, Vote, AnonymousBallot
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 
 # -----------------------
@@ -30,7 +42,8 @@ class LoginSerializer(TokenObtainPairSerializer):
         email = attrs.get('email')
         password = attrs.get('password')
         
-        user = authenticate(email=email, password=password)
+        # The only password check; it also re-hashes at the configured cost
+        user = authenticate(self.context.get('request'), email=email, password=password)
         
         if not user:
             raise serializers.ValidationError("Invalid email or password.")
@@ -38,7 +51,12 @@ class LoginSerializer(TokenObtainPairSerializer):
         if not user.is_active:
             raise serializers.ValidationError("Your account is disabled.")
         
-        data = super().validate(attrs)
+        # Issue tokens for the verified user instead of super().validate(),
+        # which would authenticate (and hash) a second time
+        refresh = self.get_token(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
         
         data['user'] = {
             'user_id': user.user_id,
@@ -52,11 +70,18 @@ class LoginSerializer(TokenObtainPairSerializer):
 # Poll option read
 # -----------------------
 class PollOptionSerializer(serializers.ModelSerializer):
-    votes_count = serializers.IntegerField(source='votes.count', read_only=True)
-
     class Meta:
         model = PollOption
         fields = ['option_id', 'text', 'created_at', 'votes_count']
+        read_only_fields = ['votes_count']
+
+
+class PollResultSerializer(PollOptionSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta(PollOptionSerializer.Meta):
+        fields = PollOptionSerializer.Meta.fields + ['rank', 'percentage']
 
 
 # -----------------------
@@ -69,10 +94,16 @@ class PollSerializer(serializers.ModelSerializer):
         model = Poll
         fields = [
             'poll_id', 'title', 'description', 'created_at', 'poll_type',
-            'allow_anonymous', 'updated_at', 'expires_at', 'is_active', 'options'
+            'allow_anonymous', 'updated_at', 'expires_at', 'is_active', 'segment_attributes', 'options'
         ]
 
 
+class PollListPageSerializer(serializers.Serializer):
+    next = serializers.URLField(allow_null=True, read_only=True)
+    results = PollSerializer(many=True, read_only=True)
+
+
+
 # -----------------------
 # Poll create (nested)
 # -----------------------
@@ -87,19 +118,108 @@ class PollCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Poll
-        fields = ['poll_id','title', 'description', 'poll_type', 'allow_anonymous', 'expires_at', 'options']
+        fields = [
+            'poll_id','title', 'description', 'poll_type', 'allow_anonymous', 'expires_at',
+            'segment_attributes', 'options'
+        ]
         read_only_fields = ['poll_id','created_at', 'updated_at', 'is_active']
 
+    def validate_segment_attributes(self, value):
+        max_attributes = settings.POLL_MAX_SEGMENT_ATTRIBUTES
+        if not isinstance(value, list) or not all(isinstance(name, str) and 0 < len(name) <= 64 for name in value):
+            raise serializers.ValidationError("Must be a list of attribute names (at most 64 characters each).")
+        if len(value) > max_attributes:
+            raise serializers.ValidationError(f"At most {max_attributes} segment attributes are allowed.")
+        if 'email' in value:
+            raise serializers.ValidationError("email cannot be a segment attribute.")
+        return list(dict.fromkeys(value))
+
     def create(self, validated_data):
         options_data = validated_data.pop('options', [])
         # creator must be provided by view (serializer.save(creator=request.user))
         creator = self.context.get('creator')
-        poll = Poll.objects.create(creator=creator, **validated_data)
-        for option_data in options_data:
-            PollOption.objects.create(poll=poll, **option_data)
+        poll = Poll(creator=creator, **validated_data)
+        with poll_shard(poll.poll_id), transaction.atomic(using=poll_db()):
+            poll.save(force_insert=True)
+            PollOption.objects.bulk_create(
+                [PollOption(poll=poll, **option_data) for option_data in options_data]
+            )
         return poll
 
 
+# -----------------------
+# Bulk poll create
+# -----------------------
+class PollBulkCreateSerializer(serializers.Serializer):
+    polls = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False
+    )
+
+    def validate_polls(self, value):
+        max_items = settings.POLL_BULK_MAX_ITEMS
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"At most {max_items} polls can be created per request.")
+        return value
+
+    def validate(self, data):
+        # Validate every poll up front; invalid items are reported, not fatal
+        valid_items = []
+        item_errors = []
+        for index, item in enumerate(data['polls']):
+            item_serializer = PollCreateSerializer(data=item)
+            if item_serializer.is_valid():
+                valid_items.append((index, item_serializer.validated_data))
+            else:
+                item_errors.append({'index': index, 'errors': item_serializer.errors})
+
+        data['valid_items'] = valid_items
+        data['item_errors'] = item_errors
+        return data
+
+    def create(self, validated_data):
+        creator = self.context.get('creator')
+        valid_items = validated_data['valid_items']
+
+        polls = bulk_create_polls(creator, [item for _, item in valid_items])
+
+        created = [
+            {'index': index, 'poll_id': poll.poll_id, 'title': poll.title}
+            for (index, _), poll in zip(valid_items, polls)
+        ]
+        return {'created': created, 'errors': validated_data['item_errors']}
+
+
+# -----------------------
+# Batch results
+# -----------------------
+class PollBatchResultsSerializer(serializers.Serializer):
+    poll_ids = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False
+    )
+
+    def validate_poll_ids(self, value):
+        max_polls = settings.RESULTS_BATCH_MAX_POLLS
+        if len(value) > max_polls:
+            raise serializers.ValidationError(f"At most {max_polls} polls can be requested at once.")
+        return value
+
+    def validate(self, data):
+        # Malformed IDs are reported per poll instead of failing the request
+        valid_ids = []
+        item_errors = []
+        for raw_id in data['poll_ids']:
+            try:
+                valid_ids.append(UUID(raw_id))
+            except ValueError:
+                item_errors.append({'poll_id': raw_id, 'error': 'Invalid poll ID.'})
+
+        data['valid_ids'] = list(dict.fromkeys(valid_ids))
+        data['item_errors'] = item_errors
+        return data
+
+
 # -----------------------
 # Voter
 # -----------------------
@@ -118,23 +238,38 @@ class VoterUploadSerializer(serializers.Serializer):
         child=serializers.DictField(),
         allow_empty=False
     )
+    # Diff against the current roster: only new emails get credentials
+    sync = serializers.BooleanField(default=False)
+    remove_missing = serializers.BooleanField(default=False)
     
     def validate(self, data):
         for obj in data["voters"]:
             if "email" not in obj:
                 raise serializers.ValidationError("Each voter must have an email field.")
+        if data["remove_missing"] and not data["sync"]:
+            raise serializers.ValidationError({"remove_missing": "Only allowed together with sync."})
         return data
 
     def create(self, validated_data):
         poll = self.context["poll"]
+        segments = encode_segments(poll, validated_data["voters"])
+        if validated_data["sync"]:
+            return sync_voter_roster(
+                poll,
+                [obj["email"] for obj in validated_data["voters"]],
+                remove_missing=validated_data["remove_missing"],
+                segments={obj["email"].strip(): codes for obj, codes in zip(validated_data["voters"], segments)},
+            )
+
         created_list = []
 
-        for obj in validated_data["voters"]:
+        for obj, codes in zip(validated_data["voters"], segments):
             email = obj["email"]
             voter, was_created, plain_pw = create_voter_for_poll(
                 poll=poll,
                 email=email,
-                send_email=True
+                send_email=True,
+                segments=codes
             )
 
             created_list.append({
@@ -171,11 +306,15 @@ class VoteSerializer(serializers.ModelSerializer):
         if not request:
             raise serializers.ValidationError("Invalid request context.")
 
-        voter = data.get('voter')
+        voter = data.pop('voter', None)
+        session = self.context.get('voter_session')
+        if session is None and voter is not None:
+            session = voter_session_data(voter)
+        anon_id = self.context.get('anon_id')
         poll_option = data.get('poll_option')
         poll = poll_option.poll
 
-        if not voter:
+        if not session and not anon_id:
             raise serializers.ValidationError("Voter could not be resolved.")
 
         # poll active & not expired
@@ -184,28 +323,114 @@ class VoteSerializer(serializers.ModelSerializer):
         if poll.expires_at and poll.expires_at < timezone.now():
             raise serializers.ValidationError("This poll has expired.")
 
-        # Check uniqueness
-        if voter.has_voted:
-            raise serializers.ValidationError("You have already voted.")
+        if not session:
+            # Anonymous repeat votes are caught by the caller's pre-check and
+            # by the AnonymousBallot unique constraint in create()
+            if not poll.allow_anonymous:
+                raise serializers.ValidationError("This poll does not allow anonymous voting.")
+            return data
 
-        if poll.poll_type == Poll.SINGLE_CHOICE:
-            if Vote.objects.filter(
-                poll_option__poll=poll,
-                anon_id=voter.anon_id
-            ).exists():
-                raise serializers.ValidationError("You can only vote once in this poll.")
+        if session['poll_id'] != str(poll.poll_id):
+            raise serializers.ValidationError("Voter not registered for this poll.")
 
-        # Keep voter so create() can use it
-        data['voter'] = voter
+        # Fail early on the cached flag; claim_vote() in create() is the
+        # authoritative check
+        if session['has_voted']:
+            raise serializers.ValidationError("You have already voted.")
+
+        # Keep the session so create() can use it
+        data['voter_session'] = session
         return data
 
     def create(self, validated_data):
-        voter = validated_data.pop('voter')
+        session = validated_data.pop('voter_session', None)
+
+        if not session:
+            anon_id = self.context['anon_id']
+            validated_data['anon_id'] = anon_id
+            with transaction.atomic(using=poll_db()):
+                AnonymousBallot.objects.create(poll=validated_data['poll_option'].poll, anon_id=anon_id)
+                vote = super().create(validated_data)
+                increment_vote_count(vote.poll_option_id)
+                record_ballots(vote.poll_option.poll_id)
+            return vote
+
+        validated_data['anon_id'] = session['anon_id']
+        with transaction.atomic(using=poll_db()):
+            if not claim_vote(session):
+                raise serializers.ValidationError("You have already voted.")
+            vote = super().create(validated_data)
+            increment_vote_count(vote.poll_option_id)
+            record_segment_vote(vote.poll_option_id, session['segments'])
+            record_ballots(vote.poll_option.poll_id, voted=1)
 
-        validated_data['anon_id'] = voter.anon_id
-        vote = super().create(validated_data)
+        return vote
 
-        voter.has_voted = True
-        voter.save()
 
-        return vote
+# -----------------------
+# Ranked vote serializer
+# -----------------------
+class RankedVoteSerializer(serializers.Serializer):
+    rankings = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False
+    )
+
+    voter = serializers.PrimaryKeyRelatedField(
+        queryset=Voter.objects.all(),
+        write_only=True,
+        required=False
+    )
+
+    def validate(self, data):
+        poll = self.context.get('poll')
+        voter = data.pop('voter', None)
+        session = self.context.get('voter_session')
+        if session is None and voter is not None:
+            session = voter_session_data(voter)
+        rankings = data['rankings']
+
+        if not session:
+            raise serializers.ValidationError("Voter could not be resolved.")
+
+        if not poll or poll.poll_type != Poll.RANKED_CHOICE:
+            raise serializers.ValidationError("This poll does not accept ranked ballots.")
+        if not poll.is_active:
+            raise serializers.ValidationError("This poll is not active.")
+        if poll.expires_at and poll.expires_at < timezone.now():
+            raise serializers.ValidationError("This poll has expired.")
+
+        if session['poll_id'] != str(poll.poll_id):
+            raise serializers.ValidationError("Voter not registered for this poll.")
+        if session['has_voted']:
+            raise serializers.ValidationError("You have already voted.")
+
+        if len(set(rankings)) != len(rankings):
+            raise serializers.ValidationError("Each option can only be ranked once.")
+
+        options = {
+            option.option_id: option
+            for option in poll.options.filter(option_id__in=rankings)
+        }
+        if len(options) != len(rankings):
+            raise serializers.ValidationError("Option does not exist for this poll.")
+
+        data['options'] = [options[option_id] for option_id in rankings]
+        data['voter_session'] = session
+        return data
+
+    def create(self, validated_data):
+        session = validated_data['voter_session']
+
+        with transaction.atomic(using=poll_db()):
+            if not claim_vote(session):
+                raise serializers.ValidationError("You have already voted.")
+            votes = Vote.objects.bulk_create([
+                Vote(poll_option=option, anon_id=session['anon_id'], rank=rank)
+                for rank, option in enumerate(validated_data['options'], start=1)
+            ])
+            increment_vote_count(votes[0].poll_option_id)
+            record_segment_vote(votes[0].poll_option_id, session['segments'])
+            record_ballots(self.context['poll'].poll_id, voted=1)
+
+        return votes
@@ -0,0 +1,132 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from poll.models import AnonymousBallot
+
+BLOOM_METRICS = ('negative', 'positive', 'duplicate', 'false_positive')
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. `might_contain` never returns a
+    false negative; false positives occur at roughly `error_rate` once
+    `capacity` items have been added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+_filters = OrderedDict()
+_filters_lock = threading.Lock()
+
+
+def get_poll_filter(poll):
+    """
+    Return this process's Bloom filter for `poll`, seeding it from the
+    poll's existing anonymous ballots the first time it is requested.
+    Only the most recently used ANON_BLOOM_MAX_POLLS filters are kept.
+    """
+    key = str(poll.poll_id)
+    with _filters_lock:
+        bloom = _filters.get(key)
+        if bloom is not None:
+            _filters.move_to_end(key)
+            return bloom
+
+    bloom = BloomFilter(settings.ANON_BLOOM_CAPACITY, settings.ANON_BLOOM_ERROR_RATE)
+    anon_ids = (
+        AnonymousBallot.objects.filter(poll=poll)
+        .values_list('anon_id', flat=True)
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    for anon_id in anon_ids:
+        bloom.add(anon_id)
+
+    with _filters_lock:
+        bloom = _filters.setdefault(key, bloom)
+        _filters.move_to_end(key)
+        while len(_filters) > settings.ANON_BLOOM_MAX_POLLS:
+            _filters.popitem(last=False)
+    return bloom
+
+
+def reset_poll_filters():
+    with _filters_lock:
+        _filters.clear()
+
+
+def _metric_key(poll_id, metric):
+    return f"poll:{poll_id}:anon-bloom:{metric}"
+
+
+def _record(poll_id, metric):
+    key = _metric_key(poll_id, metric)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def has_anonymous_vote(poll, anon_id):
+    """
+    Return True if `anon_id` has already voted in `poll`.
+
+    A negative answer from the Bloom filter is trusted without touching the
+    database. A positive answer is confirmed against AnonymousBallot so a
+    false positive never blocks a first-time voter; the unique constraint on
+    AnonymousBallot remains the final guard for concurrent submissions.
+    """
+    if not get_poll_filter(poll).might_contain(anon_id):
+        _record(poll.poll_id, 'negative')
+        return False
+
+    _record(poll.poll_id, 'positive')
+    if AnonymousBallot.objects.filter(poll=poll, anon_id=anon_id).exists():
+        _record(poll.poll_id, 'duplicate')
+        return True
+
+    _record(poll.poll_id, 'false_positive')
+    return False
+
+
+def remember_anonymous_vote(poll, anon_id):
+    get_poll_filter(poll).add(anon_id)
+
+
+def anonymous_filter_stats(poll):
+    """Counters for the poll's Bloom pre-check, aggregated through the cache."""
+    values = cache.get_many([_metric_key(poll.poll_id, metric) for metric in BLOOM_METRICS])
+    stats = {metric: values.get(_metric_key(poll.poll_id, metric), 0) for metric in BLOOM_METRICS}
+
+    checks = stats['negative'] + stats['positive']
+    stats['checks'] = checks
+    # Share of checks where the filter reported a possible repeat voter
+    stats['hit_rate'] = stats['positive'] / checks if checks else 0.0
+    # Share of checks answered without a database lookup
+    stats['db_skip_rate'] = stats['negative'] / checks if checks else 0.0
+    stats['false_positive_rate'] = (
+        stats['false_positive'] / stats['positive'] if stats['positive'] else 0.0
+    )
+    return stats
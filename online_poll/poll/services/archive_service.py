@@ -0,0 +1,112 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.utils import timezone
+from poll.models import Poll, PollArchive, Voter, Vote, AnonymousBallot
+from poll.services.export_service import (
+    VOTER_EXPORT_FIELDS, VOTE_EXPORT_FIELDS, voter_rows, vote_rows, encode_export
+)
+from poll.services.results_service import refresh_vote_counts
+from poll.services.tally_service import ranked_results
+from poll.sharding import poll_db, poll_shard
+
+
+def archivable_polls(retention_days, now=None):
+    """
+    Polls that have been closed for longer than `retention_days`: either
+    expired before the cutoff or deactivated and untouched since then.
+    Polls that already have an archive are left out, unless an interrupted
+    run left some of their hot rows behind to delete.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    hot_rows = (
+        Exists(Vote.objects.filter(poll_option__poll=OuterRef('pk')))
+        | Exists(Voter.objects.filter(poll=OuterRef('pk')))
+        | Exists(AnonymousBallot.objects.filter(poll=OuterRef('pk')))
+    )
+    return Poll.objects.filter(
+        Q(expires_at__lt=cutoff) | Q(is_active=False, updated_at__lt=cutoff)
+    ).filter(Q(archive__isnull=True) | hot_rows).order_by('created_at')
+
+
+def is_archived(poll):
+    return PollArchive.objects.filter(poll=poll).exists()
+
+
+def _write_archive_file(path, fields, rows):
+    """Stream rows to a gzip NDJSON file, publishing it only once complete."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as handle:
+        for chunk in encode_export(fields, rows, 'ndjson', compress=True):
+            handle.write(chunk)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def archive_poll(poll, archive_dir, chunk_size=None):
+    """
+    Move the votes and voters of a closed poll into per-poll archive files.
+
+    Files are written first, then the per-option tallies and the PollArchive
+    marker are stored in one short transaction, and finally the hot rows are
+    deleted in chunks, each in its own transaction, all on the poll's shard.
+    Re-running on a poll that already has an archive only resumes the
+    deletion.
+
+    Returns (archive, deleted_votes, deleted_voters).
+    """
+    chunk_size = chunk_size or settings.POLL_ARCHIVE_CHUNK_SIZE
+    with poll_shard(poll.poll_id):
+        archive = PollArchive.objects.filter(poll=poll).first()
+
+        if archive is None:
+            os.makedirs(archive_dir, exist_ok=True)
+            votes_path = os.path.join(archive_dir, f"{poll.poll_id}-votes.ndjson.gz")
+            voters_path = os.path.join(archive_dir, f"{poll.poll_id}-voters.ndjson.gz")
+            _write_archive_file(votes_path, VOTE_EXPORT_FIELDS, vote_rows(poll))
+            _write_archive_file(voters_path, VOTER_EXPORT_FIELDS, voter_rows(poll))
+
+            runoff = ranked_results(poll) if poll.poll_type == Poll.RANKED_CHOICE else None
+            voters = Voter.objects.filter(poll=poll).aggregate(
+                total=Count('voter_id'), voted=Count('voter_id', filter=Q(has_voted=True))
+            )
+
+            with transaction.atomic(using=poll_db()):
+                # Freeze exact tallies before the Vote rows go away
+                refresh_vote_counts(poll.options.all())
+                poll.options.update(archived_votes_count=F('votes_count'))
+                archive = PollArchive.objects.create(
+                    poll=poll,
+                    votes_path=votes_path,
+                    voters_path=voters_path,
+                    votes_count=Vote.objects.filter(poll_option__poll=poll).count(),
+                    voters_count=voters['total'],
+                    voted_count=voters['voted'],
+                    runoff=runoff,
+                )
+
+        deleted_votes = delete_in_chunks(Vote.objects.filter(poll_option__poll=poll), chunk_size)
+        deleted_voters = delete_in_chunks(Voter.objects.filter(poll=poll), chunk_size)
+        delete_in_chunks(AnonymousBallot.objects.filter(poll=poll), chunk_size)
+        return archive, deleted_votes, deleted_voters
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """
+    Delete `queryset` in primary-key batches so no single transaction holds
+    locks on more than `chunk_size` rows.
+    """
+    model = queryset.model
+    pk_name = model._meta.pk.name
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list(pk_name, flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        with transaction.atomic(using=queryset.db):
+            count, _ = model.objects.using(queryset.db).filter(pk__in=pks).delete()
+        deleted += count
@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from uuid import UUID
+
+from django.conf import settings
+from poll.models import Voter, Vote
+from poll.sharding import shard_for_poll
+
+# No anon_id: joined with the vote export it would show how each voter voted
+VOTER_EXPORT_FIELDS = ['voter_id', 'email', 'has_voted', 'created_at']
+VOTE_EXPORT_FIELDS = ['vote_id', 'poll_option_id', 'anon_id', 'created_at']
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_export_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def voter_rows(poll, chunk_size=None):
+    """
+    Yield roster rows for `poll` as tuples ordered like VOTER_EXPORT_FIELDS.
+    Uses a server-side cursor so rows are never all held in memory. The
+    query is pinned to the poll's shard because the rows are usually read
+    after the view has returned.
+    """
+    chunk_size = chunk_size or get_export_chunk_size()
+    return (
+        Voter.objects.using(shard_for_poll(poll.poll_id)).filter(poll=poll)
+        .order_by()
+        .values_list(*VOTER_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def vote_rows(poll, chunk_size=None):
+    """
+    Yield raw ballot rows for `poll` as tuples ordered like VOTE_EXPORT_FIELDS.
+    """
+    chunk_size = chunk_size or get_export_chunk_size()
+    return (
+        Vote.objects.using(shard_for_poll(poll.poll_id)).filter(poll_option__poll=poll)
+        .order_by()
+        .values_list(*VOTE_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def stream_csv(fields, rows, chunk_size=None):
+    """Encode `rows` as CSV, yielding one text chunk per `chunk_size` rows."""
+    chunk_size = chunk_size or get_export_chunk_size()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_format_value(value) for value in row])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def stream_ndjson(fields, rows, chunk_size=None):
+    """Encode `rows` as newline-delimited JSON objects keyed by `fields`."""
+    chunk_size = chunk_size or get_export_chunk_size()
+    lines = []
+
+    for row in rows:
+        record = {field: _format_value(value) for field, value in zip(fields, row)}
+        lines.append(json.dumps(record))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of text chunks into a single gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header value allows gzip: its `gzip` entry,
+    or failing that its `*` entry, has a q-value above zero.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def encode_export(fields, rows, file_format, compress=False):
+    """
+    Return an iterator of bytes for `rows` in `file_format` ('csv' or 'ndjson'),
+    gzip-compressed when `compress` is True.
+    """
+    if file_format == 'ndjson':
+        chunks = stream_ndjson(fields, rows)
+    else:
+        chunks = stream_csv(fields, rows)
+
+    if compress:
+        return gzip_stream(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
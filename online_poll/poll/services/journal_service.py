@@ -0,0 +1,445 @@
+import json
+import os
+import socket
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from poll.models import AnonymousBallot, PollOption, Vote, VoteJournalCheckpoint, Voter
+from poll.services.segment_service import increment_segment_tallies
+from poll.services.turnout_service import record_ballots
+from poll.services.voter_session_service import forget_voter_sessions, mark_session_voted
+from poll.sharding import poll_db, shard_for_poll, use_shard
+
+SEGMENT_SUFFIX = '.journal'
+
+
+class AlreadyJournaled(Exception):
+    """The voter or device already has a ballot in the journal."""
+
+
+class JournalCorrupted(Exception):
+    pass
+
+
+def journal_enabled():
+    return settings.VOTE_INGESTION == 'journal'
+
+
+# -------------------------
+# Writing
+# -------------------------
+def encode_record(record):
+    payload = json.dumps(record, separators=(',', ':')).encode()
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+
+def decode_record(line):
+    checksum, _, payload = line.rstrip(b'\n').partition(b' ')
+    if not payload or int(checksum, 16) != zlib.crc32(payload):
+        raise ValueError("checksum mismatch")
+    return json.loads(payload)
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class VoteJournal:
+    """
+    Append-only journal of accepted ballots, one segment file at a time.
+
+    append() returns only once the record is on disk. Concurrent appends are
+    group-committed: while one thread runs fsync, the others keep writing,
+    and the next fsync covers all of them. Segments are rotated after
+    `segment_bytes`, and each process writes its own segments so workers
+    never share a file.
+    """
+
+    def __init__(self, directory, segment_bytes):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.pid = os.getpid()
+        self.writer_id = f"{socket.gethostname()}-{self.pid}-{int(time.time() * 1000)}"
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._index = 0
+        self._written = 0
+        self._synced = 0
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment()
+
+    def _open_segment(self):
+        name = f"{self.writer_id}.{self._index:06d}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), 'ab')
+        _fsync_dir(self.directory)
+
+    def append(self, record):
+        line = encode_record(record)
+        with self._lock:
+            self._file.write(line)
+            self._written += 1
+            sequence = self._written
+        self._sync(sequence)
+
+    def _sync(self, sequence):
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return
+            with self._lock:
+                self._file.flush()
+                target = self._written
+                size = self._file.tell()
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+            if size >= self.segment_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        # Called with _sync_lock held; waits for in-flight writes to the old file
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._synced = self._written
+            self._index += 1
+            self._open_segment()
+
+    def close(self):
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    global _journal
+    with _journal_lock:
+        # A forked worker must not share its parent's segment
+        if _journal is None or _journal.pid != os.getpid():
+            _journal = VoteJournal(settings.VOTE_JOURNAL_DIR, settings.VOTE_JOURNAL_SEGMENT_BYTES)
+        return _journal
+
+
+def reset_journal():
+    global _journal
+    with _journal_lock:
+        if _journal is not None and _journal.pid == os.getpid():
+            _journal.close()
+        _journal = None
+
+
+def journal_claim_key(poll_id, anon_id):
+    return f"poll:{poll_id}:journal-claim:{anon_id}"
+
+
+def journal_ballot(poll, options, session=None, anon_id=None, ranked=False):
+    """
+    Append one validated ballot to the journal and return its record.
+
+    `options` are the chosen PollOptions, in preference order for ranked
+    ballots. Controlled voters pass their cached `session`, open polls pass
+    the device `anon_id`. No database write happens here: the voter or
+    device is claimed with an atomic cache add, so repeat ballots fail
+    early, and the record is acknowledged once it is on disk. The claim is
+    only as wide as the cache; a repeat that gets past it (another worker
+    with a per-process cache, or an expired claim) is still acknowledged and
+    then rejected by the applier. Raises AlreadyJournaled if the claim is
+    already taken.
+    """
+    record = {
+        'ballot_id': str(uuid4()),
+        'poll_id': str(poll.poll_id),
+        'voter_id': session['voter_id'] if session else None,
+        'anon_id': session['anon_id'] if session else anon_id,
+        'segments': session['segments'] if session else [],
+        'votes': [
+            {'vote_id': str(uuid4()), 'poll_option_id': str(option.option_id),
+             'rank': rank if ranked else None}
+            for rank, option in enumerate(options, start=1)
+        ],
+        'accepted_at': timezone.now().isoformat(),
+    }
+    claim = journal_claim_key(record['poll_id'], record['anon_id'])
+    if not cache.add(claim, record['ballot_id'], timeout=settings.VOTE_JOURNAL_CLAIM_TTL):
+        raise AlreadyJournaled()
+    try:
+        get_journal().append(record)
+    except BaseException:
+        cache.delete(claim)
+        raise
+    if session:
+        mark_session_voted(session)
+    return record
+
+
+# -------------------------
+# Applying
+# -------------------------
+def _writer_alive(writer_id):
+    """
+    Whether the process that wrote `writer_id`'s segments may still append
+    to them. Only a writer on this host whose PID no longer exists is known
+    to be gone; a reused PID keeps its segment open, which is the safe side.
+    """
+    host, pid, _ = writer_id.rsplit('-', 2)
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def list_segments(directory=None):
+    """
+    Return [(name, sealed)] for every segment in the journal directory, in
+    order. A segment is sealed once its writer has moved on to a later one,
+    or once the writer process is gone, so a crashed worker's last segment
+    is still applied and deleted; only sealed segments are ever deleted.
+    """
+    directory = directory or settings.VOTE_JOURNAL_DIR
+    if not os.path.isdir(directory):
+        return []
+
+    by_writer = defaultdict(list)
+    for name in os.listdir(directory):
+        if name.endswith(SEGMENT_SUFFIX):
+            writer_id, index = name[:-len(SEGMENT_SUFFIX)].rsplit('.', 1)
+            by_writer[writer_id].append((int(index), name))
+
+    segments = []
+    for writer_id in sorted(by_writer):
+        indexed = sorted(by_writer[writer_id])
+        alive = _writer_alive(writer_id)
+        for position, (_, name) in enumerate(indexed):
+            segments.append((name, position < len(indexed) - 1 or not alive))
+    return segments
+
+
+def read_records(handle, offset, limit):
+    """
+    Read up to `limit` complete records starting at byte `offset`. A trailing
+    line without its newline is still being written (or was torn by a crash
+    before it was acknowledged) and is left for later.
+
+    Returns (records, next_offset).
+    """
+    handle.seek(offset)
+    records = []
+    while len(records) < limit:
+        line = handle.readline()
+        if not line.endswith(b'\n'):
+            break
+        try:
+            records.append(decode_record(line))
+        except ValueError as exc:
+            raise JournalCorrupted(f"{handle.name} at byte {offset}: {exc}")
+        offset += len(line)
+    return records, offset
+
+
+def apply_records(records):
+    """
+    Insert the ballots in `records` with bulk inserts and return
+    (applied, rejected). Must run inside a transaction.
+
+    Ballots that are already in the database are skipped, so replaying a
+    batch is harmless. Voters (has_voted), devices (AnonymousBallot) and the
+    turnout counters are claimed here, in the batch's transaction, in
+    journal order. A ballot is rejected if its voter already voted, no
+    longer exists or was re-uploaded with a new anon_id since, or if its
+    device already has a ballot in the poll: a repeat that got past the
+    cache claim, or a ballot cast from a stale session.
+
+    Ballots are grouped by poll shard and each group is written in its own
+    transaction on that shard. A batch that fails part-way is retried from
+    the checkpoint, and the groups that already committed are skipped.
+    """
+    by_shard = defaultdict(list)
+    for record in records:
+        by_shard[shard_for_poll(record['poll_id'])].append(record)
+
+    applied = rejected = 0
+    for alias, shard_records in by_shard.items():
+        with use_shard(alias), transaction.atomic(using=alias):
+            shard_applied, shard_rejected = _apply_shard_records(shard_records)
+        applied += shard_applied
+        rejected += shard_rejected
+    return applied, rejected
+
+
+def _apply_shard_records(records):
+    first_ids = [record['votes'][0]['vote_id'] for record in records]
+    already_applied = {
+        str(vote_id) for vote_id in
+        Vote.objects.filter(vote_id__in=first_ids).values_list('vote_id', flat=True)
+    }
+    pending = [record for record in records if record['votes'][0]['vote_id'] not in already_applied]
+
+    poll_ids = {record['poll_id'] for record in pending}
+    anon_ids = {record['anon_id'] for record in pending}
+    taken = {
+        (str(poll_id), anon_id) for poll_id, anon_id in
+        Vote.objects.filter(poll_option__poll_id__in=poll_ids, anon_id__in=anon_ids)
+        .values_list('poll_option__poll_id', 'anon_id').distinct()
+    }
+    taken.update(
+        (str(poll_id), anon_id) for poll_id, anon_id in
+        AnonymousBallot.objects.filter(poll_id__in=poll_ids, anon_id__in=anon_ids)
+        .values_list('poll_id', 'anon_id')
+    )
+    # Voters who have not voted yet -> their current anon_id
+    open_voters = {
+        str(voter_id): anon_id for voter_id, anon_id in
+        Voter.objects.select_for_update().filter(
+            voter_id__in={record['voter_id'] for record in pending if record['voter_id']},
+            has_voted=False,
+        ).values_list('voter_id', 'anon_id')
+    }
+
+    votes, ballots, voter_ids, counts, segment_counts = [], [], [], Counter(), Counter()
+    # (poll_id, minute accepted) -> [ballots, voted]
+    turnout = defaultdict(lambda: [0, 0])
+    rejected = 0
+    for record in pending:
+        key = (record['poll_id'], record['anon_id'])
+        voter_id = record['voter_id']
+        if key in taken or (voter_id and open_voters.get(voter_id) != record['anon_id']):
+            rejected += 1
+            continue
+        taken.add(key)
+        minute = parse_datetime(record['accepted_at']).replace(second=0, microsecond=0)
+        turnout[record['poll_id'], minute][0] += 1
+        if voter_id:
+            del open_voters[voter_id]
+            voter_ids.append(voter_id)
+            turnout[record['poll_id'], minute][1] += 1
+        else:
+            ballots.append(AnonymousBallot(poll_id=record['poll_id'], anon_id=record['anon_id']))
+
+        for vote in record['votes']:
+            votes.append(Vote(
+                vote_id=vote['vote_id'], poll_option_id=vote['poll_option_id'],
+                anon_id=record['anon_id'], rank=vote['rank'],
+            ))
+            if vote['rank'] in (None, 1):
+                counts[vote['poll_option_id']] += 1
+                for code in record['segments']:
+                    segment_counts[vote['poll_option_id'], code] += 1
+
+    AnonymousBallot.objects.bulk_create(ballots)
+    Voter.objects.filter(voter_id__in=voter_ids).update(has_voted=True, updated_at=timezone.now())
+    Vote.objects.bulk_create(votes)
+    for option_id, amount in counts.items():
+        PollOption.objects.filter(option_id=option_id).update(votes_count=F('votes_count') + amount)
+    increment_segment_tallies(segment_counts)
+    for (poll_id, minute), (ballot_count, voted_count) in turnout.items():
+        record_ballots(poll_id, ballot_count, voted=voted_count, when=minute)
+    # Cached sessions may predate the vote if the claim was made elsewhere
+    transaction.on_commit(lambda: forget_voter_sessions(voter_ids), using=poll_db())
+
+    return len(pending) - rejected, rejected
+
+
+def apply_segment(name, sealed, batch_size, directory=None):
+    """
+    Replay one segment from its checkpoint in batches of `batch_size`
+    records, each committed together with the advanced checkpoint. A sealed
+    segment that has been fully applied is deleted.
+
+    Returns (applied, rejected).
+    """
+    directory = directory or settings.VOTE_JOURNAL_DIR
+    path = os.path.join(directory, name)
+    checkpoint, _ = VoteJournalCheckpoint.objects.get_or_create(segment=name)
+    applied = rejected = 0
+
+    with open(path, 'rb') as handle:
+        while True:
+            records, offset = read_records(handle, checkpoint.offset, batch_size)
+            if not records:
+                break
+            with transaction.atomic():
+                batch_applied, batch_rejected = apply_records(records)
+                checkpoint.offset = offset
+                checkpoint.records_applied += batch_applied
+                checkpoint.records_rejected += batch_rejected
+                checkpoint.save()
+            applied += batch_applied
+            rejected += batch_rejected
+
+    # Bytes past the last newline of a sealed segment were never acknowledged
+    if sealed:
+        os.remove(path)
+        checkpoint.delete()
+    return applied, rejected
+
+
+def apply_journal(batch_size=None, directory=None):
+    """Apply every segment once. Returns (applied, rejected) totals."""
+    batch_size = batch_size or settings.VOTE_JOURNAL_APPLY_BATCH
+    applied = rejected = 0
+    for name, sealed in list_segments(directory):
+        segment_applied, segment_rejected = apply_segment(name, sealed, batch_size, directory)
+        applied += segment_applied
+        rejected += segment_rejected
+    return applied, rejected
+
+
+def journal_lag(directory=None):
+    """
+    How far the applier is behind the journal: unapplied bytes and segments,
+    and the age of the oldest unapplied ballot.
+    """
+    directory = directory or settings.VOTE_JOURNAL_DIR
+    segments = list_segments(directory)
+    offsets = dict(
+        VoteJournalCheckpoint.objects.filter(segment__in=[name for name, _ in segments])
+        .values_list('segment', 'offset')
+    )
+
+    pending_bytes = 0
+    pending_segments = 0
+    oldest = None
+    for name, _ in segments:
+        path = os.path.join(directory, name)
+        offset = offsets.get(name, 0)
+        behind = os.path.getsize(path) - offset
+        if behind <= 0:
+            continue
+        pending_bytes += behind
+        pending_segments += 1
+        with open(path, 'rb') as handle:
+            records, _ = read_records(handle, offset, 1)
+        if records:
+            accepted_at = parse_datetime(records[0]['accepted_at'])
+            oldest = accepted_at if oldest is None else min(oldest, accepted_at)
+
+    return {
+        'segments': len(segments),
+        'pending_segments': pending_segments,
+        'pending_bytes': pending_bytes,
+        'oldest_pending_at': oldest.isoformat() if oldest else None,
+        'lag_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+    }
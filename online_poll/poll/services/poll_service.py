@@ -0,0 +1,102 @@
+import base64
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from poll.models import Poll, PollOption
+from poll.services.results_service import InvalidCursor
+from poll.sharding import poll_shards, shard_for_poll
+
+LISTING_ORDERING = ('-created_at', 'poll_id')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def bulk_create_polls(creator, polls_data, batch_size=None):
+    """
+    Insert already-validated polls (each with nested `options`) for `creator`.
+    Polls and options are written with two bulk_create calls per shard, each
+    shard in its own transaction. Returns the created Poll instances in input
+    order.
+    """
+    batch_size = batch_size or settings.POLL_BULK_BATCH_SIZE
+    polls = []
+    by_shard = defaultdict(lambda: ([], []))
+
+    for poll_data in polls_data:
+        poll_data = dict(poll_data)
+        options_data = poll_data.pop('options', [])
+        poll = Poll(creator=creator, **poll_data)
+        polls.append(poll)
+        shard_polls, shard_options = by_shard[shard_for_poll(poll.poll_id)]
+        shard_polls.append(poll)
+        shard_options.extend(PollOption(poll=poll, **option_data) for option_data in options_data)
+
+    for alias, (shard_polls, shard_options) in by_shard.items():
+        with transaction.atomic(using=alias):
+            Poll.objects.using(alias).bulk_create(shard_polls, batch_size=batch_size)
+            PollOption.objects.using(alias).bulk_create(shard_options, batch_size=batch_size)
+
+    return polls
+
+
+def _listing_key(key):
+    # Ascending merge key for the listing order: newest first, then poll_id
+    _, created_at, poll_id = key
+    return (-((created_at - _EPOCH) // _MICROSECOND), poll_id.hex)
+
+
+def encode_listing_cursor(created_at, poll_id):
+    raw = f"{created_at.isoformat()}|{poll_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_listing_cursor(cursor):
+    try:
+        created_at, poll_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), UUID(poll_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid listing cursor.")
+
+
+def poll_page(queryset, limit, cursor=None):
+    """
+    Return (polls, next_cursor) for one page of `queryset` in listing order
+    (newest first, then poll_id), starting after `cursor`. A `limit` of None
+    returns every poll after `cursor` as a single page.
+
+    The page is read in two steps: the (created_at, poll_id) keys of at most
+    `limit` polls per shard, which poll_created_idx / poll_creator_created_idx
+    answer without touching the table, merged across shards; then the rows
+    (and whatever `queryset` prefetches) of just the polls on the page.
+    `next_cursor` is None on the last page.
+    """
+    keys = queryset.order_by(*LISTING_ORDERING)
+    if cursor:
+        after_created, after_id = decode_listing_cursor(cursor)
+        keys = keys.filter(Q(created_at__lt=after_created) | Q(created_at=after_created, poll_id__gt=after_id))
+
+    shard_pages = [
+        [(alias, created_at, poll_id) for created_at, poll_id in
+         keys.using(alias).values_list('created_at', 'poll_id')[:limit]]
+        for alias in poll_shards()
+    ]
+    page = list(islice(heapq.merge(*shard_pages, key=_listing_key), limit))
+
+    by_shard = defaultdict(list)
+    for alias, _, poll_id in page:
+        by_shard[alias].append(poll_id)
+    rows = {}
+    for alias, poll_ids in by_shard.items():
+        rows.update((poll.poll_id, poll) for poll in queryset.using(alias).filter(poll_id__in=poll_ids).order_by())
+
+    # A poll deleted between the two steps is left out of the page
+    polls = [rows[poll_id] for _, _, poll_id in page if poll_id in rows]
+    next_cursor = encode_listing_cursor(*page[-1][1:]) if limit and len(page) == limit else None
+    return polls, next_cursor
@@ -0,0 +1,79 @@
+from django.db import connections, transaction
+from poll.models import (
+    AnonymousBallot, Poll, PollArchive, PollOption, PollSegment, SegmentTally, TurnoutBucket, Vote, Voter
+)
+from poll.services.archive_service import delete_in_chunks
+from poll.sharding import shard_for_poll
+
+# Copy order: parents before the rows that reference them
+POLL_ROWS = [
+    (Poll, 'poll_id'),
+    (PollOption, 'poll_id'),
+    (PollSegment, 'poll_id'),
+    (SegmentTally, 'poll_option__poll_id'),
+    (Voter, 'poll_id'),
+    (AnonymousBallot, 'poll_id'),
+    (PollArchive, 'poll_id'),
+    (TurnoutBucket, 'poll_id'),
+    (Vote, 'poll_option__poll_id'),
+]
+
+
+def misplaced_polls(sources, targets):
+    """
+    Yield (poll_id, source, target) for every poll stored on one of the
+    `sources` aliases that the ring over `targets` places elsewhere.
+    """
+    for source in sources:
+        poll_ids = Poll._base_manager.using(source).order_by('poll_id').values_list('poll_id', flat=True)
+        for poll_id in poll_ids.iterator():
+            target = shard_for_poll(poll_id, targets)
+            if target != source:
+                yield poll_id, source, target
+
+
+def _copy_rows(model, lookup, poll_id, source, target, batch_size):
+    # Auto-increment keys are reassigned by the target; nothing references them
+    fields = [field for field in model._meta.local_concrete_fields if field is not model._meta.auto_field]
+    queryset = model._base_manager.using(source).filter(**{lookup: poll_id}).order_by('pk')
+    batch = []
+    copied = 0
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) == batch_size:
+            copied += _insert(model, fields, batch, target)
+            batch = []
+    if batch:
+        copied += _insert(model, fields, batch, target)
+    return copied
+
+
+def _insert(model, fields, objs, target):
+    # raw=True keeps created_at/updated_at instead of stamping them again
+    size = connections[target].ops.bulk_batch_size(fields, objs) or len(objs)
+    for start in range(0, len(objs), size):
+        model._base_manager._insert(objs[start:start + size], fields=fields, using=target, raw=True)
+    return len(objs)
+
+
+def move_poll(poll_id, source, target, batch_size=1000):
+    """
+    Copy a poll and all of its rows from `source` to `target` in one
+    transaction on the target, then delete them from the source in chunks.
+    A poll already present on the target was copied by an interrupted run,
+    so only the deletion is resumed.
+
+    Votes, voter uploads and archiving for the poll must be paused while it
+    moves. Returns the number of rows copied.
+    """
+    copied = 0
+    if not Poll._base_manager.using(target).filter(poll_id=poll_id).exists():
+        with transaction.atomic(using=target):
+            for model, lookup in POLL_ROWS:
+                copied += _copy_rows(model, lookup, poll_id, source, target, batch_size)
+
+    for model, lookup in reversed(POLL_ROWS[1:]):
+        delete_in_chunks(model._base_manager.using(source).filter(**{lookup: poll_id}), batch_size)
+    with transaction.atomic(using=source):
+        Poll._base_manager.using(source).filter(poll_id=poll_id).delete()
+    return copied
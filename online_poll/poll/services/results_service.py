@@ -0,0 +1,137 @@
+import base64
+from collections import defaultdict
+from uuid import UUID
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from poll.models import Poll, PollOption, Vote
+from poll.sharding import shard_for_poll
+
+# Votes that count towards an option's tally: every plain vote, and only the
+# first preference of a ranked ballot
+COUNTED_VOTES = Q(rank__isnull=True) | Q(rank=1)
+
+RESULTS_ORDERING = ('-votes_count', 'option_id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def increment_vote_count(option_id, amount=1):
+    PollOption.objects.filter(option_id=option_id).update(votes_count=F('votes_count') + amount)
+
+
+def refresh_vote_counts(options):
+    """Recompute the stored votes_count of `options` (a PollOption queryset) from Vote rows."""
+    counted = (
+        Vote.objects.filter(COUNTED_VOTES, poll_option=OuterRef('pk'))
+        .order_by()
+        .values('poll_option')
+        .annotate(total=Count('vote_id'))
+        .values('total')
+    )
+    return options.update(votes_count=Coalesce(Subquery(counted), 0))
+
+
+def total_votes(poll):
+    """Total counted votes of `poll`, computed once from the option tallies."""
+    return poll.options.aggregate(total=Sum('votes_count'))['total'] or 0
+
+
+def encode_cursor(option):
+    raw = f"{option.votes_count}:{option.option_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        votes_count, option_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(votes_count), UUID(option_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid results cursor.")
+
+
+def ranked_options(poll, limit=None, cursor=None, total=None):
+    """
+    Return `poll`'s options in results order, each annotated with `rank`
+    (1 + number of options with strictly more votes) and `percentage`.
+
+    `limit` and `cursor` select a window using a keyset on
+    (votes_count DESC, option_id), which is served by option_poll_votes_idx.
+    Ranks within the window follow from the order, so only a window that
+    starts after a cursor needs extra queries to place its first row.
+    """
+    options = poll.options.order_by(*RESULTS_ORDERING)
+    if cursor:
+        after_count, after_id = decode_cursor(cursor)
+        options = options.filter(
+            Q(votes_count__lt=after_count) | Q(votes_count=after_count, option_id__gt=after_id)
+        )
+    if limit is not None:
+        options = options[:limit]
+    options = list(options)
+
+    if total is None:
+        total = total_votes(poll)
+
+    # Position of the window's first row in the full ordering; both counts
+    # are range scans on option_poll_votes_idx and are skipped on page one
+    preceding = greater = 0
+    if options and cursor:
+        first = options[0]
+        greater = poll.options.filter(votes_count__gt=first.votes_count).count()
+        preceding = greater + poll.options.filter(
+            votes_count=first.votes_count, option_id__lt=first.option_id
+        ).count()
+
+    return _rank(options, total, preceding, greater)
+
+
+def _rank(options, total, preceding=0, greater=0):
+    # `options` are in results order; `preceding` / `greater` place the first one
+    for position, option in enumerate(options):
+        if position == 0:
+            option.rank = greater + 1
+        elif option.votes_count == options[position - 1].votes_count:
+            option.rank = options[position - 1].rank
+        else:
+            option.rank = preceding + position + 1
+        option.percentage = round(option.votes_count * 100 / total, 2) if total else 0.0
+    return options
+
+
+def batch_results(poll_ids):
+    """
+    Results of several polls at once: {poll_id: (total_votes, options)} with
+    the options ranked as by ranked_options. Each shard is read with a single
+    query over its polls left-joined to their options, so a poll without
+    options still appears; poll IDs that do not exist are left out.
+    """
+    by_shard = defaultdict(list)
+    for poll_id in poll_ids:
+        by_shard[shard_for_poll(poll_id)].append(poll_id)
+
+    results = {}
+    for alias, shard_poll_ids in by_shard.items():
+        rows = (
+            Poll.objects.using(alias)
+            .filter(poll_id__in=shard_poll_ids)
+            .order_by('poll_id', '-options__votes_count', 'options__option_id')
+            .values_list(
+                'poll_id', 'options__option_id', 'options__text',
+                'options__created_at', 'options__votes_count',
+            )
+        )
+        for poll_id, option_id, text, created_at, votes_count in rows:
+            options = results.setdefault(poll_id, [])
+            if option_id is not None:
+                options.append(PollOption(
+                    option_id=option_id, poll_id=poll_id, text=text,
+                    created_at=created_at, votes_count=votes_count,
+                ))
+
+    for poll_id, options in results.items():
+        total = sum(option.votes_count for option in options)
+        results[poll_id] = (total, _rank(options, total))
+    return results
@@ -0,0 +1,110 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Max
+from poll.models import Poll, PollOption, PollSegment, SegmentTally
+from poll.sharding import poll_db
+
+
+def encode_segments(poll, voters_data):
+    """
+    Return the segment codes of each uploaded voter dict, in input order.
+
+    Only the poll's `segment_attributes` are kept. Values seen for the first
+    time get the next free code and a zeroed tally row per option; the poll
+    row is locked meanwhile so concurrent uploads do not hand out the same
+    code twice.
+    """
+    attributes = poll.segment_attributes or []
+    pairs = [
+        [(attribute, str(data[attribute])[:255]) for attribute in attributes
+         if data.get(attribute) not in (None, '')]
+        for data in voters_data
+    ]
+    wanted = {pair for voter_pairs in pairs for pair in voter_pairs}
+    if not wanted:
+        return [[] for _ in voters_data]
+
+    with transaction.atomic(using=poll_db()):
+        list(Poll.objects.select_for_update().filter(poll_id=poll.poll_id).values_list('poll_id', flat=True))
+        codes = {
+            (segment.attribute, segment.value): segment.code
+            for segment in PollSegment.objects.filter(poll=poll, attribute__in=attributes)
+        }
+        missing = sorted(wanted - codes.keys())
+        if missing:
+            next_code = (PollSegment.objects.filter(poll=poll).aggregate(top=Max('code'))['top'] or 0) + 1
+            created = PollSegment.objects.bulk_create([
+                PollSegment(poll=poll, attribute=attribute, value=value, code=next_code + offset)
+                for offset, (attribute, value) in enumerate(missing)
+            ])
+            codes.update({(segment.attribute, segment.value): segment.code for segment in created})
+            option_ids = list(PollOption.objects.filter(poll=poll).values_list('option_id', flat=True))
+            SegmentTally.objects.bulk_create(
+                [SegmentTally(poll_option_id=option_id, code=segment.code)
+                 for option_id in option_ids for segment in created],
+                ignore_conflicts=True,
+            )
+
+    return [[codes[pair] for pair in voter_pairs] for voter_pairs in pairs]
+
+
+def increment_segment_tallies(counts):
+    """
+    Add `counts`, a Counter of (option_id, code) -> votes, to the segment
+    tallies. Rows missing for an option added after the upload are created.
+    """
+    by_amount = {}
+    for (option_id, code), amount in counts.items():
+        by_amount.setdefault((option_id, amount), []).append(code)
+
+    for (option_id, amount), codes in by_amount.items():
+        tallies = SegmentTally.objects.filter(poll_option_id=option_id, code__in=codes)
+        if tallies.update(votes_count=F('votes_count') + amount) < len(codes):
+            missing = set(codes) - set(tallies.values_list('code', flat=True))
+            SegmentTally.objects.bulk_create(
+                [SegmentTally(poll_option_id=option_id, code=code) for code in missing],
+                ignore_conflicts=True,
+            )
+            SegmentTally.objects.filter(poll_option_id=option_id, code__in=missing).update(
+                votes_count=F('votes_count') + amount
+            )
+
+
+def record_segment_vote(option_id, codes):
+    if codes:
+        increment_segment_tallies(Counter((option_id, code) for code in codes))
+
+
+def segment_results(poll, attribute=None):
+    """
+    Cross-tab of votes by option and segment, read from the rollups: one
+    entry per attribute, each listing its segment values with per-option
+    votes and the segment total. Only votes from invited voters are
+    segmented.
+    """
+    segments = PollSegment.objects.filter(poll=poll).order_by('attribute', 'value')
+    if attribute is not None:
+        segments = segments.filter(attribute=attribute)
+    segments = list(segments)
+
+    options = list(PollOption.objects.filter(poll=poll).order_by('text', 'option_id').values('option_id', 'text'))
+    tallies = {
+        (option_id, code): votes
+        for option_id, code, votes in SegmentTally.objects.filter(
+            poll_option__poll=poll, code__in=[segment.code for segment in segments]
+        ).values_list('poll_option_id', 'code', 'votes_count')
+    }
+
+    attributes = {}
+    for segment in segments:
+        votes = [tallies.get((option['option_id'], segment.code), 0) for option in options]
+        attributes.setdefault(segment.attribute, []).append({
+            'value': segment.value,
+            'total_votes': sum(votes),
+            'options': [
+                {'option_id': option['option_id'], 'text': option['text'], 'votes': count}
+                for option, count in zip(options, votes)
+            ],
+        })
+    return [{'attribute': name, 'segments': values} for name, values in attributes.items()]
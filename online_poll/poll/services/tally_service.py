@@ -0,0 +1,214 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from poll.models import PollArchive, Vote
+
+NO_PREFERENCE = -1
+
+
+def ranked_tally_cache_key(poll_id):
+    return f"poll:{poll_id}:ranked-tally"
+
+
+def load_ballots(poll, chunk_size=None):
+    """
+    Load every ranked ballot of `poll` into a compact integer matrix.
+
+    Returns (option_ids, ballots) where `ballots` is an int32 array of shape
+    (n_ballots, max_rank). Row i holds ballot i's preferences as indexes into
+    `option_ids`, in rank order, padded with NO_PREFERENCE.
+
+    Rows are read from the cursor as is (anon_id as raw bytes, the option
+    key as the database's text form of its UUID, no per-row model field
+    conversion), so each fetched chunk becomes three numpy columns without a
+    Python step per row. Option keys are mapped to indexes with a binary
+    search over the poll's sorted keys, and ballots are numbered by their
+    anon_id.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    # The same text cast on both sides, whatever the backend's UUID format
+    option_keys = list(
+        poll.options.order_by('created_at', 'option_id')
+        .values_list('option_id', Cast('option_id', CharField()))
+    )
+    option_ids = [option_id for option_id, _ in option_keys]
+    empty = np.zeros((0, 0), dtype=np.int32)
+    if not option_ids:
+        return option_ids, empty
+
+    keys = np.array([key for _, key in option_keys])
+    key_order = np.argsort(keys).astype(np.int32)
+    sorted_keys = keys[key_order]
+
+    votes = (
+        Vote.objects.filter(poll_option_id__in=option_ids, rank__isnull=False)
+        .order_by()
+        .annotate(option_key=Cast('poll_option_id', CharField()))
+        .values_list('anon_id', 'option_key', 'rank')
+    )
+    sql, params = votes.query.sql_with_params()
+    digest_dtype = f"S{Vote._meta.get_field('anon_id').digest_size}"
+
+    key_chunks, option_chunks, rank_chunks = [], [], []
+    with connections[votes.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while chunk := cursor.fetchmany(chunk_size):
+            anon_ids, options, ranks = zip(*chunk)
+            key_chunks.append(np.frombuffer(b''.join(anon_ids), dtype=digest_dtype))
+            option_chunks.append(key_order[np.searchsorted(sorted_keys, np.array(options))])
+            rank_chunks.append(np.array(ranks, dtype=np.int32))
+
+    if not key_chunks:
+        return option_ids, empty
+
+    ranks = np.concatenate(rank_chunks)
+    n_ballots, ballot_col = _number_ballots(np.concatenate(key_chunks))
+    ballots = np.full((n_ballots, int(ranks.max())), NO_PREFERENCE, dtype=np.int32)
+    ballots[ballot_col, ranks - 1] = np.concatenate(option_chunks)
+    return option_ids, ballots
+
+
+def _number_ballots(keys):
+    """
+    Number the distinct digests in `keys`; returns (count, index per row).
+    Grouping on the last 8 bytes is a fast integer sort. The full digests
+    are then compared with their group's first row, and only a (practically
+    impossible) suffix collision falls back to sorting the whole digests.
+    """
+    words = keys.itemsize // 8
+    suffixes = np.frombuffer(keys.tobytes(), dtype=np.uint64)[words - 1::words]
+    unique_suffixes, first, inverse = np.unique(suffixes, return_index=True, return_inverse=True)
+    if np.array_equal(keys, keys[first][inverse]):
+        return len(unique_suffixes), inverse
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return len(unique_keys), inverse
+
+
+def instant_runoff(ballots, n_options):
+    """
+    Run instant-runoff rounds over a ballot matrix as produced by load_ballots.
+
+    Every round is a handful of whole-array operations: only the ballots whose
+    current choice was just eliminated are advanced to their next continuing
+    preference, and the round's tally is a single bincount. Ties for last
+    place are broken by the counts of earlier rounds (most recent first),
+    then by option index.
+
+    Returns (winner_index_or_None, rounds) where each round is a dict with
+    `counts` (int64 array of length n_options, zero for eliminated options),
+    `continuing` (indexes of options still in the race), `exhausted` and
+    `eliminated` (option index or None).
+    """
+    n_ballots = ballots.shape[0]
+    rounds = []
+
+    if n_options == 0:
+        return None, rounds
+
+    # Padding and exhausted ballots point at a sentinel slot that never continues
+    exhausted_slot = n_options
+    continuing = np.ones(n_options + 1, dtype=bool)
+    continuing[exhausted_slot] = False
+    padded = np.where(ballots == NO_PREFERENCE, exhausted_slot, ballots)
+
+    top = _next_choices(padded, continuing, exhausted_slot)
+
+    while True:
+        tally = np.bincount(top, minlength=n_options + 1).astype(np.int64)
+        counts = tally[:n_options]
+        exhausted = int(tally[exhausted_slot])
+        active_ballots = n_ballots - exhausted
+        remaining = np.flatnonzero(continuing[:n_options])
+        round_info = {
+            'counts': counts,
+            'continuing': remaining,
+            'exhausted': exhausted,
+            'eliminated': None,
+        }
+        rounds.append(round_info)
+
+        leader = remaining[np.argmax(counts[remaining])]
+        if counts[leader] * 2 > active_ballots or len(remaining) == 1:
+            return int(leader), rounds
+        if active_ballots == 0:
+            return None, rounds
+
+        loser = _lowest_option(remaining, rounds)
+        continuing[loser] = False
+        round_info['eliminated'] = loser
+
+        transferred = np.flatnonzero(top == loser)
+        top[transferred] = _next_choices(padded[transferred], continuing, exhausted_slot)
+
+
+def _next_choices(padded, continuing, exhausted_slot):
+    """Highest ranked continuing option of each row, or `exhausted_slot`."""
+    if padded.shape[1] == 0:
+        return np.full(padded.shape[0], exhausted_slot, dtype=padded.dtype)
+    live = continuing[padded]
+    first = live.argmax(axis=1)
+    rows = np.arange(padded.shape[0])
+    return np.where(live[rows, first], padded[rows, first], exhausted_slot)
+
+
+def _lowest_option(remaining, rounds):
+    candidates = remaining
+    for round_info in reversed(rounds):
+        counts = round_info['counts'][candidates]
+        candidates = candidates[counts == counts.min()]
+        if len(candidates) == 1:
+            break
+    return int(candidates[0])
+
+
+def ranked_results(poll):
+    """
+    Return the instant-runoff breakdown for a ranked poll. Once the poll is
+    closed the breakdown can no longer change, so it is cached indefinitely;
+    while it is open, a breakdown is reused for RANKED_TALLY_CACHE_TTL
+    seconds rather than reloading every ballot on each request. Archived
+    polls return the breakdown recorded when they were archived.
+    """
+    cache_key = ranked_tally_cache_key(poll.poll_id)
+    closed = poll.is_closed
+    cached = cache.get(cache_key)
+    # A breakdown cached while the poll was open is stale once it closes
+    if cached is not None and cached.get('closed', True) == closed:
+        return cached
+
+    if closed:
+        archive = PollArchive.objects.filter(poll=poll).only('runoff').first()
+        if archive is not None and archive.runoff is not None:
+            cache.set(cache_key, archive.runoff, timeout=None)
+            return archive.runoff
+
+    option_ids, ballots = load_ballots(poll)
+    winner, rounds = instant_runoff(ballots, len(option_ids))
+
+    result = {
+        'poll_id': str(poll.poll_id),
+        'total_ballots': int(ballots.shape[0]),
+        'winner': str(option_ids[winner]) if winner is not None else None,
+        'rounds': [
+            {
+                'round': number,
+                'counts': {
+                    str(option_ids[index]): int(round_info['counts'][index])
+                    for index in round_info['continuing']
+                },
+                'exhausted': round_info['exhausted'],
+                'eliminated': (
+                    str(option_ids[round_info['eliminated']])
+                    if round_info['eliminated'] is not None else None
+                ),
+            }
+            for number, round_info in enumerate(rounds, start=1)
+        ],
+        'closed': closed,
+    }
+
+    cache.set(cache_key, result, timeout=None if closed else settings.RANKED_TALLY_CACHE_TTL)
+    return result
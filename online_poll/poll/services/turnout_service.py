@@ -0,0 +1,158 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from poll.models import Poll, PollArchive, TurnoutBucket, Voter
+
+
+def _minute(when):
+    return when.replace(second=0, microsecond=0)
+
+
+def add_invited(poll_id, amount):
+    """Adjust the invited-voter counter of a poll by `amount` (negative on removal)."""
+    if amount:
+        Poll.objects.filter(poll_id=poll_id).update(voters_count=F('voters_count') + amount)
+
+
+def record_ballots(poll_id, ballots=1, voted=0, when=None):
+    """
+    Count `ballots` cast in a poll at `when` (default: now), and `voted`
+    invited voters who voted. Must run inside the transaction that records
+    them. Both land in one random slot of the minute's bucket; the poll row
+    itself is not written, so votes in the same poll do not queue on it.
+    """
+    if not (ballots or voted):
+        return
+
+    minute = _minute(when or timezone.now())
+    slot = random.randrange(settings.TURNOUT_BUCKET_SLOTS)
+    buckets = TurnoutBucket.objects.filter(poll_id=poll_id, minute=minute, slot=slot)
+    increments = {'votes_count': F('votes_count') + ballots, 'voted_count': F('voted_count') + voted}
+    if not buckets.update(**increments):
+        # First ballot of the slot; a concurrent first ballot may create it too
+        TurnoutBucket.objects.bulk_create(
+            [TurnoutBucket(poll_id=poll_id, minute=minute, slot=slot)], ignore_conflicts=True
+        )
+        buckets.update(**increments)
+
+
+def turnout(poll, minutes, now=None):
+    """
+    Invited voters, how many of them voted, and the ballots cast in the
+    last `minutes` minutes (the current minute included), all read from
+    counters: the poll row plus one sum over its buckets.
+    """
+    since = _minute(now or timezone.now()) - timedelta(minutes=minutes - 1)
+    buckets = TurnoutBucket.objects.filter(poll=poll).aggregate(
+        recent=Sum('votes_count', filter=Q(minute__gte=since)),
+        voted=Sum('voted_count'),
+    )
+    voted = poll.voted_count + (buckets['voted'] or 0)
+    return {
+        'poll_id': str(poll.poll_id),
+        'invited': poll.voters_count,
+        'voted': voted,
+        'percentage': round(voted * 100 / poll.voters_count, 2) if poll.voters_count else 0.0,
+        'minutes': minutes,
+        'recent_votes': buckets['recent'] or 0,
+    }
+
+
+def _count(queryset, field, **filters):
+    return Coalesce(Subquery(
+        queryset.filter(poll_id=OuterRef('poll_id'), **filters).order_by()
+        .values('poll_id').annotate(total=field).values('total')
+    ), 0, output_field=IntegerField())
+
+
+def reconcile_turnout(alias, chunk_size, dry_run=False):
+    """
+    Recount the invited and voted counters of every poll on `alias` from the
+    Voter rows, `chunk_size` polls per transaction, and fix those that
+    drifted. Archived polls take their counts from the archive.
+
+    The chunk's poll rows are locked and read in the same statement as the
+    voter and bucket counts, so a vote committing meanwhile is either in all
+    of them or in none. Poll.voted_count is then set to the voted voters
+    not already counted in the buckets.
+
+    Returns (checked, fixed).
+    """
+    polls = Poll._base_manager.using(alias).order_by('poll_id')
+    voters = Voter._base_manager.using(alias)
+    buckets = TurnoutBucket._base_manager.using(alias)
+    checked = fixed = 0
+    last = None
+    while True:
+        chunk = polls.filter(poll_id__gt=last) if last else polls
+        poll_ids = list(chunk.values_list('poll_id', flat=True)[:chunk_size])
+        if not poll_ids:
+            return checked, fixed
+        last = poll_ids[-1]
+
+        with transaction.atomic(using=alias):
+            rows = (
+                polls.select_for_update().filter(poll_id__in=poll_ids)
+                .annotate(
+                    invited=_count(voters, Count('voter_id')),
+                    voted=_count(voters, Count('voter_id'), has_voted=True),
+                    bucketed=_count(buckets, Sum('voted_count')),
+                )
+                .values_list('poll_id', 'voters_count', 'voted_count', 'invited', 'voted', 'bucketed')
+            )
+            stored, actual, bucketed = {}, {}, {}
+            for poll_id, voters_count, voted_count, invited, voted, in_buckets in rows:
+                stored[poll_id] = (voters_count, voted_count)
+                actual[poll_id] = (invited, voted)
+                bucketed[poll_id] = in_buckets
+            actual.update(
+                (poll_id, (voters_count, voted_count))
+                for poll_id, voters_count, voted_count in PollArchive._base_manager.using(alias)
+                .filter(poll_id__in=poll_ids).values_list('poll_id', 'voters_count', 'voted_count')
+            )
+
+            for poll_id, (voters_count, voted_count) in actual.items():
+                # Bucketed votes of voters deleted since cannot be taken back
+                # here; they are dropped from the total on the next run after
+                # the buckets are pruned
+                voted_count = max(voted_count - bucketed[poll_id], 0)
+                if stored[poll_id] == (voters_count, voted_count):
+                    continue
+                fixed += 1
+                if not dry_run:
+                    polls.filter(poll_id=poll_id).update(voters_count=voters_count, voted_count=voted_count)
+        checked += len(stored)
+
+
+def prune_turnout_buckets(alias, chunk_size, now=None):
+    """
+    Delete per-minute buckets older than TURNOUT_MAX_MINUTES on `alias`,
+    `chunk_size` per transaction, first adding their voted counts to their
+    polls' voted_count. Returns the number of buckets deleted.
+    """
+    cutoff = _minute(now or timezone.now()) - timedelta(minutes=settings.TURNOUT_MAX_MINUTES)
+    buckets = TurnoutBucket._base_manager.using(alias)
+    polls = Poll._base_manager.using(alias)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=alias):
+            pks = list(
+                buckets.select_for_update().filter(minute__lt=cutoff).order_by()
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                return deleted
+            expired = buckets.filter(pk__in=pks)
+            folded = (
+                expired.order_by().values('poll_id').annotate(voted=Sum('voted_count'))
+                .filter(voted__gt=0).values_list('poll_id', 'voted')
+            )
+            for poll_id, voted in folded:
+                polls.filter(poll_id=poll_id).update(voted_count=F('voted_count') + voted)
+            count, _ = expired.delete()
+        deleted += count
@@ -1,8 +1,12 @@
 from django.contrib.auth.hashers import make_password
-from poll.models import Voter
+from django.db import transaction
+from poll.models import Poll, Voter
+from poll.services.turnout_service import add_invited
+from poll.services.voter_session_service import forget_voter_session, forget_voter_sessions
+from poll.sharding import poll_db
 from poll.utils import generate_temp_password, generate_anon_id, send_voter_credentials_email
 
-def create_voter_for_poll(poll, email, send_email=True):
+def create_voter_for_poll(poll, email, send_email=True, segments=None):
     """
     Create or get a Voter for `poll` and `email`.
     Returns (voter, created, plain_temp_password_or_None)
@@ -24,13 +28,18 @@ def create_voter_for_poll(poll, email, send_email=True):
         defaults={
             "anon_id": anon,
             "temp_password": hashed_pw,  # store hashed
+            "segments": segments or [],
         }
     )
 
-    if not created and (not voter.has_voted):
+    if created:
+        add_invited(poll.poll_id, 1)
+    elif not voter.has_voted:
         voter.anon_id = anon
         voter.temp_password = hashed_pw
-        voter.save(update_fields=["temp_password", "anon_id"])
+        voter.segments = segments or []
+        voter.save(update_fields=["temp_password", "anon_id", "segments"])
+        forget_voter_session(voter.voter_id)
 
     # send email if requested and newly created (we only email when created)
     if send_email and created:
@@ -42,3 +51,90 @@ def create_voter_for_poll(poll, email, send_email=True):
         )
 
     return voter, created, plain_pw
+
+
+def sync_voter_roster(poll, emails, remove_missing=False, send_email=True, segments=None):
+    """
+    Bring the roster of `poll` in line with `emails` by set difference.
+
+    Only emails that are not on the roster yet get a voter, a temp password
+    and a credentials email. Voters already on the roster keep their
+    credentials and their segments untouched. With `remove_missing`, voters
+    whose email is no longer listed are deleted, except those who have
+    already voted. `segments` maps emails to the segment codes stored on
+    new voters.
+
+    The diff is taken with the poll row locked, so concurrent syncs of the
+    same poll run one after the other. An email added meanwhile by a plain
+    upload, which does not take that lock, is skipped rather than failing
+    the sync, and is reported as unchanged.
+
+    Returns a summary: the added voters with their temp passwords, the
+    removed emails, how many uploaded voters were left unchanged, how many
+    roster voters were missing from the upload, and which of those were
+    kept because they have already voted.
+    """
+    uploaded = list(dict.fromkeys(email.strip() for email in emails))
+
+    # Hash outside the lock for the emails that look new; the few that turn
+    # out to be new only under the lock are hashed there
+    on_roster = set(Voter.objects.filter(poll=poll, email__in=uploaded).values_list('email', flat=True))
+    passwords = {email: generate_temp_password() for email in uploaded if email not in on_roster}
+    hashed = {email: make_password(password) for email, password in passwords.items()}
+
+    removed = []
+    with transaction.atomic(using=poll_db()):
+        Poll.objects.select_for_update().filter(poll_id=poll.poll_id).exists()
+        existing = dict(Voter.objects.filter(poll=poll).values_list('email', 'has_voted'))
+
+        new_emails = [email for email in uploaded if email not in existing]
+        missing = existing.keys() - set(uploaded)
+        removable = sorted(email for email in missing if not existing[email])
+        kept_voted = sorted(email for email in missing if existing[email])
+
+        for email in new_emails:
+            if email not in hashed:
+                passwords[email] = generate_temp_password()
+                hashed[email] = make_password(passwords[email])
+        voters = [
+            Voter(
+                poll=poll,
+                email=email,
+                anon_id=generate_anon_id(email, str(poll.poll_id)),
+                temp_password=hashed[email],
+                segments=(segments or {}).get(email, []),
+            )
+            for email in new_emails
+        ]
+        Voter.objects.bulk_create(voters, ignore_conflicts=True)
+        inserted = set(
+            Voter.objects.filter(voter_id__in=[voter.voter_id for voter in voters]).values_list('voter_id', flat=True)
+        )
+        voters = [voter for voter in voters if voter.voter_id in inserted]
+
+        if remove_missing and removable:
+            # Lock first: a voter who votes during the sync must not be deleted
+            doomed = Voter.objects.filter(poll=poll, email__in=removable, has_voted=False)
+            removed_rows = list(doomed.select_for_update().values_list('voter_id', 'email'))
+            doomed.delete()
+            removed = sorted(email for _, email in removed_rows)
+            voter_ids = [voter_id for voter_id, _ in removed_rows]
+            transaction.on_commit(lambda: forget_voter_sessions(voter_ids), using=poll_db())
+        add_invited(poll.poll_id, len(voters) - len(removed))
+
+    if send_email:
+        for voter in voters:
+            send_voter_credentials_email(
+                email=voter.email,
+                temp_password=passwords[voter.email],
+                login_token=voter.anon_id,
+                poll=poll
+            )
+
+    return {
+        'added': [{'email': voter.email, 'temp_password': passwords[voter.email]} for voter in voters],
+        'removed': removed,
+        'unchanged': len(uploaded) - len(voters),
+        'kept_voted': kept_voted if remove_missing else [],
+        'missing': len(missing),
+    }
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from poll.models import Voter
+from poll.sharding import poll_db
+
+VOTER_SESSION_FIELDS = ['voter_id', 'poll_id', 'anon_id', 'has_voted', 'segments']
+
+
+def voter_session_key(voter_id):
+    return f"voter:{voter_id}:session"
+
+
+def voter_session_data(voter):
+    """The cached view of a Voter: ids as strings, `has_voted` and segment codes."""
+    return {
+        'voter_id': str(voter.voter_id),
+        'poll_id': str(voter.poll_id),
+        'anon_id': voter.anon_id,
+        'has_voted': voter.has_voted,
+        'segments': voter.segments,
+    }
+
+
+def _store(session):
+    cache.set(voter_session_key(session['voter_id']), session, timeout=settings.VOTER_SESSION_TTL)
+    return session
+
+
+def cache_voter_session(voter):
+    return _store(voter_session_data(voter))
+
+
+def forget_voter_session(voter_id):
+    cache.delete(voter_session_key(voter_id))
+
+
+def forget_voter_sessions(voter_ids):
+    cache.delete_many([voter_session_key(voter_id) for voter_id in voter_ids])
+
+
+def get_voter_session(voter_id, poll):
+    """
+    Return the session of `voter_id` if the voter is registered for `poll`,
+    else None. Served from the cache populated at voter_login; a miss falls
+    back to the Voter row and repopulates the cache.
+    """
+    session = cache.get(voter_session_key(voter_id))
+    if session is None:
+        row = Voter.objects.filter(voter_id=voter_id).values(*VOTER_SESSION_FIELDS).first()
+        if row is None:
+            return None
+        session = _store(dict(row, voter_id=str(row['voter_id']), poll_id=str(row['poll_id'])))
+
+    if session['poll_id'] != str(poll.poll_id):
+        return None
+    return session
+
+
+def claim_vote(session):
+    """
+    Flip the voter's has_voted flag if it is still unset and the voter's
+    anon_id is still the session's, and return whether this call did so.
+    Must run inside the transaction that records the vote; the conditional
+    UPDATE is what prevents double votes, the cache only lets repeat
+    attempts fail early.
+
+    A re-upload gives the voter a new anon_id but only drops the session
+    from the cache of the worker that handled it, so another worker may
+    still hold the old one; the anon_id condition keeps such a session
+    from voting. The cached session is updated write-through once the
+    transaction commits, or dropped if the claim failed, so the next
+    attempt reads the voter row again.
+    """
+    claimed = Voter.objects.filter(
+        voter_id=session['voter_id'], anon_id=session['anon_id'], has_voted=False
+    ).update(has_voted=True, updated_at=timezone.now())
+
+    if claimed:
+        transaction.on_commit(lambda: mark_session_voted(session), using=poll_db())
+    else:
+        forget_voter_session(session['voter_id'])
+    return bool(claimed)
+
+
+def mark_session_voted(session):
+    return _store(dict(session, has_voted=True))
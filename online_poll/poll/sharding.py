@@ -0,0 +1,183 @@
+"""
+Placement of polls across database shards.
+
+Every poll lives, with all of its options, voters, votes, anonymous ballots
+and archive marker, on the alias chosen by a consistent-hash ring over
+POLL_SHARDS. Users and other global tables stay on the default database.
+
+Code that handles a single poll runs inside `poll_shard(poll_id)`; the
+router then sends every query on a sharded model to that poll's alias.
+Queries on instances already loaded from a shard follow the instance.
+"""
+import bisect
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from uuid import UUID
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, models
+from django.dispatch import receiver
+
+# Points per alias on the ring; more points give a more even split
+VIRTUAL_NODES = 64
+
+SHARDED_MODELS = {
+    'poll', 'polloption', 'voter', 'vote', 'anonymousballot', 'pollarchive',
+    'pollsegment', 'segmenttally', 'turnoutbucket',
+}
+
+_current_shard = ContextVar('poll_shard', default=None)
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Consistent-hash ring over database aliases. Adding an alias moves only
+    the keys that now hash to it (about 1/N of them); every other key keeps
+    its placement.
+    """
+
+    def __init__(self, aliases, virtual_nodes=VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"{alias}#{index}"), alias)
+            for alias in aliases for index in range(virtual_nodes)
+        )
+        self.aliases = list(aliases)
+        self._hashes = [point for point, _ in points]
+        self._owners = [alias for _, alias in points]
+
+    def get(self, key):
+        position = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[position]
+
+
+@lru_cache(maxsize=None)
+def get_ring(aliases):
+    return HashRing(aliases)
+
+
+@receiver(setting_changed)
+def _reset_ring(setting, **kwargs):
+    if setting == 'POLL_SHARDS':
+        get_ring.cache_clear()
+
+
+def poll_shards():
+    return list(settings.POLL_SHARDS)
+
+
+def sharding_enabled():
+    return len(settings.POLL_SHARDS) > 1
+
+
+def shard_for_poll(poll_id, aliases=None):
+    """Alias holding `poll_id` on the ring of `aliases` (default POLL_SHARDS)."""
+    aliases = tuple(aliases or settings.POLL_SHARDS)
+    if len(aliases) == 1:
+        return aliases[0]
+    try:
+        key = UUID(str(poll_id)).hex
+    except ValueError:
+        key = str(poll_id)
+    return get_ring(aliases).get(key)
+
+
+@contextmanager
+def use_shard(alias):
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+@contextmanager
+def poll_shard(poll_id):
+    """Route sharded models to the shard of `poll_id`; no-op when it is None."""
+    if poll_id is None:
+        yield None
+        return
+    with use_shard(shard_for_poll(poll_id)) as alias:
+        yield alias
+
+
+def poll_db():
+    """Alias sharded models use in the current context, for transaction.atomic(using=...)."""
+    return _current_shard.get() or DEFAULT_DB_ALIAS
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    Default manager of the sharded models. `create()` without `using()`
+    places the new row by its poll, like `save()`, instead of on the alias
+    of the current `poll_shard()` block (the default database outside one).
+    """
+
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True)
+        return obj
+
+
+def is_sharded(model):
+    return model._meta.app_label == 'poll' and model._meta.model_name in SHARDED_MODELS
+
+
+def _instance_poll_id(instance):
+    if instance._meta.model_name == 'vote':
+        option = instance._state.fields_cache.get('poll_option')
+        return option.poll_id if option is not None else None
+    # Poll's primary key and the other models' foreign key. Read from the
+    # instance dict: one still being built has no poll_id yet, and getattr()
+    # would try to load it from the database.
+    return instance.__dict__.get('poll_id')
+
+
+class PollShardRouter:
+    """
+    Sends sharded models to the shard of a new instance's poll, or to the
+    database an existing instance was loaded from, then to the shard of the
+    current `poll_shard()` block. Everything else uses the default database.
+    """
+
+    def _db(self, model, **hints):
+        if not is_sharded(model):
+            # Explicit, or Django would follow a sharded instance's database
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get('instance')
+        if instance is not None and is_sharded(type(instance)):
+            # Unsaved rows go where the ring places their poll; assigning a
+            # related object has already copied that object's database onto
+            # them. Loaded rows stay on the database they came from.
+            if instance._state.adding:
+                poll_id = _instance_poll_id(instance)
+                if poll_id is not None:
+                    return shard_for_poll(poll_id)
+            if instance._state.db:
+                return instance._state.db
+        return _current_shard.get()
+
+    db_for_read = _db
+    db_for_write = _db
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Polls reference their creator on the default database
+        if is_sharded(type(obj1)) != is_sharded(type(obj2)):
+            return True
+        if is_sharded(type(obj1)):
+            # Rows of one poll, compared where they are or will be stored;
+            # an unsaved poll still carries its creator's database
+            db1, db2 = self._db(type(obj1), instance=obj1), self._db(type(obj2), instance=obj2)
+            if db1 and db2:
+                return db1 == db2
+        return None
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .authentication import invalidate_cached_user
+from .models import CustomUser, Poll
+from .sharding import poll_shards
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def drop_cached_user(sender, instance, **kwargs):
+    # Covers deactivation, password changes and deletion
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def delete_sharded_polls(sender, instance, using, **kwargs):
+    # Poll.creator has no database constraint, and the cascade only reaches
+    # the user's own database; polls on the other shards go with it here
+    for alias in poll_shards():
+        if alias != using:
+            Poll.objects.using(alias).filter(creator_id=instance.pk).delete()
@@ -1,16 +1,24 @@
-from django.test import TestCase
+from unittest import skipUnless
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
+import os
 from uuid import uuid4
 from django.core import mail
 from .serializers import VoterUploadSerializer
+from .services.results_service import refresh_vote_counts
+from .sharding import poll_db, poll_shard
+from .utils import generate_anon_id, generate_device_anon_id
 from .models import Poll, PollOption, Voter, Vote, CustomUser as User
 
 # ===========================================================
 # POLL AND VOTER TESTS
 # ===========================================================
 class PollTests(TestCase):
+    databases = "__all__"
+
     def setUp(self):
         self.client = APIClient()
 
@@ -26,6 +34,7 @@ class PollTests(TestCase):
             poll_type=Poll.SINGLE_CHOICE,
             allow_anonymous=True
         )
+        self.enterContext(poll_shard(self.poll.poll_id))
 
         # Options
         self.option1 = PollOption.objects.create(poll=self.poll, text="Apple")
@@ -42,7 +51,7 @@ class PollTests(TestCase):
             context={"poll": self.poll}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.temp_password = serializer.save()["created"][0]["temp_password"]
         
         self.voter = Voter.objects.get(email="voter@test.com", poll=self.poll)
 
@@ -56,35 +65,43 @@ class PollTests(TestCase):
         self.assertEqual(self.poll.title, "Favorite Fruit?")
         self.assertEqual(self.poll.options.count(), 2)
 
+    def _voter_token(self):
+        response = self.client.post(reverse("voter-login"), {
+            "email": "voter@test.com",
+            "temp_password": self.temp_password,
+            "poll_id": str(self.poll.poll_id)
+        }, format="json")
+        return response.data["voter_token"]
+
     # -------------------------
     # Anonymous voting
     # -------------------------
     def test_vote_anonymous(self):
-        anon_id = str(uuid4())
+        device_token = str(uuid4())
         data = {
             "poll_option": str(self.option1.option_id),
-            "anon_id": anon_id
+            "device_token": device_token
         }
         response = self.client.post(self.vote_url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         vote = Vote.objects.first()
         self.assertEqual(vote.poll_option, self.option1)
-        self.assertEqual(vote.anon_id, anon_id)
+        self.assertEqual(vote.anon_id, generate_device_anon_id(device_token, str(self.poll.poll_id)))
 
     def test_single_choice_anon_constraint(self):
-        anon_id = str(uuid4())
+        device_token = str(uuid4())
 
         # First vote
         self.client.post(self.vote_url, {
             "poll_option": str(self.option1.option_id),
-            "anon_id": anon_id
+            "device_token": device_token
         }, format="json")
 
         # Second vote for different option
         response = self.client.post(self.vote_url, {
             "poll_option": str(self.option2.option_id),
-            "anon_id": anon_id
+            "device_token": device_token
         }, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -96,45 +113,49 @@ class PollTests(TestCase):
     def test_controlled_voter_can_vote(self):
         data = {
             "poll_option": str(self.option1.option_id),
-            "voter": str(self.voter.voter_id)
+            "voter_token": self._voter_token()
         }
 
         response = self.client.post(self.vote_url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        vote = Vote.objects.get(voter=self.voter)
+        vote = Vote.objects.get(anon_id=self.voter.anon_id)
         self.assertEqual(vote.poll_option, self.option1)
 
         self.voter.refresh_from_db()
         self.assertTrue(self.voter.has_voted)
 
     def test_controlled_voter_cannot_vote_twice(self):
+        voter_token = self._voter_token()
+
         # First vote
         self.client.post(self.vote_url, {
             "poll_option": str(self.option1.option_id),
-            "voter": str(self.voter.voter_id)
+            "voter_token": voter_token
         }, format="json")
 
         # Second vote attempt
         response = self.client.post(self.vote_url, {
             "poll_option": str(self.option2.option_id),
-            "voter": str(self.voter.voter_id)
+            "voter_token": voter_token
         }, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         error_msg = response.data.get("error")
         if isinstance(error_msg, dict):
             error_msg = str(list(error_msg.values())[0])
-        self.assertIn("You can only vote once", str(error_msg))
+        self.assertIn("You have already voted", str(error_msg))
+        self.assertEqual(Vote.objects.filter(anon_id=self.voter.anon_id).count(), 1)
 
     # -------------------------
     # Poll results
     # -------------------------
     def test_results_endpoint(self):
         # Add some votes
-        Vote.objects.create(poll_option=self.option1, anon_id=str(uuid4()))
-        Vote.objects.create(poll_option=self.option1, anon_id=str(uuid4()))
-        Vote.objects.create(poll_option=self.option2, voter=self.voter, anon_id=self.voter.anon_id)
+        Vote.objects.create(poll_option=self.option1, anon_id=generate_anon_id("a@test.com", self.poll.poll_id))
+        Vote.objects.create(poll_option=self.option1, anon_id=generate_anon_id("b@test.com", self.poll.poll_id))
+        Vote.objects.create(poll_option=self.option2, anon_id=self.voter.anon_id)
+        refresh_vote_counts(self.poll.options.all())
 
         url = reverse("poll-results", args=[self.poll.poll_id])
         response = self.client.get(url)
@@ -198,12 +219,12 @@ class PollTests(TestCase):
         self.assertEqual(email.to, ["newvoter@test.com"])
         self.assertIn(f"Voting Access for Poll: {self.poll.title}", email.subject)
 
-        # Verify content
+        # Verify content: the login link carries the voter's anon_id digest
         response_data = response.data["created"][0]
-        returned_anon_id = response_data["anon_id"]
+        voter = Voter.objects.get(email="newvoter@test.com", poll=self.poll)
         returned_temp_pwd = response_data["temp_password"]
 
-        self.assertIn(returned_anon_id, email.body)
+        self.assertIn(voter.anon_id, email.body)
         self.assertIn(returned_temp_pwd, email.body)
     
     def test_multiple_voters_send_multiple_emails(self):
@@ -221,3 +242,1658 @@ class PollTests(TestCase):
 
         self.assertEqual(len(mail.outbox), 3)
 
+
+
+# ===========================================================
+# EXPORT TESTS
+# ===========================================================
+class PollExportTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="creator@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+
+        self.poll = Poll.objects.create(creator=self.user, title="Export Poll")
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="Yes")
+        self.voter = Voter.objects.create(
+            poll=self.poll, email="voter@test.com", temp_password="x", anon_id=generate_anon_id("voter@test.com", str(self.poll.poll_id)), has_voted=True
+        )
+        Vote.objects.create(poll_option=self.option, anon_id=self.voter.anon_id)
+
+    def _content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_export_voters_csv(self):
+        url = reverse("poll-export-voters", args=[self.poll.poll_id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        lines = self._content(response).decode().splitlines()
+        self.assertEqual(lines[0], "voter_id,email,has_voted,created_at")
+        self.assertNotIn(self.voter.anon_id, lines[1])
+        self.assertIn("voter@test.com", lines[1])
+        self.assertIn("True", lines[1])
+
+    def test_export_votes_ndjson_gzip(self):
+        import gzip
+        import json
+
+        url = reverse("poll-export-votes", args=[self.poll.poll_id])
+        response = self.client.get(url, {"file_format": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        rows = [json.loads(line) for line in gzip.decompress(self._content(response)).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["poll_option_id"], str(self.option.option_id))
+
+    def test_gzip_refused_with_zero_quality(self):
+        url = reverse("poll-export-votes", args=[self.poll.poll_id])
+        for header, compressed in (("gzip;q=0", False), ("br, gzip;q=0.5", True), ("*;q=0.1", True),
+                                   ("*, gzip;q=0", False), ("identity", False)):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(response.get("Content-Encoding") == "gzip", compressed, header)
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_export_requires_creator(self):
+        other = User.objects.create_user(email="other@test.com", password="password123")
+        self.client.force_authenticate(user=other)
+        url = reverse("poll-export-votes", args=[self.poll.poll_id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ===========================================================
+# BULK POLL CREATION TESTS
+# ===========================================================
+class PollBulkCreateTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="creator@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("poll-bulk-create")
+
+    def test_bulk_create_polls_with_options(self):
+        payload = {
+            "polls": [
+                {"title": "Q1", "options": [{"text": "A"}, {"text": "B"}]},
+                {"title": "Q2", "poll_type": "multiple", "options": [{"text": "C"}]},
+            ]
+        }
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 2)
+        self.assertEqual(response.data["errors"], [])
+
+        polls = {
+            poll.title: poll
+            for alias in settings.POLL_SHARDS for poll in Poll.objects.using(alias).filter(creator=self.user)
+        }
+        self.assertEqual(set(polls), {"Q1", "Q2"})
+        self.assertEqual(polls["Q1"].options.count(), 2)
+
+    def test_bulk_create_reports_item_errors(self):
+        payload = {
+            "polls": [
+                {"title": "Valid", "options": [{"text": "A"}]},
+                {"options": [{"text": "B"}]},
+            ]
+        }
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"][0]["index"], 0)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertEqual(sum(Poll.objects.using(alias).count() for alias in settings.POLL_SHARDS), 1)
+
+
+# ===========================================================
+# RANKED CHOICE TESTS
+# ===========================================================
+class RankedChoiceTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="creator@test.com", password="password123")
+        self.poll = Poll.objects.create(creator=self.user, title="Chair", poll_type=Poll.RANKED_CHOICE)
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.a = PollOption.objects.create(poll=self.poll, text="A")
+        self.b = PollOption.objects.create(poll=self.poll, text="B")
+        self.c = PollOption.objects.create(poll=self.poll, text="C")
+
+        self.tokens = []
+        for i in range(5):
+            voter = Voter.objects.create(
+                poll=self.poll, email=f"v{i}@test.com", temp_password="x", anon_id=generate_anon_id(f"v{i}@test.com", str(self.poll.poll_id))
+            )
+            token = AccessToken()
+            token["voter_id"] = str(voter.voter_id)
+            self.tokens.append(str(token))
+
+        self.vote_url = reverse("poll-vote", args=[self.poll.poll_id])
+        self.runoff_url = reverse("poll-runoff", args=[self.poll.poll_id])
+
+    def _vote(self, token, options):
+        return self.client.post(self.vote_url, {
+            "voter_token": token,
+            "rankings": [str(option.option_id) for option in options],
+        }, format="json")
+
+    def test_instant_runoff_transfers_votes(self):
+        ballots = [[self.a, self.b], [self.a], [self.b, self.c], [self.c, self.b], [self.c, self.b]]
+        for token, ranking in zip(self.tokens, ballots):
+            self.assertEqual(self._vote(token, ranking).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(self.runoff_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rounds = response.data["rounds"]
+        self.assertEqual(rounds[0]["eliminated"], str(self.b.option_id))
+        self.assertEqual(rounds[1]["counts"][str(self.c.option_id)], 3)
+        self.assertEqual(response.data["winner"], str(self.c.option_id))
+
+    def test_ranked_vote_rejects_duplicates_and_revotes(self):
+        response = self._vote(self.tokens[0], [self.a, self.a])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self._vote(self.tokens[0], [self.a]).status_code, status.HTTP_201_CREATED)
+        response = self._vote(self.tokens[0], [self.b])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already voted", str(response.data["error"]))
+
+    def test_closed_poll_runoff_is_cached(self):
+        self._vote(self.tokens[0], [self.a])
+        Poll.objects.filter(pk=self.poll.pk).update(is_active=False)
+
+        first = self.client.get(self.runoff_url).data
+        Vote.objects.create(poll_option=self.b, anon_id=generate_anon_id("late@test.com", str(self.poll.poll_id)), rank=1)
+        with self.assertNumQueries(1, using=poll_db()):
+            second = self.client.get(self.runoff_url).data
+        self.assertEqual(first, second)
+        self.assertEqual(second["total_ballots"], 1)
+
+    def test_open_poll_runoff_is_cached_briefly(self):
+        from django.core.cache import cache
+        from .services.tally_service import ranked_tally_cache_key
+
+        self._vote(self.tokens[0], [self.a])
+        self.assertFalse(self.client.get(self.runoff_url).data["closed"])
+        self._vote(self.tokens[1], [self.b])
+        with self.assertNumQueries(1, using=poll_db()):
+            self.assertEqual(self.client.get(self.runoff_url).data["total_ballots"], 1)
+
+        # After the TTL the ballots are reloaded
+        cache.delete(ranked_tally_cache_key(self.poll.poll_id))
+        self.assertEqual(self.client.get(self.runoff_url).data["total_ballots"], 2)
+
+        # Closing the poll does not serve the breakdown cached while open
+        self._vote(self.tokens[2], [self.c])
+        Poll.objects.filter(pk=self.poll.pk).update(is_active=False)
+        response = self.client.get(self.runoff_url)
+        self.assertTrue(response.data["closed"])
+        self.assertEqual(response.data["total_ballots"], 3)
+
+
+# ===========================================================
+# ANONYMOUS VOTING TESTS
+# ===========================================================
+class AnonymousVotingTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .services.anonymous_vote_service import reset_poll_filters
+
+        cache.clear()
+        reset_poll_filters()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="creator@test.com", password="password123")
+        self.poll = Poll.objects.create(creator=self.user, title="Open poll", allow_anonymous=True)
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option1 = PollOption.objects.create(poll=self.poll, text="Apple")
+        self.option2 = PollOption.objects.create(poll=self.poll, text="Banana")
+        self.vote_url = reverse("poll-vote", args=[self.poll.poll_id])
+
+    def _vote(self, option, device_token="device-1"):
+        return self.client.post(self.vote_url, {
+            "poll_option": str(option.option_id),
+            "device_token": device_token,
+        }, format="json")
+
+    def test_device_token_vote(self):
+        response = self._vote(self.option1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Vote.objects.filter(poll_option=self.option1).count(), 1)
+        self.assertNotEqual(Vote.objects.get().anon_id, "device-1")
+
+    def test_repeat_device_vote_rejected(self):
+        self._vote(self.option1)
+        response = self._vote(self.option2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("You can only vote once", str(response.data["error"]))
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_new_device_skips_duplicate_lookup(self):
+        from .services.anonymous_vote_service import get_poll_filter, has_anonymous_vote
+
+        get_poll_filter(self.poll)
+        with self.assertNumQueries(0, using=poll_db()):
+            self.assertFalse(has_anonymous_vote(self.poll, "never-seen"))
+
+    def test_missing_token_rejected(self):
+        response = self.client.post(self.vote_url, {"poll_option": str(self.option1.option_id)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        Poll.objects.filter(pk=self.poll.pk).update(allow_anonymous=False)
+        response = self._vote(self.option1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Voter token is required", str(response.data["error"]))
+
+    def test_anonymous_voting_is_opt_in(self):
+        poll = Poll.objects.create(creator=self.user, title="Invite-only poll")
+        option = PollOption.objects.create(poll=poll, text="Apple")
+        response = self.client.post(reverse("poll-vote", args=[poll.poll_id]), {
+            "poll_option": str(option.option_id), "device_token": "device-1",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_filter_stats(self):
+        self._vote(self.option1)
+        self._vote(self.option2)
+        self._vote(self.option1, device_token="device-2")
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("poll-anonymous-stats", args=[self.poll.poll_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["checks"], 3)
+        self.assertEqual(response.data["duplicate"], 1)
+        self.assertEqual(response.data["negative"], 2)
+
+
+# ===========================================================
+# BINARY ANON_ID STORAGE TESTS
+# ===========================================================
+class HexDigestFieldTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.poll = Poll.objects.create(title="Storage")
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="A")
+
+    def test_anon_id_round_trips_as_hex(self):
+        anon_id = generate_anon_id("voter@test.com", str(self.poll.poll_id))
+        Vote.objects.create(poll_option=self.option, anon_id=anon_id.upper())
+
+        self.assertEqual(Vote.objects.get().anon_id, anon_id)
+        self.assertTrue(Vote.objects.filter(anon_id=anon_id).exists())
+        self.assertEqual(list(Vote.objects.values_list("anon_id", flat=True)), [anon_id])
+
+    def test_anon_id_rejects_non_digest(self):
+        from django.core.exceptions import ValidationError as DjangoValidationError
+
+        with self.assertRaises(DjangoValidationError):
+            Vote.objects.create(poll_option=self.option, anon_id="not-a-digest")
+
+
+# ===========================================================
+# ARCHIVAL TESTS
+# ===========================================================
+class ArchiveClosedPollsTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        import tempfile
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.archive_dir = tempfile.mkdtemp()
+        self.client = APIClient()
+        self.poll = Poll.objects.create(
+            title="Old poll", expires_at=timezone.now() - timedelta(days=200)
+        )
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option1 = PollOption.objects.create(poll=self.poll, text="A")
+        self.option2 = PollOption.objects.create(poll=self.poll, text="B")
+        for i, option in enumerate([self.option1, self.option1, self.option2]):
+            anon_id = generate_anon_id(f"v{i}@test.com", str(self.poll.poll_id))
+            Voter.objects.create(
+                poll=self.poll, email=f"v{i}@test.com", temp_password="x", anon_id=anon_id, has_voted=True
+            )
+            Vote.objects.create(poll_option=option, anon_id=anon_id)
+
+        self.recent = Poll.objects.create(title="Recent poll", expires_at=timezone.now() - timedelta(days=1))
+        Vote.objects.create(
+            poll_option=PollOption.objects.create(poll=self.recent, text="C"),
+            anon_id=generate_anon_id("r@test.com", str(self.recent.poll_id)),
+        )
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.archive_dir)
+
+    def test_archive_moves_rows_and_keeps_results(self):
+        import gzip
+        import json
+        from django.core.management import call_command
+
+        call_command(
+            "archive_closed_polls", retention_days=90, archive_dir=self.archive_dir,
+            chunk_size=2, stdout=open(os.devnull, "w")
+        )
+
+        self.assertFalse(Vote.objects.filter(poll_option__poll=self.poll).exists())
+        self.assertFalse(Voter.objects.filter(poll=self.poll).exists())
+        with poll_shard(self.recent.poll_id):
+            self.assertEqual(Vote.objects.filter(poll_option__poll=self.recent).count(), 1)
+
+        archive = self.poll.archive
+        self.assertEqual((archive.votes_count, archive.voters_count, archive.voted_count), (3, 3, 3))
+        with gzip.open(archive.votes_path, "rt") as handle:
+            self.assertEqual(len([json.loads(line) for line in handle]), 3)
+        with gzip.open(archive.voters_path, "rt") as handle:
+            self.assertNotIn("temp_password", handle.read())
+
+        response = self.client.get(reverse("poll-results", args=[self.poll.poll_id]))
+        results = {item["text"]: item["votes_count"] for item in response.data}
+        self.assertEqual(results, {"A": 2, "B": 1})
+
+    def test_archived_polls_are_not_picked_again(self):
+        from poll.services.archive_service import archivable_polls, archive_poll
+
+        archive_poll(self.poll, self.archive_dir)
+        self.assertNotIn(self.poll, archivable_polls(90))
+
+        # A run interrupted before deleting every hot row is resumed
+        Voter.objects.create(
+            poll=self.poll, email="late@test.com", temp_password="x",
+            anon_id=generate_anon_id("late@test.com", str(self.poll.poll_id)),
+        )
+        self.assertIn(self.poll, archivable_polls(90))
+        archive_poll(self.poll, self.archive_dir)
+        self.assertNotIn(self.poll, archivable_polls(90))
+
+
+# ===========================================================
+# TOP-K / PAGINATED RESULTS TESTS
+# ===========================================================
+class PollResultsPaginationTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.poll = Poll.objects.create(title="Catalogue", allow_anonymous=True)
+        self.enterContext(poll_shard(self.poll.poll_id))
+        counts = [5, 3, 3, 1, 0]
+        self.options = [
+            PollOption.objects.create(poll=self.poll, text=f"Item {i}", votes_count=count)
+            for i, count in enumerate(counts)
+        ]
+        self.url = reverse("poll-results", args=[self.poll.poll_id])
+
+    def test_top_k_includes_rank_and_percentage(self):
+        response = self.client.get(self.url, {"top": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_votes"], 12)
+        self.assertIsNone(response.data["next"])
+
+        results = response.data["results"]
+        self.assertEqual([item["votes_count"] for item in results], [5, 3, 3])
+        self.assertEqual([item["rank"] for item in results], [1, 2, 2])
+        self.assertEqual(results[0]["percentage"], 41.67)
+
+    def test_cursor_pagination_walks_all_options(self):
+        seen = []
+        ranks = []
+        params = {"page_size": 2}
+        url = self.url
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [item["text"] for item in response.data["results"]]
+            ranks += [item["rank"] for item in response.data["results"]]
+            url, params = response.data["next"], None
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen[0], "Item 0")
+        self.assertEqual(ranks, [1, 2, 2, 4, 5])
+
+    def test_vote_increments_stored_count(self):
+        self.client.post(reverse("poll-vote", args=[self.poll.poll_id]), {
+            "poll_option": str(self.options[4].option_id),
+            "device_token": "device-1",
+        }, format="json")
+        self.options[4].refresh_from_db()
+        self.assertEqual(self.options[4].votes_count, 1)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit_reported_under_its_parameter(self):
+        for params, field in (({"top": "x"}, "top"), ({"page_size": "0"}, "page_size"), ({"page_size": "x"}, "page_size")):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(list(response.data), [field])
+
+
+# ===========================================================
+# BATCH RESULTS TESTS
+# ===========================================================
+class PollBatchResultsTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.polls = []
+        for counts in ([2, 5], [0, 0, 1]):
+            poll = Poll.objects.create(title="Dashboard")
+            for i, count in enumerate(counts):
+                PollOption.objects.create(poll=poll, text=f"Option {i}", votes_count=count)
+            self.polls.append(poll)
+        self.url = reverse("poll-batch-results")
+
+    def test_results_for_every_poll_in_one_query(self):
+        from contextlib import ExitStack
+
+        empty = Poll.objects.create(title="No options yet")
+        poll_ids = [str(self.polls[1].poll_id), str(self.polls[0].poll_id), str(empty.poll_id)]
+
+        holding = {poll._state.db for poll in [*self.polls, empty]}
+        with ExitStack() as stack:
+            # One query on each shard holding requested polls
+            for alias in settings.POLL_SHARDS:
+                stack.enter_context(self.assertNumQueries(int(alias in holding), using=alias))
+            response = self.client.post(self.url, {"poll_ids": poll_ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["errors"], [])
+
+        results = response.data["results"]
+        self.assertEqual([item["poll_id"] for item in results], poll_ids)
+        self.assertEqual(results[0]["total_votes"], 1)
+        self.assertEqual([item["rank"] for item in results[0]["results"]], [1, 2, 2])
+        self.assertEqual([item["votes_count"] for item in results[1]["results"]], [5, 2])
+        self.assertEqual(results[1]["results"][0]["percentage"], 71.43)
+        self.assertEqual(results[2], {"poll_id": poll_ids[2], "total_votes": 0, "results": []})
+
+    def test_missing_and_malformed_ids_reported_per_poll(self):
+        missing = str(uuid4())
+        response = self.client.post(self.url, {
+            "poll_ids": [str(self.polls[0].poll_id), "not-a-uuid", missing, str(self.polls[0].poll_id)],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["errors"], [
+            {"poll_id": "not-a-uuid", "error": "Invalid poll ID."},
+            {"poll_id": missing, "error": "Poll not found."},
+        ])
+
+    def test_request_limit(self):
+
+        with override_settings(RESULTS_BATCH_MAX_POLLS=2):
+            response = self.client.post(self.url, {
+                "poll_ids": [str(uuid4()) for _ in range(3)],
+            }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("poll_ids", response.data)
+
+
+# ===========================================================
+# POLL LISTING FILTER TESTS
+# ===========================================================
+class PollListFilterTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="owner@test.com", password="password123")
+        self.other = User.objects.create_user(email="other@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+
+        now = timezone.now()
+        self.active = Poll.objects.create(creator=self.user, title="Active")
+        self.expired = Poll.objects.create(
+            creator=self.user, title="Expired", expires_at=now - timedelta(days=1)
+        )
+        self.inactive = Poll.objects.create(creator=self.user, title="Inactive", is_active=False)
+        self.foreign = Poll.objects.create(creator=self.other, title="Foreign")
+        self.url = reverse("poll-list")
+
+    def titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {poll["title"] for poll in response.data}
+
+    def test_mine(self):
+        self.assertEqual(self.titles({"mine": "true"}), {"Active", "Expired", "Inactive"})
+        self.assertEqual(len(self.titles({})), 4)
+
+    def test_creator(self):
+        self.assertEqual(self.titles({"creator": str(self.other.user_id)}), {"Foreign"})
+
+    def test_status(self):
+        self.assertEqual(self.titles({"mine": "true", "status": "active"}), {"Active"})
+        self.assertEqual(self.titles({"mine": "true", "status": "expired"}), {"Expired"})
+        self.assertEqual(self.titles({"mine": "true", "status": "inactive"}), {"Inactive"})
+
+    def test_pages_follow_cursor(self):
+        for i in range(3):
+            Poll.objects.create(creator=self.user, title=f"Extra {i}")
+        polls = sorted(
+            (poll for alias in settings.POLL_SHARDS for poll in Poll.objects.using(alias)),
+            key=lambda poll: poll.poll_id.hex,
+        )
+        expected = [poll.title for poll in sorted(polls, key=lambda poll: poll.created_at, reverse=True)]
+
+        seen, url = [], self.url + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen += [poll["title"] for poll in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+    def test_plain_list_without_page_params(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([poll["title"] for poll in response.data], ["Foreign", "Inactive", "Expired", "Active"])
+
+    def test_page_reads_ids_then_rows(self):
+        from contextlib import ExitStack
+
+        holding = {self.foreign._state.db, self.inactive._state.db}
+        with ExitStack() as stack:
+            # Page of IDs from every shard, then rows of those polls and their
+            # options from the shards holding them
+            for alias in settings.POLL_SHARDS:
+                stack.enter_context(self.assertNumQueries(3 if alias in holding else 1, using=alias))
+            response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_invalid_page_params(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "bogus"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"page_size": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_created_range(self):
+        from datetime import timedelta
+
+        with poll_shard(self.expired.poll_id):
+            Poll.objects.filter(poll_id=self.expired.poll_id).update(
+                created_at=self.expired.created_at - timedelta(days=60)
+            )
+        cutoff = (self.active.created_at - timedelta(days=30)).isoformat()
+        self.assertNotIn("Expired", self.titles({"mine": "true", "created_after": cutoff}))
+        self.assertEqual(self.titles({"mine": "true", "created_before": cutoff}), {"Expired"})
+
+
+# ===========================================================
+# CACHED JWT AUTHENTICATION TESTS
+# ===========================================================
+class CachedJWTAuthenticationTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="reader@test.com", password="password123")
+        self.poll = Poll.objects.create(creator=self.user, title="Dashboard")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.url = reverse("poll-list")
+
+    def test_read_only_requests_reuse_cached_user(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        # Page of IDs, poll rows and options prefetch, no user lookup
+        with CaptureQueriesContext(connection) as default_queries:
+            with self.assertNumQueries(3, using=self.poll._state.db):
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in default_queries if User._meta.db_table in query["sql"]])
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_load_user_from_database(self):
+        from django.core.cache import cache
+        from .authentication import user_cache_key
+
+        self.client.post(self.url, {"title": "New"}, format="json")
+        self.assertIsNone(cache.get(user_cache_key(self.user.user_id)))
+
+
+# ===========================================================
+# PRECOMPUTED OPENAPI SCHEMA TESTS
+# ===========================================================
+class PrecomputedSchemaTests(TestCase):
+    def setUp(self):
+        import io
+        import tempfile
+        from django.core.management import call_command
+        from online_poll.schema import load_schema_file
+
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=self.schema_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_schema_file.cache_clear()
+        self.addCleanup(load_schema_file.cache_clear)
+
+        call_command("build_openapi_schema", stdout=io.StringIO())
+        self.client = APIClient()
+
+    def test_schema_served_from_file_with_cache_headers(self):
+        response = self.client.get("/api/schema.json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age=", response["Cache-Control"])
+        self.assertIn("/polls/", response.json()["paths"])
+
+        not_modified = self.client.get("/api/schema.json", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.assertEqual(self.client.get("/api/schema.yaml").status_code, status.HTTP_200_OK)
+
+    def test_docs_do_not_generate_schema_at_runtime(self):
+        from unittest import mock
+        from drf_yasg.generators import OpenAPISchemaGenerator
+
+        with mock.patch.object(OpenAPISchemaGenerator, "get_schema") as get_schema:
+            for url in ("/api/docs", "/api/redoc/"):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertContains(response, "/api/schema.json")
+                self.assertIn("max-age=", response["Cache-Control"])
+            self.client.get("/api/docs", {"format": "openapi"})
+            self.client.get("/api/schema.json")
+        get_schema.assert_not_called()
+
+
+# ===========================================================
+# COLD START / WARM-UP TESTS
+# ===========================================================
+class WarmUpTests(TestCase):
+    # Warm-up queries every configured database, shards included
+    databases = "__all__"
+
+    def test_warm_up_command_reports_each_step(self):
+        import io
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command("warm_up", stdout=out)
+        for step in ("database", "urls", "rest_framework", "Warm-up finished"):
+            self.assertIn(step, out.getvalue())
+
+    def test_prime_database_closes_its_connections(self):
+        from unittest import mock
+        from online_poll.warmup import connections, prime_database
+
+        with mock.patch.object(connections, "close_all") as close_all:
+            prime_database()
+        close_all.assert_called_once_with()
+
+    def test_lazily_included_admin_still_served(self):
+        response = self.client.get("/admin/login/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+# ===========================================================
+# CACHED VOTER SESSION TESTS
+# ===========================================================
+class VoterSessionCacheTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.contrib.auth.hashers import make_password
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = APIClient()
+        self.poll = Poll.objects.create(title="Budget")
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="Yes")
+        self.voter = Voter.objects.create(
+            poll=self.poll, email="v@test.com", temp_password=make_password("temp-pass"),
+            anon_id=generate_anon_id("v@test.com", str(self.poll.poll_id))
+        )
+        self.vote_url = reverse("poll-vote", args=[self.poll.poll_id])
+
+    def _login(self):
+        response = self.client.post(reverse("voter-login"), {
+            "email": "v@test.com", "temp_password": "temp-pass", "poll_id": str(self.poll.poll_id),
+        }, format="json")
+        return response.data["voter_token"]
+
+    def _vote(self, token):
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connections[poll_db()]) as queries:
+            response = self.client.post(self.vote_url, {
+                "poll_option": str(self.option.option_id), "voter_token": token,
+            }, format="json")
+        voter_reads = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("SELECT") and '"poll_voter"' in query["sql"]
+        ]
+        return response, voter_reads
+
+    def test_vote_after_login_skips_voter_reads(self):
+        response, voter_reads = self._vote(self._login())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(voter_reads, [])
+        self.voter.refresh_from_db()
+        self.assertTrue(self.voter.has_voted)
+
+    def test_has_voted_is_written_through(self):
+        from django.core.cache import cache
+        from .services.voter_session_service import voter_session_key
+
+        token = self._login()
+        with self.captureOnCommitCallbacks(using=poll_db(), execute=True):
+            self._vote(token)
+        self.assertTrue(cache.get(voter_session_key(self.voter.voter_id))["has_voted"])
+
+        response, voter_reads = self._vote(token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(voter_reads, [])
+
+    def test_cache_miss_falls_back_to_database(self):
+        from django.core.cache import cache
+
+        token = self._login()
+        cache.clear()
+        response, voter_reads = self._vote(token)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(voter_reads), 1)
+
+    def test_stale_session_cannot_vote_twice(self):
+        token = self._login()
+        Voter.objects.filter(pk=self.voter.pk).update(has_voted=True)
+        response, _ = self._vote(token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Vote.objects.count(), 0)
+
+    def test_session_with_replaced_anon_id_cannot_vote(self):
+        token = self._login()
+        # A re-upload handled by another worker, whose cache drop this one never sees
+        Voter.objects.filter(pk=self.voter.pk).update(anon_id=generate_anon_id("v@test.com", str(self.poll.poll_id)))
+        response, _ = self._vote(token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Vote.objects.count(), 0)
+
+        # The failed claim dropped the session; the next attempt reads the row
+        response, voter_reads = self._vote(token)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(voter_reads), 1)
+        self.assertEqual(Vote.objects.get().anon_id, Voter.objects.get(pk=self.voter.pk).anon_id)
+
+
+# ===========================================================
+# VOTE JOURNAL TESTS
+# ===========================================================
+class VoteJournalTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        import tempfile
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import AccessToken
+        from .services.journal_service import reset_journal
+
+        cache.clear()
+        self.journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.journal_dir.cleanup)
+        settings_override = override_settings(
+            VOTE_INGESTION="journal", VOTE_JOURNAL_DIR=self.journal_dir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_journal()
+        self.addCleanup(reset_journal)
+
+        self.client = APIClient()
+        self.poll = Poll.objects.create(title="Stage", allow_anonymous=True)
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="Yes")
+        self.voter = Voter.objects.create(
+            poll=self.poll, email="v@test.com", temp_password="x",
+            anon_id=generate_anon_id("v@test.com", str(self.poll.poll_id))
+        )
+        token = AccessToken()
+        token["voter_id"] = str(self.voter.voter_id)
+        self.token = str(token)
+        self.vote_url = reverse("poll-vote", args=[self.poll.poll_id])
+
+    def _vote(self, **credentials):
+        return self.client.post(
+            self.vote_url, {"poll_option": str(self.option.option_id), **credentials}, format="json"
+        )
+
+    def test_vote_is_acknowledged_then_applied(self):
+        from .services.journal_service import apply_journal, journal_lag
+
+        response = self._vote(voter_token=self.token)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Vote.objects.exists())
+        self.assertGreater(journal_lag()["pending_bytes"], 0)
+
+        self.assertEqual(apply_journal(), (1, 0))
+        self.assertTrue(Vote.objects.filter(vote_id=response.data["vote_id"]).exists())
+        self.option.refresh_from_db()
+        self.voter.refresh_from_db()
+        self.assertEqual(self.option.votes_count, 1)
+        self.assertTrue(self.voter.has_voted)
+        self.assertEqual(journal_lag()["pending_bytes"], 0)
+
+    def test_repeat_vote_rejected_before_apply(self):
+        self._vote(voter_token=self.token)
+        response = self._vote(voter_token=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_replay_is_idempotent(self):
+        from .models import VoteJournalCheckpoint
+        from .services.journal_service import apply_journal
+
+        self._vote(voter_token=self.token)
+        self._vote(device_token="device-1")
+        apply_journal()
+
+        # Lose the checkpoints, as if the applier crashed before recording them
+        VoteJournalCheckpoint.objects.all().delete()
+        self.assertEqual(apply_journal(), (0, 0))
+        self.assertEqual(Vote.objects.count(), 2)
+        self.option.refresh_from_db()
+        self.assertEqual(self.option.votes_count, 2)
+
+    def test_accepting_writes_nothing_to_the_database(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._vote(device_token="device-0")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._vote(device_token="device-1").status_code, status.HTTP_202_ACCEPTED)
+        writes = [q["sql"] for q in queries if not q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertEqual(writes, [])
+
+    def test_repeat_past_the_claim_is_rejected_by_applier(self):
+        from django.core.cache import cache
+        from .models import AnonymousBallot
+        from .services.journal_service import apply_journal
+        from .services.turnout_service import turnout
+
+        self.assertEqual(self._vote(device_token="device-1").status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self._vote(voter_token=self.token).status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Voter.objects.get(pk=self.voter.pk).has_voted)
+
+        # Another worker with its own cache accepts the repeats
+        cache.clear()
+        self.assertEqual(self._vote(device_token="device-1").status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self._vote(voter_token=self.token).status_code, status.HTTP_202_ACCEPTED)
+
+        self.assertEqual(apply_journal(), (2, 2))
+        self.assertEqual(Vote.objects.count(), 2)
+        self.assertEqual(AnonymousBallot.objects.filter(poll=self.poll).count(), 1)
+        self.assertTrue(Voter.objects.get(pk=self.voter.pk).has_voted)
+        counted = turnout(Poll.objects.get(pk=self.poll.pk), 60)
+        self.assertEqual((counted["voted"], counted["recent_votes"]), (1, 2))
+
+    def test_duplicate_records_are_applied_once(self):
+        from .services.journal_service import apply_journal, get_journal, list_segments, read_records
+
+        response = self._vote(device_token="device-1")
+        (name, _), = list_segments()
+        with open(os.path.join(self.journal_dir.name, name), "rb") as handle:
+            (record,), _ = read_records(handle, 0, 1)
+
+        # A repeat that reached the journal past the cache claim
+        record["ballot_id"] = str(uuid4())
+        record["votes"][0]["vote_id"] = str(uuid4())
+        get_journal().append(record)
+
+        self.assertEqual(apply_journal(), (1, 1))
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertTrue(Vote.objects.filter(vote_id=response.data["vote_id"]).exists())
+
+    def test_dead_writer_segment_is_drained(self):
+        import subprocess
+        import sys
+        from .services.journal_service import SEGMENT_SUFFIX, apply_journal, list_segments, reset_journal
+
+        self._vote(device_token="device-1")
+        reset_journal()
+        (name, sealed), = list_segments()
+        self.assertFalse(sealed)
+
+        # Rename the segment as if written by a process that has exited
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        writer_id, index = name[:-len(SEGMENT_SUFFIX)].rsplit(".", 1)
+        host, _, started = writer_id.rsplit("-", 2)
+        dead_name = f"{host}-{exited.pid}-{started}.{index}{SEGMENT_SUFFIX}"
+        os.rename(os.path.join(self.journal_dir.name, name), os.path.join(self.journal_dir.name, dead_name))
+
+        self.assertEqual(list_segments(), [(dead_name, True)])
+        self.assertEqual(apply_journal(), (1, 0))
+        self.assertEqual(list_segments(), [])
+
+    def test_torn_tail_and_rotation(self):
+        from .services.journal_service import apply_journal, list_segments, reset_journal
+
+        reset_journal()
+        with override_settings(VOTE_JOURNAL_SEGMENT_BYTES=1):
+            for i in range(3):
+                self._vote(device_token=f"device-{i}")
+            segments = list_segments()
+            self.assertEqual(len(segments), 4)
+
+            # An unacknowledged partial record at the end of the active segment
+            with open(os.path.join(self.journal_dir.name, segments[-1][0]), "ab") as handle:
+                handle.write(b"0000 {\"ballot")
+
+            self.assertEqual(apply_journal(), (3, 0))
+            self.assertEqual(len(list_segments()), 1)
+
+
+# ===========================================================
+# ROSTER SYNC TESTS
+# ===========================================================
+class RosterSyncTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="roster@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+        self.poll = Poll.objects.create(creator=self.user, title="Board election")
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.url = reverse("voter-upload", args=[self.poll.poll_id])
+        self.client.post(self.url, {"voters": [
+            {"email": "a@test.com"}, {"email": "b@test.com"}, {"email": "c@test.com"},
+        ]}, format="json")
+        Voter.objects.filter(email="c@test.com").update(has_voted=True)
+        self.credentials = dict(Voter.objects.values_list("email", "temp_password"))
+
+    def test_sync_adds_only_new_emails(self):
+        mail.outbox = []
+        response = self.client.post(self.url, {"sync": True, "voters": [
+            {"email": "a@test.com"}, {"email": "b@test.com"}, {"email": "d@test.com"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([voter["email"] for voter in response.data["added"]], ["d@test.com"])
+        self.assertEqual(response.data["unchanged"], 2)
+        self.assertEqual(response.data["missing"], 1)
+        self.assertEqual(response.data["removed"], [])
+        self.assertEqual(len(mail.outbox), 1)
+
+        # Existing credentials are untouched and missing voters stay
+        for email, temp_password in self.credentials.items():
+            self.assertEqual(Voter.objects.get(email=email).temp_password, temp_password)
+
+    def test_sync_removes_missing_voters_who_have_not_voted(self):
+        response = self.client.post(self.url, {"sync": True, "remove_missing": True, "voters": [
+            {"email": "a@test.com"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["removed"], ["b@test.com"])
+        self.assertEqual(response.data["kept_voted"], ["c@test.com"])
+        self.assertEqual(set(Voter.objects.values_list("email", flat=True)), {"a@test.com", "c@test.com"})
+
+    def test_only_creator_can_sync(self):
+        other = User.objects.create_user(email="other-roster@test.com", password="password123")
+        self.client.force_authenticate(user=other)
+        response = self.client.post(self.url, {"sync": True, "remove_missing": True, "voters": [
+            {"email": "x@test.com"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            set(Voter.objects.values_list("email", flat=True)), {"a@test.com", "b@test.com", "c@test.com"}
+        )
+
+    def test_email_added_concurrently_is_skipped(self):
+        from unittest import mock
+        from .services.voter_service import create_voter_for_poll, sync_voter_roster
+
+        bulk_create = Voter.objects.bulk_create
+
+        def upload_first(voters, **kwargs):
+            # A plain upload of the same email commits between diff and insert
+            create_voter_for_poll(self.poll, "d@test.com", send_email=False)
+            return bulk_create(voters, **kwargs)
+
+        with mock.patch.object(Voter.objects, "bulk_create", side_effect=upload_first):
+            summary = sync_voter_roster(self.poll, ["a@test.com", "d@test.com", "e@test.com"], send_email=False)
+        self.assertEqual([voter["email"] for voter in summary["added"]], ["e@test.com"])
+        self.assertEqual(summary["unchanged"], 2)
+        self.assertEqual(Voter.objects.filter(poll=self.poll, email="d@test.com").count(), 1)
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.voters_count, 5)
+
+    def test_remove_missing_requires_sync(self):
+        response = self.client.post(self.url, {"remove_missing": True, "voters": [
+            {"email": "a@test.com"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ===========================================================
+# SEGMENTED RESULTS TESTS
+# ===========================================================
+class SegmentedResultsTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="segments@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse("poll-list"), {
+            "title": "Office move", "segment_attributes": ["region", "department"],
+            "options": [{"text": "Stay"}, {"text": "Move"}],
+        }, format="json")
+        self.enterContext(poll_shard(response.data["poll_id"]))
+        self.poll = Poll.objects.get(poll_id=response.data["poll_id"])
+        self.options = {option.text: option for option in self.poll.options.all()}
+
+        upload = self.client.post(reverse("voter-upload", args=[self.poll.poll_id]), {"voters": [
+            {"email": "a@test.com", "region": "North", "department": "Sales", "phone": "123"},
+            {"email": "b@test.com", "region": "North"},
+            {"email": "c@test.com", "region": "South", "department": "Sales"},
+        ]}, format="json")
+        self.passwords = {voter["email"]: voter["temp_password"] for voter in upload.data["created"]}
+        self.url = reverse("poll-segment-results", args=[self.poll.poll_id])
+
+    def _vote(self, email, option):
+        login = self.client.post(reverse("voter-login"), {
+            "email": email, "temp_password": self.passwords[email], "poll_id": str(self.poll.poll_id),
+        }, format="json")
+        return self.client.post(reverse("poll-vote", args=[self.poll.poll_id]), {
+            "poll_option": str(self.options[option].option_id), "voter_token": login.data["voter_token"],
+        }, format="json")
+
+    def _crosstab(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            (entry["attribute"], segment["value"]): {option["text"]: option["votes"] for option in segment["options"]}
+            for entry in response.data for segment in entry["segments"]
+        }
+
+    def test_only_selected_attributes_are_stored_as_codes(self):
+        from .models import PollSegment
+
+        self.assertEqual(
+            set(PollSegment.objects.filter(poll=self.poll).values_list("attribute", "value")),
+            {("region", "North"), ("region", "South"), ("department", "Sales")},
+        )
+        self.assertEqual(len(Voter.objects.get(email="a@test.com").segments), 2)
+        self.assertEqual(len(Voter.objects.get(email="b@test.com").segments), 1)
+
+    def test_crosstab_counts_from_rollups(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._vote("a@test.com", "Move")
+        self._vote("b@test.com", "Stay")
+        self._vote("c@test.com", "Move")
+
+        with CaptureQueriesContext(connection) as queries:
+            crosstab = self._crosstab()
+        self.assertEqual(crosstab[("region", "North")], {"Stay": 1, "Move": 1})
+        self.assertEqual(crosstab[("region", "South")], {"Stay": 0, "Move": 1})
+        self.assertEqual(crosstab[("department", "Sales")], {"Stay": 0, "Move": 2})
+        self.assertFalse(any('"poll_vote"' in query["sql"] for query in queries))
+
+        self.assertEqual(set(self._crosstab(attribute="department")), {("department", "Sales")})
+        response = self.client.get(self.url, {"attribute": "phone"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journaled_votes_update_rollups(self):
+        import tempfile
+        from .services.journal_service import apply_journal, reset_journal
+
+        with tempfile.TemporaryDirectory() as journal_dir, \
+                override_settings(VOTE_INGESTION="journal", VOTE_JOURNAL_DIR=journal_dir):
+            reset_journal()
+            self.assertEqual(self._vote("a@test.com", "Stay").status_code, status.HTTP_202_ACCEPTED)
+            apply_journal()
+            reset_journal()
+
+        self.assertEqual(self._crosstab()[("department", "Sales")], {"Stay": 1, "Move": 0})
+
+    def test_only_creator_sees_segments(self):
+        other = User.objects.create_user(email="other-seg@test.com", password="password123")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ===========================================================
+# TURNOUT TESTS
+# ===========================================================
+class TurnoutTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="turnout@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+        self.poll = Poll.objects.create(creator=self.user, title="Turnout", allow_anonymous=True)
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="Yes")
+        upload = self.client.post(reverse("voter-upload", args=[self.poll.poll_id]), {"voters": [
+            {"email": "a@test.com"}, {"email": "b@test.com"}, {"email": "c@test.com"}, {"email": "d@test.com"},
+        ]}, format="json")
+        self.passwords = {voter["email"]: voter["temp_password"] for voter in upload.data["created"]}
+        self.url = reverse("poll-turnout", args=[self.poll.poll_id])
+
+    def _vote(self, email):
+        login = self.client.post(reverse("voter-login"), {
+            "email": email, "temp_password": self.passwords[email], "poll_id": str(self.poll.poll_id),
+        }, format="json")
+        response = self.client.post(reverse("poll-vote", args=[self.poll.poll_id]), {
+            "poll_option": str(self.option.option_id), "voter_token": login.data["voter_token"],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_turnout_from_counters(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._vote("a@test.com")
+        self._vote("b@test.com")
+        self.client.post(reverse("poll-vote", args=[self.poll.poll_id]), {
+            "poll_option": str(self.option.option_id), "device_token": "device-1",
+        }, format="json")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"minutes": 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["invited"], 4)
+        self.assertEqual(response.data["voted"], 2)
+        self.assertEqual(response.data["percentage"], 50.0)
+        self.assertEqual(response.data["recent_votes"], 3)
+        self.assertFalse(any('"poll_voter"' in query["sql"] or '"poll_vote"' in query["sql"] for query in queries))
+
+    def test_roster_sync_adjusts_invited(self):
+        self._vote("a@test.com")
+        self.client.post(reverse("voter-upload", args=[self.poll.poll_id]), {
+            "sync": True, "remove_missing": True, "voters": [{"email": "b@test.com"}, {"email": "e@test.com"}],
+        }, format="json")
+        # c and d removed, e added, a kept because it voted
+        response = self.client.get(self.url)
+        self.assertEqual((response.data["invited"], response.data["voted"]), (3, 1))
+
+    def test_recent_window_excludes_old_buckets(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import TurnoutBucket
+
+        minute = timezone.now().replace(second=0, microsecond=0)
+        TurnoutBucket.objects.create(poll=self.poll, minute=minute - timedelta(minutes=30), votes_count=7)
+        TurnoutBucket.objects.create(poll=self.poll, minute=minute - timedelta(minutes=2), votes_count=2)
+
+        self.assertEqual(self.client.get(self.url, {"minutes": 5}).data["recent_votes"], 2)
+        self.assertEqual(self.client.get(self.url, {"minutes": 60}).data["recent_votes"], 9)
+        self.assertEqual(self.client.get(self.url, {"minutes": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journaled_votes_update_turnout(self):
+        import tempfile
+        from .services.journal_service import apply_journal, reset_journal
+
+        with tempfile.TemporaryDirectory() as journal_dir, \
+                override_settings(VOTE_INGESTION="journal", VOTE_JOURNAL_DIR=journal_dir):
+            reset_journal()
+            login = self.client.post(reverse("voter-login"), {
+                "email": "a@test.com", "temp_password": self.passwords["a@test.com"], "poll_id": str(self.poll.poll_id),
+            }, format="json")
+            self.client.post(reverse("poll-vote", args=[self.poll.poll_id]), {
+                "poll_option": str(self.option.option_id), "voter_token": login.data["voter_token"],
+            }, format="json")
+            apply_journal()
+            reset_journal()
+
+        response = self.client.get(self.url)
+        self.assertEqual((response.data["voted"], response.data["recent_votes"]), (1, 1))
+
+    def test_reconcile_fixes_drift_in_chunks(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self._vote("a@test.com")
+        other = Poll.objects.create(title="Drifted", voters_count=5, voted_count=5)
+        Voter.objects.filter(email="b@test.com").delete()
+        Poll.objects.filter(poll_id=self.poll.poll_id).update(voted_count=3)
+
+        out = StringIO()
+        call_command("reconcile_turnout", "--chunk-size", "1", stdout=out)
+        self.assertIn("2 fixed", out.getvalue())
+        self.poll.refresh_from_db()
+        other.refresh_from_db()
+        # The vote is still counted in its bucket, not on the poll row
+        self.assertEqual((self.poll.voters_count, self.poll.voted_count), (3, 0))
+        self.assertEqual((other.voters_count, other.voted_count), (0, 0))
+        response = self.client.get(self.url)
+        self.assertEqual((response.data["invited"], response.data["voted"]), (3, 1))
+
+    def test_votes_spread_over_slots_and_fold_on_prune(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import TurnoutBucket
+
+        with override_settings(TURNOUT_BUCKET_SLOTS=2):
+            for email in ("a@test.com", "b@test.com", "c@test.com"):
+                self._vote(email)
+        self.assertLessEqual(TurnoutBucket.objects.filter(poll=self.poll).count(), 2)
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.voted_count, 0)
+        self.assertEqual(self.client.get(self.url).data["voted"], 3)
+
+        TurnoutBucket.objects.filter(poll=self.poll).update(minute=timezone.now() - timedelta(days=2))
+        call_command("reconcile_turnout", stdout=StringIO())
+        self.assertFalse(TurnoutBucket.objects.filter(poll=self.poll).exists())
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.voted_count, 3)
+        response = self.client.get(self.url)
+        self.assertEqual((response.data["voted"], response.data["recent_votes"]), (3, 0))
+
+    def test_only_creator_sees_turnout(self):
+        other = User.objects.create_user(email="other-turnout@test.com", password="password123")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ===========================================================
+# CREATOR LOGIN TESTS
+# ===========================================================
+class CreatorLoginTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+
+        settings_override = override_settings(PASSWORD_HASH_ITERATIONS=1000)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="login@test.com", password="password123")
+
+    def _login(self, password="password123"):
+        return self.client.post(reverse("login"), {"email": "login@test.com", "password": password}, format="json")
+
+    def test_password_is_verified_once(self):
+        from unittest import mock
+        from .hashers import ConfigurablePBKDF2PasswordHasher
+
+        original = ConfigurablePBKDF2PasswordHasher.verify
+        with mock.patch.object(ConfigurablePBKDF2PasswordHasher, "verify", autospec=True, side_effect=original) as verify:
+            response = self._login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(set(response.data), {"refresh", "access", "user"})
+        self.assertEqual(response.data["user"]["email"], "login@test.com")
+
+    def test_wrong_password_rejected(self):
+        self.assertEqual(self._login("nope").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hash_upgraded_to_configured_cost(self):
+
+        self.assertIn("$1000$", self.user.password)
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIn("$2000$", self.user.password)
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+
+    def test_voter_temp_password_upgraded(self):
+        from django.contrib.auth.hashers import make_password
+
+        poll = Poll.objects.create(title="Upgrade")
+        voter = Voter.objects.create(
+            poll=poll, email="v@test.com", temp_password=make_password("temp-pass"),
+            anon_id=generate_anon_id("v@test.com", str(poll.poll_id))
+        )
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.client.post(reverse("voter-login"), {
+                "email": "v@test.com", "temp_password": "temp-pass", "poll_id": str(poll.poll_id),
+            }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        voter.refresh_from_db()
+        self.assertIn("$2000$", voter.temp_password)
+
+
+# ===========================================================
+# ADMIN CHANGELIST TESTS
+# ===========================================================
+class LargeTableAdminTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@test.com", password="password123")
+        self.client.force_login(self.admin)
+        self.poll = Poll.objects.create(title="Audit")
+        self.enterContext(poll_shard(self.poll.poll_id))
+        self.option = PollOption.objects.create(poll=self.poll, text="Yes")
+        Voter.objects.bulk_create([
+            Voter(poll=self.poll, email=f"v{i}@test.com", temp_password="x",
+                  anon_id=generate_anon_id(f"v{i}@test.com", str(self.poll.poll_id)))
+            for i in range(120)
+        ])
+        self.url = reverse("admin:poll_voter_changelist")
+
+    def test_keyset_pages_cover_every_voter_once(self):
+        seen = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            cl = response.context["cl"]
+            seen.extend(voter.voter_id for voter in cl.result_list)
+            url = cl.next_page_url and self.url + cl.next_page_url
+
+        self.assertEqual(seen, list(Voter.objects.order_by("-created_at", "pk").values_list("voter_id", flat=True)))
+        self.assertEqual(len(seen), 120)
+
+    def test_keyset_pages_are_newest_first(self):
+        from datetime import timedelta
+
+        # Two voters share a timestamp; the pk orders them
+        voters = list(Voter.objects.order_by("pk"))
+        base = voters[0].created_at
+        for age, voter in enumerate(voters):
+            Voter.objects.filter(pk=voter.pk).update(created_at=base - timedelta(minutes=max(age, 1)))
+
+        response = self.client.get(self.url)
+        first_page = [voter.voter_id for voter in response.context["cl"].result_list]
+        self.assertEqual(first_page, [voter.voter_id for voter in voters[:50]])
+
+        response = self.client.get(self.url + response.context["cl"].next_page_url)
+        self.assertEqual(response.context["cl"].result_list[0].voter_id, voters[50].voter_id)
+        self.assertEqual(self.client.get(self.url, {"after": "bogus"}).status_code, 302)
+
+    def test_count_is_capped(self):
+
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=100):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["cl"].result_count, 100)
+        self.assertContains(response, "~100 voters")
+
+    def test_search_uses_exact_keys(self):
+        response = self.client.get(self.url, {"q": "v7@test.com"})
+        self.assertEqual([voter.email for voter in response.context["cl"].result_list], ["v7@test.com"])
+
+        response = self.client.get(self.url, {"q": str(self.poll.poll_id)})
+        self.assertEqual(len(response.context["cl"].result_list), 50)
+
+        response = self.client.get(reverse("admin:poll_vote_changelist"), {"q": "v7"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+        for name in ("poll", "polloption"):
+            response = self.client.get(reverse(f"admin:poll_{name}_changelist"), {"q": str(self.poll.poll_id)})
+            self.assertEqual(len(response.context["cl"].result_list), 1)
+
+    def test_vote_changelist_joins_related_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Vote.objects.bulk_create([
+            Vote(poll_option=self.option, anon_id=generate_anon_id(f"v{i}@test.com", "x"))
+            for i in range(30)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:poll_vote_changelist"), {"poll": str(self.poll.poll_id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cl"].result_list), 30)
+        option_reads = [query["sql"] for query in queries if query["sql"].startswith('SELECT') and 'FROM "poll_polloption"' in query["sql"]]
+        self.assertEqual(option_reads, [])
+
+    def test_ballot_rows_cannot_be_edited(self):
+        vote = Vote.objects.create(poll_option=self.option, anon_id=generate_anon_id("v0@test.com", "x"))
+        voter = Voter.objects.filter(poll=self.poll).first()
+        Voter.objects.filter(pk=voter.pk).update(has_voted=True)
+
+        response = self.client.get(reverse("admin:poll_vote_change", args=[vote.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="_save"')
+        response = self.client.post(reverse("admin:poll_vote_delete", args=[vote.pk]), {"post": "yes"})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Vote.objects.filter(pk=vote.pk).exists())
+
+        response = self.client.post(reverse("admin:poll_voter_change", args=[voter.pk]), {"email": voter.email})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Voter.objects.get(pk=voter.pk).has_voted)
+
+        for name in ("voter", "vote"):
+            response = self.client.get(reverse(f"admin:poll_{name}_changelist"))
+            self.assertNotIn("delete_selected", response.context["cl"].model_admin.get_actions(response.wsgi_request))
+
+
+# ===========================================================
+# POLL SHARDING TESTS
+# ===========================================================
+class HashRingTests(TestCase):
+    def test_placement_is_stable(self):
+        from .sharding import shard_for_poll
+
+        aliases = ("default", "shard1", "shard2")
+        poll_id = uuid4()
+        self.assertEqual(shard_for_poll(poll_id, aliases), shard_for_poll(str(poll_id), aliases))
+        self.assertEqual(shard_for_poll(poll_id, ["default"]), "default")
+
+    def test_adding_a_shard_moves_only_its_share(self):
+        from .sharding import shard_for_poll
+
+        before, after = ("default", "shard1", "shard2"), ("default", "shard1", "shard2", "shard3")
+        poll_ids = [uuid4() for _ in range(4000)]
+        moved = [poll_id for poll_id in poll_ids if shard_for_poll(poll_id, before) != shard_for_poll(poll_id, after)]
+
+        self.assertTrue(all(shard_for_poll(poll_id, after) == "shard3" for poll_id in moved))
+        self.assertLess(abs(len(moved) / len(poll_ids) - 0.25), 0.1)
+
+
+# Needs extra aliases, e.g.
+# POLL_SHARDS=default,shard1,shard2 SHARD1_DATABASE_URL=sqlite:////tmp/s1.db
+# SHARD2_DATABASE_URL=sqlite:////tmp/s2.db python manage.py test poll.tests.PollShardingTests
+@skipUnless(len(settings.POLL_SHARDS) > 1, "POLL_SHARDS lists a single alias")
+class PollShardingTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="shards@test.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+
+    def _create(self, title):
+        response = self.client.post(
+            reverse("poll-list"),
+            {"title": title, "allow_anonymous": True, "options": [{"text": "Yes"}, {"text": "No"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["poll_id"]
+
+    def test_poll_and_children_live_on_its_shard(self):
+        from .sharding import shard_for_poll
+
+        poll_id = self._create("Sharded")
+        alias = shard_for_poll(poll_id)
+        poll = Poll.objects.using(alias).get(poll_id=poll_id)
+        option = poll.options.first()
+
+        response = self.client.post(
+            reverse("poll-vote", kwargs={"poll_id": poll_id}),
+            {"poll_option": str(option.option_id), "device_token": "device-1"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Vote.objects.using(alias).filter(poll_option__poll_id=poll_id).count(), 1)
+        for other in set(settings.POLL_SHARDS) - {alias}:
+            self.assertFalse(Poll.objects.using(other).filter(poll_id=poll_id).exists())
+
+        response = self.client.get(reverse("poll-detail", kwargs={"poll_id": poll_id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_controlled_voter_on_shard(self):
+        from django.contrib.auth.hashers import make_password
+        from django.core.cache import cache
+        from .sharding import shard_for_poll
+
+        poll_id = self._create("Controlled")
+        alias = shard_for_poll(poll_id)
+        poll = Poll.objects.using(alias).get(poll_id=poll_id)
+        option = poll.options.first()
+        voter = Voter(
+            poll=poll, email="v@test.com", temp_password=make_password("temp-pass"),
+            anon_id=generate_anon_id("v@test.com", poll_id),
+        )
+        voter.save()
+        self.assertEqual(voter._state.db, alias)
+
+        response = self.client.post(reverse("voter-login"), {
+            "email": "v@test.com", "temp_password": "temp-pass", "poll_id": poll_id,
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        cache.clear()
+        response = self.client.post(
+            reverse("poll-vote", kwargs={"poll_id": poll_id}),
+            {"poll_option": str(option.option_id), "voter_token": response.data["voter_token"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Voter.objects.using(alias).get(voter_id=voter.voter_id).has_voted)
+
+    def test_listing_merges_shards_in_order(self):
+        from .sharding import shard_for_poll
+
+        poll_ids = [self._create(f"Poll {i}") for i in range(12)]
+        self.assertGreater(len({shard_for_poll(poll_id) for poll_id in poll_ids}), 1)
+
+        response = self.client.get(reverse("poll-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([poll["poll_id"] for poll in response.data], poll_ids[::-1])
+
+        seen, url = [], reverse("poll-list") + "?page_size=5"
+        while url:
+            response = self.client.get(url)
+            seen += [poll["poll_id"] for poll in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, poll_ids[::-1])
+
+    def test_batch_results_span_shards(self):
+        from .sharding import shard_for_poll
+
+        poll_ids = [self._create(f"Poll {i}") for i in range(12)]
+        self.assertGreater(len({shard_for_poll(poll_id) for poll_id in poll_ids}), 1)
+
+        response = self.client.post(reverse("poll-batch-results"), {"poll_ids": poll_ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["poll_id"] for item in response.data["results"]], poll_ids)
+        self.assertTrue(all(len(item["results"]) == 2 for item in response.data["results"]))
+
+    def test_rebalance_moves_polls_to_their_shard(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .sharding import shard_for_poll
+
+        with override_settings(POLL_SHARDS=["default"]):
+            poll_ids = [self._create(f"Poll {i}") for i in range(8)]
+            created_at = Poll.objects.get(poll_id=poll_ids[0]).created_at
+        self.assertEqual(Poll.objects.using("default").count(), 8)
+
+        call_command("rebalance_poll_shards", stdout=StringIO())
+
+        for poll_id in poll_ids:
+            alias = shard_for_poll(poll_id)
+            self.assertEqual(PollOption.objects.using(alias).filter(poll_id=poll_id).count(), 2)
+        self.assertEqual(sum(Poll.objects.using(alias).count() for alias in settings.POLL_SHARDS), 8)
+        self.assertEqual(Poll.objects.using(shard_for_poll(poll_ids[0])).get(poll_id=poll_ids[0]).created_at, created_at)
+
+    def test_create_outside_a_shard_block_places_rows_by_poll(self):
+        from .sharding import shard_for_poll
+
+        polls = [Poll.objects.create(creator=self.user, title=f"Poll {i}") for i in range(12)]
+        self.assertGreater(len({poll._state.db for poll in polls}), 1)
+        for poll in polls:
+            alias = shard_for_poll(poll.poll_id)
+            self.assertEqual(poll._state.db, alias)
+            option = PollOption.objects.create(poll=poll, text="Yes")
+            self.assertTrue(PollOption.objects.using(alias).filter(pk=option.pk).exists())
+
+        # An unsaved poll still carries its creator's database
+        poll = Poll(creator=self.user, title="Unsaved")
+        self.assertEqual(PollOption(poll=poll, text="Yes").poll, poll)
+
+    def test_deleting_user_deletes_polls_on_every_shard(self):
+        from .sharding import shard_for_poll
+
+        poll_ids = [self._create(f"Poll {i}") for i in range(12)]
+        self.assertGreater(len({shard_for_poll(poll_id) for poll_id in poll_ids}), 1)
+
+        self.user.delete()
+
+        for alias in settings.POLL_SHARDS:
+            self.assertFalse(Poll.objects.using(alias).exists())
+            self.assertFalse(PollOption.objects.using(alias).exists())
+
+
+# ===========================================================
+# CONCURRENT VOTE STRESS TESTS
+# ===========================================================
+class StressVotesTests(TransactionTestCase):
+    def test_reduced_run_passes_every_check(self):
+        import subprocess
+        import sys
+        import tempfile
+
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as scratch:
+            # The worker processes need a database they can all open
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{scratch}/stress.db?timeout=30",
+                POLL_SHARDS="default",
+            )
+            subprocess.run(
+                [sys.executable, "manage.py", "migrate", "-v0"],
+                cwd=project_dir, env=env, check=True, timeout=300,
+            )
+            run = subprocess.run(
+                [sys.executable, "benchmarks/stress_votes.py",
+                 "--processes", "3", "--polls", "2", "--voters", "10", "--devices", "10", "--overlap", "2"],
+                cwd=project_dir, env=env, capture_output=True, text=True, timeout=300,
+            )
+
+        self.assertEqual(run.returncode, 0, run.stdout + run.stderr)
+        self.assertNotIn("FAIL", run.stdout)
+        self.assertIn("PASS  every planned ballot accepted once (40 accepted, 40 planned)", run.stdout)
@@ -30,6 +30,11 @@ def generate_anon_id(email, poll_id):
     hash_input = f"{email}-{poll_id}-{uuid4()}"
     return hashlib.sha256(hash_input.encode()).hexdigest()
 
+def generate_device_anon_id(device_token, poll_id):
+    """Derive a stable anon_id for an anonymous device so the raw token is never stored"""
+    hash_input = f"device-{poll_id}-{device_token}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
+
 def generate_temp_password():
     chars = string.ascii_letters + string.digits
     return ''.join(random.choice(chars) for _ in range(10))
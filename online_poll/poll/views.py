@@ -1,25 +1,52 @@
+from django.conf import settings
 from django.db import IntegrityError
-from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
 from django.utils import timezone
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError, PermissionDenied
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import AccessToken
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import check_password, make_password
 
 from .models import Poll, PollOption, Voter, Vote
+from .filters import PollFilter
 from .serializers import (
-    PollSerializer, PollCreateSerializer, PollOptionSerializer,
-    VoteSerializer, VoterUploadSerializer, RegisterSerializer,
+    PollSerializer, PollListPageSerializer, PollCreateSerializer, PollBulkCreateSerializer, PollBatchResultsSerializer, PollResultSerializer,
+    VoteSerializer, RankedVoteSerializer, VoterUploadSerializer, RegisterSerializer,
     LoginSerializer
 )
+from .services.poll_service import poll_page
+from .services.tally_service import ranked_results
+from .services.anonymous_vote_service import (
+    has_anonymous_vote, remember_anonymous_vote, anonymous_filter_stats
+)
+from .services.results_service import (
+    InvalidCursor, batch_results, ranked_options, total_votes, encode_cursor
+)
+from .services.segment_service import segment_results
+from .services.turnout_service import turnout
+from .services.voter_session_service import cache_voter_session, get_voter_session
+from .services.journal_service import AlreadyJournaled, journal_ballot, journal_enabled
+from .sharding import poll_shard
+from .utils import generate_device_anon_id
+from .services.export_service import (
+    EXPORT_FORMATS, VOTER_EXPORT_FIELDS, VOTE_EXPORT_FIELDS,
+    voter_rows, vote_rows, encode_export, accepts_gzip
+)
 
+EXPORT_FORMAT_PARAM = openapi.Parameter(
+    'file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    enum=list(EXPORT_FORMATS), description='Export format (default: csv)'
+)
 
 # -------------------------
 # User registration (public)
@@ -38,13 +65,73 @@ class LoginView(TokenObtainPairView):
 # PollViewSet
 # -------------------------
 class PollViewSet(viewsets.ModelViewSet):
-    queryset = Poll.objects.all().order_by('-created_at')
+    queryset = Poll.objects.all().order_by('-created_at', 'poll_id')
     lookup_field = 'poll_id'
     permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PollFilter
+
+    def dispatch(self, request, *args, **kwargs):
+        # Detail routes run against the shard that holds the poll
+        with poll_shard(kwargs.get('poll_id')):
+            return super().dispatch(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description='Polls per page (default: POLL_LIST_PAGE_SIZE); switches to a {next, results} page'
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                description='Cursor from a previous page\'s `next`'
+            ),
+        ],
+        responses={200: openapi.Response(
+            'A list of every matching poll, or one {next, results} page when page_size or cursor is given',
+            PollListPageSerializer,
+        )},
+    )
+    def list(self, request, *args, **kwargs):
+        # Every creator's polls, as before; `mine` / `creator` narrow it down
+        queryset = self.filter_queryset(self.get_queryset())
+        paginated = 'page_size' in request.query_params or 'cursor' in request.query_params
+        if not paginated:
+            # Plain list of every matching poll, the original response shape
+            polls, _ = poll_page(queryset, None)
+            return Response(self.get_serializer(polls, many=True).data)
+
+        try:
+            limit = int(request.query_params.get('page_size') or settings.POLL_LIST_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({'page_size': 'Must be a positive integer.'})
+        if limit < 1:
+            raise ValidationError({'page_size': 'Must be a positive integer.'})
+        limit = min(limit, settings.POLL_LIST_MAX_PAGE_SIZE)
+
+        try:
+            polls, cursor = poll_page(queryset, limit, request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            raise ValidationError({'cursor': str(e)})
+
+        next_url = None
+        if cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+        return Response({'next': next_url, 'results': self.get_serializer(polls, many=True).data})
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.prefetch_related('options')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create', 'update', 'partial_update'):
             return PollCreateSerializer
+        if self.action == 'bulk_create':
+            return PollBulkCreateSerializer
+        if self.action == 'batch_results':
+            return PollBatchResultsSerializer
         return PollSerializer
 
     def perform_create(self, serializer):
@@ -52,24 +139,78 @@ class PollViewSet(viewsets.ModelViewSet):
         serializer.context['creator'] = self.request.user
         serializer.save()
 
+    # -------------------- bulk create action --------------------
+    @swagger_auto_schema(
+        method='post',
+        request_body=PollBulkCreateSerializer,
+        responses={201: openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "created": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "index": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "poll_id": openapi.Schema(type=openapi.TYPE_STRING),
+                            "title": openapi.Schema(type=openapi.TYPE_STRING),
+                        }
+                    )
+                ),
+                "errors": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "index": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "errors": openapi.Schema(type=openapi.TYPE_OBJECT),
+                        }
+                    )
+                ),
+            }
+        ), 400: 'Validation errors'},
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.context['creator'] = request.user
+        result = serializer.save()
+
+        if not result['created']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
     # -------------------- vote action --------------------
     @swagger_auto_schema(
         method='post',
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
-            required=['poll_option'],
             properties={
                 'poll_option': openapi.Schema(type=openapi.TYPE_STRING, description='UUID of the poll option to vote for'),
-                'voter_token': openapi.Schema(type=openapi.TYPE_STRING, description='Voter JWT (optional)')
+                'rankings': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
+                    description='Option UUIDs in order of preference (ranked polls only)'
+                ),
+                'voter_token': openapi.Schema(type=openapi.TYPE_STRING, description='Voter JWT (optional)'),
+                'device_token': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description='Client fingerprint or device token, used instead of a voter token in polls that allow anonymous voting'
+                ),
             }
         ),
-        responses={201: VoteSerializer, 400: 'Validation errors'},
+        responses={201: VoteSerializer, 202: 'Accepted into the vote journal', 400: 'Validation errors'},
     )
     @action(detail=True, methods=['post'], url_path='vote', permission_classes=[AllowAny])
     def vote(self, request, poll_id=None):
         poll = self.get_object()
+        if poll.poll_type == Poll.RANKED_CHOICE:
+            return self._ranked_vote(request, poll)
+
         option_id = request.data.get('poll_option')
         voter_token = request.data.get('voter_token')
+        device_token = request.data.get('device_token')
 
         # resolve option
         try:
@@ -77,45 +218,335 @@ class PollViewSet(viewsets.ModelViewSet):
         except PollOption.DoesNotExist:
             return Response({'error': 'Option does not exist for this poll.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        voter = None
+        anon_id = None
+
         # if voter_token supplied: get anon_id from it
         try:
             if voter_token:
                 token = AccessToken(voter_token)
-                voter_id = token.get('voter_id')
-                voter = Voter.objects.filter(voter_id=voter_id, poll=poll).first()
+                voter = get_voter_session(token.get('voter_id'), poll)
                 if not voter:
                     return Response({'error': 'Voter not registered for this poll.'}, status=status.HTTP_400_BAD_REQUEST)
-                if voter.has_voted:
+                if voter['has_voted']:
                     return Response({'error': 'You have already voted.'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': f'{e}'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        
-        # Build serializer data (inject anon_id server-side)
-        vote_payload = {
-            'poll_option': option.option_id,
-            'voter': str(voter.voter_id)  # pass voter for serializer create
-        }
-        
-        serializer = VoteSerializer(data=vote_payload, context={'request': request})
+
+        # otherwise open voting, keyed by the client's device token
+        if not voter:
+            if not poll.allow_anonymous:
+                return Response({'error': 'Voter token is required.'}, status=status.HTTP_400_BAD_REQUEST)
+            if not device_token:
+                return Response({'error': 'A voter token or device token is required.'}, status=status.HTTP_400_BAD_REQUEST)
+            anon_id = generate_device_anon_id(device_token, str(poll.poll_id))
+            if has_anonymous_vote(poll, anon_id):
+                return Response({'error': 'You can only vote once in this poll.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Build serializer data (inject anon_id / voter session server-side)
+        vote_payload = {'poll_option': option.option_id}
+        serializer = VoteSerializer(
+            data=vote_payload,
+            context={'request': request, 'anon_id': anon_id, 'voter_session': voter}
+        )
         try:
             serializer.is_valid(raise_exception=True)
+            if journal_enabled():
+                return self._journal_vote(poll, [option], voter, anon_id)
             vote = serializer.save()
-            return Response(VoteSerializer(vote).data, status=status.HTTP_201_CREATED)
         except ValidationError as e:
             return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            if anon_id:
+                remember_anonymous_vote(poll, anon_id)
+            return Response({'error': 'You can only vote once in this poll.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if anon_id:
+            remember_anonymous_vote(poll, anon_id)
+        return Response(VoteSerializer(vote).data, status=status.HTTP_201_CREATED)
+
+    def _ranked_vote(self, request, poll):
+        voter_token = request.data.get('voter_token')
+        if not voter_token:
+            return Response({'error': 'Voter token is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            token = AccessToken(voter_token)
+            voter = get_voter_session(token.get('voter_id'), poll)
+        except Exception as e:
+            return Response({'error': f'{e}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not voter:
+            return Response({'error': 'Voter not registered for this poll.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = RankedVoteSerializer(
+            data={'rankings': request.data.get('rankings')},
+            context={'request': request, 'poll': poll, 'voter_session': voter}
+        )
+        try:
+            serializer.is_valid(raise_exception=True)
+            if journal_enabled():
+                return self._journal_vote(
+                    poll, serializer.validated_data['options'], voter, None, ranked=True
+                )
+            votes = serializer.save()
+        except ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({'error': 'You have already voted.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {'rankings': [vote.poll_option_id for vote in votes], 'created_at': votes[0].created_at},
+            status=status.HTTP_201_CREATED
+        )
+
+    def _journal_vote(self, poll, options, session, anon_id, ranked=False):
+        """Acknowledge a validated ballot once it is durable in the vote journal."""
+        try:
+            record = journal_ballot(poll, options, session=session, anon_id=anon_id, ranked=ranked)
+        except AlreadyJournaled:
+            error = 'You can only vote once in this poll.' if anon_id else 'You have already voted.'
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        if anon_id:
+            remember_anonymous_vote(poll, anon_id)
+
+        votes = record['votes']
+        if ranked:
+            data = {'rankings': [vote['poll_option_id'] for vote in votes]}
+        else:
+            data = {'vote_id': votes[0]['vote_id'], 'poll_option': votes[0]['poll_option_id']}
+        data['created_at'] = record['accepted_at']
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
     # -------------------- results action --------------------
     @swagger_auto_schema(
         method='get',
-        responses={200: PollOptionSerializer(many=True)},
+        manual_parameters=[
+            openapi.Parameter(
+                'top', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description='Return only the N leading options'
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description='Paginate results with this many options per page'
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                description='Cursor from a previous page\'s `next`'
+            ),
+        ],
+        responses={200: PollResultSerializer(many=True)},
     )
     @action(detail=True, methods=['get'], url_path='results', permission_classes=[AllowAny])
     def results(self, request, poll_id=None):
         poll = self.get_object()
-        options = poll.options.annotate(votes_count=Count('votes')).order_by('-votes_count')
-        serializer = PollOptionSerializer(options, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        top = request.query_params.get('top')
+        page_size = request.query_params.get('page_size')
+        cursor = request.query_params.get('cursor')
+
+        # Plain request: every option, as before
+        if top is None and page_size is None and cursor is None:
+            options = ranked_options(poll)
+            return Response(PollResultSerializer(options, many=True).data, status=status.HTTP_200_OK)
+
+        # Errors are reported under the parameter that set the limit
+        param = 'top' if top is not None else 'page_size'
+        try:
+            limit = int(top if top is not None else page_size or settings.RESULTS_PAGE_SIZE)
+        except ValueError:
+            raise ValidationError({param: 'Must be a positive integer.'})
+        if limit < 1:
+            raise ValidationError({param: 'Must be a positive integer.'})
+        limit = min(limit, settings.RESULTS_MAX_PAGE_SIZE)
+
+        total = total_votes(poll)
+        try:
+            options = ranked_options(poll, limit=limit, cursor=None if top is not None else cursor, total=total)
+        except InvalidCursor as e:
+            raise ValidationError({'cursor': str(e)})
+
+        next_url = None
+        if top is None and len(options) == limit:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_cursor(options[-1])
+            )
+
+        return Response({
+            'total_votes': total,
+            'next': next_url,
+            'results': PollResultSerializer(options, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+    # -------------------- batch results action --------------------
+    @swagger_auto_schema(
+        method='post',
+        request_body=PollBatchResultsSerializer,
+        responses={200: openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "results": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "poll_id": openapi.Schema(type=openapi.TYPE_STRING),
+                            "total_votes": openapi.Schema(type=openapi.TYPE_INTEGER),
+                            "results": openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                                description='Options in results order, as returned by /polls/{poll_id}/results/'
+                            ),
+                        }
+                    )
+                ),
+                "errors": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "poll_id": openapi.Schema(type=openapi.TYPE_STRING),
+                            "error": openapi.Schema(type=openapi.TYPE_STRING),
+                        }
+                    )
+                ),
+            }
+        ), 400: 'Validation errors'},
+    )
+    @action(detail=False, methods=['post'], url_path='results/batch', permission_classes=[AllowAny])
+    def batch_results(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        poll_ids = serializer.validated_data['valid_ids']
+        found = batch_results(poll_ids)
+
+        results = []
+        errors = list(serializer.validated_data['item_errors'])
+        for poll_id in poll_ids:
+            if poll_id not in found:
+                errors.append({'poll_id': str(poll_id), 'error': 'Poll not found.'})
+                continue
+            total, options = found[poll_id]
+            results.append({
+                'poll_id': str(poll_id),
+                'total_votes': total,
+                'results': PollResultSerializer(options, many=True).data,
+            })
+        return Response({'results': results, 'errors': errors}, status=status.HTTP_200_OK)
+
+    # -------------------- runoff action --------------------
+    @swagger_auto_schema(
+        method='get',
+        responses={200: 'Instant-runoff rounds and winner', 400: 'Not a ranked poll'},
+    )
+    @action(detail=True, methods=['get'], url_path='runoff', permission_classes=[AllowAny])
+    def runoff(self, request, poll_id=None):
+        poll = self.get_object()
+        if poll.poll_type != Poll.RANKED_CHOICE:
+            return Response({'error': 'Runoff results are only available for ranked polls.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ranked_results(poll), status=status.HTTP_200_OK)
+
+    # -------------------- segmented results action --------------------
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter(
+                'attribute', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                description='Only this segment attribute (default: all of the poll\'s segment_attributes)'
+            ),
+        ],
+        responses={200: 'Votes per option for each segment value', 400: 'Unknown attribute', 403: 'Not the poll creator'},
+    )
+    @action(detail=True, methods=['get'], url_path='results/segments')
+    def segment_results(self, request, poll_id=None):
+        poll = self.get_object()
+        if poll.creator_id != request.user.pk:
+            raise PermissionDenied("Only the poll creator can view segmented results.")
+
+        attribute = request.query_params.get('attribute')
+        if attribute is not None and attribute not in poll.segment_attributes:
+            return Response({'error': f"'{attribute}' is not a segment attribute of this poll."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(segment_results(poll, attribute), status=status.HTTP_200_OK)
+
+    # -------------------- turnout action --------------------
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter(
+                'minutes', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description='Window for recent_votes, in minutes (default: TURNOUT_DEFAULT_MINUTES, at most TURNOUT_MAX_MINUTES)'
+            ),
+        ],
+        responses={200: 'Invited voters, voted, percentage and recent_votes', 400: 'Invalid minutes', 403: 'Not the poll creator'},
+    )
+    @action(detail=True, methods=['get'], url_path='turnout')
+    def turnout(self, request, poll_id=None):
+        poll = self.get_object()
+        if poll.creator_id != request.user.pk:
+            raise PermissionDenied("Only the poll creator can view turnout.")
+
+        try:
+            minutes = int(request.query_params.get('minutes', settings.TURNOUT_DEFAULT_MINUTES))
+        except ValueError:
+            raise ValidationError({'minutes': 'Must be a positive integer.'})
+        if not 1 <= minutes <= settings.TURNOUT_MAX_MINUTES:
+            raise ValidationError({'minutes': f'Must be between 1 and {settings.TURNOUT_MAX_MINUTES}.'})
+        return Response(turnout(poll, minutes), status=status.HTTP_200_OK)
+
+    # -------------------- anonymous voting metrics --------------------
+    @swagger_auto_schema(
+        method='get',
+        operation_description=(
+            "Counters are kept in the cache: they cover every worker only when CACHE_URL "
+            "points at a shared cache, and one worker's requests otherwise."
+        ),
+        responses={200: 'Bloom filter pre-check counters and hit rate', 403: 'Not the poll creator'},
+    )
+    @action(detail=True, methods=['get'], url_path='anonymous-stats')
+    def anonymous_stats(self, request, poll_id=None):
+        poll = self.get_object()
+        if poll.creator_id != request.user.pk:
+            raise PermissionDenied("Only the poll creator can view anonymous voting metrics.")
+        return Response(anonymous_filter_stats(poll), status=status.HTTP_200_OK)
+
+    # -------------------- export actions --------------------
+    def _export_response(self, request, poll, name, fields, rows):
+        if poll.creator_id != request.user.pk:
+            raise PermissionDenied("Only the poll creator can export poll data.")
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'file_format': f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+
+        compress = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(
+            encode_export(fields, rows, file_format, compress=compress),
+            content_type=EXPORT_FORMATS[file_format],
+        )
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        response['Content-Disposition'] = f'attachment; filename="{name}-{poll.poll_id}.{file_format}"'
+        return response
+
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[EXPORT_FORMAT_PARAM],
+        responses={200: 'Streamed voter roster', 403: 'Not the poll creator'},
+    )
+    @action(detail=True, methods=['get'], url_path='export/voters')
+    def export_voters(self, request, poll_id=None):
+        poll = self.get_object()
+        return self._export_response(request, poll, 'voters', VOTER_EXPORT_FIELDS, voter_rows(poll))
+
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[EXPORT_FORMAT_PARAM],
+        responses={200: 'Streamed raw votes', 403: 'Not the poll creator'},
+    )
+    @action(detail=True, methods=['get'], url_path='export/votes')
+    def export_votes(self, request, poll_id=None):
+        poll = self.get_object()
+        return self._export_response(request, poll, 'votes', VOTE_EXPORT_FIELDS, vote_rows(poll))
 
 
 # -------------------------
@@ -125,6 +556,10 @@ class VoterUploadView(generics.CreateAPIView):
     serializer_class = VoterUploadSerializer
     permission_classes = [IsAuthenticated]
 
+    def dispatch(self, request, *args, **kwargs):
+        with poll_shard(kwargs.get('poll_id')):
+            return super().dispatch(request, *args, **kwargs)
+
     @swagger_auto_schema(
         request_body=VoterUploadSerializer,
         responses={201: openapi.Schema(
@@ -139,12 +574,35 @@ class VoterUploadView(generics.CreateAPIView):
                             "created": openapi.Schema(type=openapi.TYPE_BOOLEAN),
                         }
                     )
-                )
+                ),
+                "added": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            "email": openapi.Schema(type=openapi.TYPE_STRING),
+                            "temp_password": openapi.Schema(type=openapi.TYPE_STRING),
+                        }
+                    ),
+                    description="sync only: voters created for new emails"
+                ),
+                "removed": openapi.Schema(
+                    type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING),
+                    description="sync with remove_missing only: emails removed from the roster"
+                ),
+                "unchanged": openapi.Schema(type=openapi.TYPE_INTEGER, description="sync only"),
+                "missing": openapi.Schema(type=openapi.TYPE_INTEGER, description="sync only"),
+                "kept_voted": openapi.Schema(
+                    type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING),
+                    description="sync with remove_missing only: missing voters kept because they voted"
+                ),
             }
-        )}
+        ), 403: 'Not the poll creator'}
     )
     def post(self, request, poll_id):
         poll = get_object_or_404(Poll, poll_id=poll_id)
+        if poll.creator_id != request.user.pk:
+            raise PermissionDenied("Only the poll creator can upload voters.")
 
         serializer = self.get_serializer(
             data=request.data,
@@ -182,13 +640,22 @@ def voter_login(request):
     poll_id = request.data.get('poll_id')
 
     try:
-        voter = Voter.objects.get(email=email, poll_id=poll_id)
+        with poll_shard(poll_id):
+            voter = Voter.objects.get(email=email, poll_id=poll_id)
     except Voter.DoesNotExist:
         return Response({'error': 'Voter not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if not check_password(temp_password, voter.temp_password):
+    def upgrade_hash(raw_password):
+        # Re-hash at the configured PASSWORD_HASH_ITERATIONS
+        with poll_shard(poll_id):
+            Voter.objects.filter(voter_id=voter.voter_id).update(temp_password=make_password(raw_password))
+
+    if not check_password(temp_password, voter.temp_password, setter=upgrade_hash):
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
+    # Votes read membership and has_voted from here instead of the Voter row
+    cache_voter_session(voter)
+
     # create a short-lived voter token (AccessToken) with voter_id and poll_id
     token = AccessToken()
     token['voter_id'] = str(voter.voter_id)